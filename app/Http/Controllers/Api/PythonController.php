@@ -3,16 +3,95 @@
 namespace App\Http\Controllers\Api;
 
 use App\Http\Controllers\Controller;
+use Illuminate\Contracts\Process\ProcessResult;
+use Illuminate\Http\JsonResponse;
 use Illuminate\Http\Request;
+use Illuminate\Support\Facades\Log;
 use Illuminate\Support\Facades\Process;
 use Illuminate\Support\Facades\Storage;
 
 class PythonController extends Controller
 {
+    // speech_client.py forwards to a running `speech.py --serve` worker and
+    // falls back to running speech.py directly when none is listening.
+    private function script(): string
+    {
+        return base_path('app/Services/pythonService/speech_client.py');
+    }
+
+    // Long recordings go through the job queue instead of blocking a request:
+    // submit returns a job ID at once, status/result are polled.
+    private function jobsScript(): string
+    {
+        return base_path('app/Services/pythonService/speech_jobs.py');
+    }
+
+    // speech.py prints one METRICS:{json} line on stderr with per-stage timings
+    private function logMetrics(string $endpoint, ProcessResult $result): void
+    {
+        foreach (preg_split('/\R/', $result->errorOutput()) as $line) {
+            if (! str_starts_with($line, 'METRICS:')) {
+                continue;
+            }
+
+            $metrics = json_decode(substr($line, strlen('METRICS:')), true);
+            if (is_array($metrics)) {
+                Log::info('speech.metrics', ['endpoint' => $endpoint] + $metrics);
+            }
+        }
+    }
+
+    // With --deadline-ms, speech.py prints PARTIAL:{json} on stderr when it
+    // had to skip a stage (e.g. TTS) or ran out of time, listing what it did finish
+    private function partial(ProcessResult $result): ?array
+    {
+        foreach (preg_split('/\R/', $result->errorOutput()) as $line) {
+            if (str_starts_with($line, 'PARTIAL:')) {
+                $partial = json_decode(substr($line, strlen('PARTIAL:')), true);
+
+                return is_array($partial) ? $partial : null;
+            }
+        }
+
+        return null;
+    }
+
+    // speech.py exits with 75 and prints BUSY:{json} on stderr when the
+    // request's lane is saturated (see speech_lanes.py) — pass that on as a
+    // 503 with Retry-After instead of an error
+    private function busy(ProcessResult $result): ?JsonResponse
+    {
+        if ($result->exitCode() !== 75) {
+            return null;
+        }
+
+        $busy = [];
+        foreach (preg_split('/\R/', $result->errorOutput()) as $line) {
+            if (str_starts_with($line, 'BUSY:')) {
+                $busy = json_decode(substr($line, strlen('BUSY:')), true) ?: [];
+            }
+        }
+        $retryAfter = (int) ceil($busy['retry_after'] ?? 5);
+
+        return response()->json([
+            'success' => false,
+            'error' => 'Busy, retry later.',
+            'lane' => $busy['lane'] ?? null,
+            'retry_after' => $retryAfter,
+        ], 503, ['Retry-After' => (string) $retryAfter]);
+    }
+
+    // Leave speech.py a few seconds under the process timeout so it can
+    // return what it finished instead of being killed mid-request
+    private function deadlineMs(int $timeoutSeconds): string
+    {
+        return (string) (($timeoutSeconds - 5) * 1000);
+    }
+
     public function run(Request $request)
     {
         try {
-            $script = base_path('app/Services/pythonService/speech.py');
+            $script = $this->script();
             $result = Process::timeout(60)->run([
                 'python3',
                 $script,
@@ -23,6 +102,11 @@ public function run(Request $request)
                 '--text',
                 'ping',
             ]);
+            $this->logMetrics('run-python', $result);
+
+            if ($busy = $this->busy($result)) {
+                return $busy;
+            }
 
             if ($result->failed()) {
                 return response()->json([
@@ -54,7 +138,7 @@ public function translateText(Request $request)
 
         // return $request->all();
 
-        $script = base_path('app/Services/pythonService/speech.py');
+        $script = $this->script();
         $result = Process::timeout(60)->run([
             'python3',
             $script,
@@ -64,12 +148,20 @@ public function translateText(Request $request)
             $request->string('target_lang')->toString(),
             '--text',
             $request->string('text')->toString(),
+            '--deadline-ms',
+            $this->deadlineMs(60),
         ]);
+        $this->logMetrics('translate-text', $result);
+
+        if ($busy = $this->busy($result)) {
+            return $busy;
+        }
 
         if ($result->failed()) {
             return response()->json([
                 'success' => false,
                 'error' => $result->errorOutput(),
+                'partial' => $this->partial($result),
             ], 500);
         }
 
@@ -175,7 +267,7 @@ public function translateAudio(Request $request)
             $outputFilename = uniqid('tts_').'.mp3';
             $saveOutput = $outputDir.DIRECTORY_SEPARATOR.$outputFilename;
 
-            $script = base_path('app/Services/pythonService/speech.py');
+            $script = $this->script();
 
             /*
             |--------------------------------------------------------------------------
@@ -190,7 +282,10 @@ public function translateAudio(Request $request)
                 '--file', $fullPath,
                 '--tts',
                 '--save-output', $saveOutput,
+                '--deadline-ms', $this->deadlineMs(120),
             ]);
+            $this->logMetrics('translate-audio', $result);
+            $partial = $this->partial($result);
 
             /*
             |--------------------------------------------------------------------------
@@ -199,14 +294,29 @@ public function translateAudio(Request $request)
             */
             @unlink($fullPath);
 
+            if ($busy = $this->busy($result)) {
+                return $busy;
+            }
+
             if ($result->failed()) {
                 return response()->json([
                     'success' => false,
                     'error' => $result->errorOutput(),
                     'stdout' => $result->output(),
+                    'partial' => $partial,
                 ], 500);
             }
 
+            // Ran short on time: the translation is there, the audio was skipped
+            if ($partial !== null && isset($partial['skipped']['tts'])) {
+                return response()->json([
+                    'success' => true,
+                    'output' => trim($result->output()),
+                    'audio_url' => null,
+                    'partial' => $partial,
+                ]);
+            }
+
             /*
             |--------------------------------------------------------------------------
             | Confirm output file exists
@@ -240,6 +350,216 @@ public function translateAudio(Request $request)
         }
     }
 
+    // Group calls: one upload, recognised once, translated and voiced for every
+    // target language concurrently. speech.py prints one JSON line per target.
+    public function translateAudioTargets(Request $request)
+    {
+        try {
+            $request->validate([
+                'audio' => 'required|file|mimes:wav,mp3,ogg,mp4',
+                'source_lang' => 'required|string',
+                'target_langs' => 'required|array|min:1|max:5',
+                'target_langs.*' => 'required|string|distinct',
+            ]);
+
+            $tempDir = storage_path('app/temp/audio');
+            $outputDir = public_path('audio');
+
+            foreach ([$tempDir, $outputDir] as $dir) {
+                if (!file_exists($dir)) {
+                    mkdir($dir, 0755, true);
+                }
+            }
+
+            $inputFilename = uniqid('input_').'.'.$request->file('audio')->extension();
+            $fullPath = $tempDir.DIRECTORY_SEPARATOR.$inputFilename;
+            $request->file('audio')->move($tempDir, $inputFilename);
+
+            // speech.py writes one file per target: tts_xxx.hausa.mp3, tts_xxx.yoruba.mp3 …
+            $saveOutput = $outputDir.DIRECTORY_SEPARATOR.uniqid('tts_').'.mp3';
+
+            $command = [
+                'python3',
+                $this->script(),
+                '--source', $request->input('source_lang'),
+            ];
+            foreach ($request->input('target_langs') as $target) {
+                array_push($command, '--target', $target);
+            }
+            array_push(
+                $command,
+                '--file', $fullPath,
+                '--tts',
+                '--save-output', $saveOutput,
+                '--deadline-ms', $this->deadlineMs(120),
+            );
+
+            $result = Process::timeout(120)->run($command);
+            $this->logMetrics('translate-audio-targets', $result);
+            $partial = $this->partial($result);
+
+            @unlink($fullPath);
+
+            if ($busy = $this->busy($result)) {
+                return $busy;
+            }
+
+            $targets = [];
+            foreach (preg_split('/\R/', trim($result->output())) as $line) {
+                $item = json_decode($line, true);
+                if (!is_array($item) || !isset($item['target'])) {
+                    continue;
+                }
+
+                $audio = $item['audio'] ?? null;
+                $targets[$item['target']] = [
+                    'output' => $item['output'] ?? null,
+                    'audio_url' => $audio && file_exists($audio) ? asset('audio/'.basename($audio)) : null,
+                    'error' => $item['error'] ?? null,
+                ];
+            }
+
+            // Exit code 2 with results means some targets failed — report them per target
+            if ($result->failed() && $targets === []) {
+                return response()->json([
+                    'success' => false,
+                    'error' => $result->errorOutput(),
+                    'stdout' => $result->output(),
+                    'partial' => $partial,
+                ], 500);
+            }
+
+            return response()->json([
+                'success' => true,
+                'targets' => $targets,
+                'partial' => $partial,
+            ]);
+        } catch (\Throwable $e) {
+            return response()->json([
+                'success' => false,
+                'error' => $e->getMessage(),
+                'line' => $e->getLine(),
+            ], 500);
+        }
+    }
+
+    // Queue an audio translation and return its job ID right away. A pool of
+    // speech_jobs.py workers runs it; poll translateAudioJobStatus for
+    // progress (decoded, recognized, translated, synthesized) and
+    // translateAudioJobResult for the transcript, translation and audio URL.
+    public function translateAudioJob(Request $request)
+    {
+        try {
+            $request->validate([
+                'audio' => 'required|file|mimes:wav,mp3,ogg,mp4',
+                'source_lang' => 'required|string',
+                'target_lang' => 'required|string',
+            ]);
+
+            $tempDir = storage_path('app/temp/audio');
+            $outputDir = public_path('audio');
+
+            foreach ([$tempDir, $outputDir] as $dir) {
+                if (!file_exists($dir)) {
+                    mkdir($dir, 0755, true);
+                }
+            }
+
+            $inputFilename = uniqid('input_').'.'.$request->file('audio')->extension();
+            $request->file('audio')->move($tempDir, $inputFilename);
+
+            $result = Process::timeout(30)->run([
+                'python3',
+                $this->jobsScript(),
+                'submit',
+                '--source', $request->input('source_lang'),
+                '--target', $request->input('target_lang'),
+                '--file', $tempDir.DIRECTORY_SEPARATOR.$inputFilename,
+                '--tts',
+                '--save-output', $outputDir.DIRECTORY_SEPARATOR.uniqid('tts_').'.mp3',
+                '--delete-input', // the job owns the upload from here on
+            ]);
+
+            $job = json_decode(trim($result->output()), true);
+            if ($result->failed() || !is_array($job)) {
+                @unlink($tempDir.DIRECTORY_SEPARATOR.$inputFilename);
+
+                return response()->json([
+                    'success' => false,
+                    'error' => $result->errorOutput(),
+                ], 422);
+            }
+
+            return response()->json([
+                'success' => true,
+                'job' => $job['job'],
+                'status' => $job['status'],
+                'position' => $job['position'] ?? null,
+            ], 202);
+        } catch (\Throwable $e) {
+            return response()->json([
+                'success' => false,
+                'error' => $e->getMessage(),
+                'line' => $e->getLine(),
+            ], 500);
+        }
+    }
+
+    // speech_jobs.py status|result: the job's JSON record, or null when the
+    // job is unknown (it may also have expired, see SPEECH_JOBS_TTL)
+    private function audioJob(string $command, string $job, string $endpoint): ?array
+    {
+        $result = Process::timeout(30)->run(['python3', $this->jobsScript(), $command, $job]);
+        $this->logMetrics($endpoint, $result);
+
+        $record = json_decode(trim($result->output()), true);
+        if (!is_array($record) || ($record['status'] ?? 'unknown') === 'unknown') {
+            return null;
+        }
+
+        return $record;
+    }
+
+    public function translateAudioJobStatus(string $job)
+    {
+        $record = $this->audioJob('status', $job, 'translate-audio-job-status');
+        if ($record === null) {
+            return response()->json(['success' => false, 'error' => 'Unknown job.'], 404);
+        }
+
+        return response()->json(['success' => true] + $record);
+    }
+
+    public function translateAudioJobResult(string $job)
+    {
+        $record = $this->audioJob('result', $job, 'translate-audio-job-result');
+        if ($record === null) {
+            return response()->json(['success' => false, 'error' => 'Unknown job.'], 404);
+        }
+
+        // Still queued or running — poll again later
+        if (!in_array($record['status'], ['done', 'failed'], true)) {
+            return response()->json(['success' => true] + $record, 202);
+        }
+
+        if ($record['status'] === 'failed') {
+            return response()->json([
+                'success' => false,
+                'error' => $record['error'] ?? null,
+                'transcript' => $record['transcript'] ?? null,
+            ], 500);
+        }
+
+        $audio = $record['audio'] ?? null;
+
+        return response()->json([
+            'success' => true,
+            'transcript' => $record['transcript'],
+            'output' => $record['output'],
+            'audio_url' => $audio && file_exists($audio) ? asset('audio/'.basename($audio)) : null,
+        ]);
+    }
+
     // this translate text and then generates audio from the translated text,
     // returning both the translation and a URL to the audio file.
     public function textTranslateAudio(Request $request)
@@ -251,7 +571,7 @@ public function textTranslateAudio(Request $request)
                 'target_lang' => 'required|string',
             ]);
 
-            $script = base_path('app/Services/pythonService/speech.py');
+            $script = $this->script();
 
             // Optional: let caller specify where to save the audio output
             // $saveOutput = storage_path('app/public/audio/'.uniqid('tts_').'.mp3');
@@ -275,19 +595,30 @@ public function textTranslateAudio(Request $request)
                 '--tts',         // ✅ triggers text_to_speech_advanced()
                 // '--play',        // ✅ plays audio on the server (remove if server has no audio)
                 '--save-output', $saveOutput, // ✅ saves mp3 so you can return a URL
+                '--deadline-ms', $this->deadlineMs(60),
             ]);
+            $this->logMetrics('text-translate-audio', $result);
+            $partial = $this->partial($result);
+
+            if ($busy = $this->busy($result)) {
+                return $busy;
+            }
 
             if ($result->failed()) {
                 return response()->json([
                     'success' => false,
                     'error' => $result->errorOutput(),
+                    'partial' => $partial,
                 ], 500);
             }
 
+            $audioSkipped = $partial !== null && isset($partial['skipped']['tts']);
+
             return response()->json([
                 'success' => true,
                 'output' => trim($result->output()),  // translated text
-                'audio_url' => asset('storage/audio/'.basename($saveOutput)), // audio file URL
+                'audio_url' => $audioSkipped ? null : asset('storage/audio/'.basename($saveOutput)), // audio file URL
+                'partial' => $partial,
             ]);
         } catch (\Exception $e) {
             return response()->json([
@@ -296,4 +627,78 @@ public function textTranslateAudio(Request $request)
             ], 500);
         }
     }
+
+    // Same as textTranslateAudio, but the mp3 is streamed back while it is
+    // being synthesized, so clients can start playback after the first
+    // sentence. The translated text comes back in the X-Translated-Text
+    // header (URL-encoded).
+    public function textTranslateAudioStream(Request $request)
+    {
+        $request->validate([
+            'text' => 'required|string',
+            'source_lang' => 'required|string',
+            'target_lang' => 'required|string',
+        ]);
+
+        $process = Process::timeout(60)->start([
+            'python3',
+            $this->script(),
+            '--source',        $request->string('source_lang')->toString(),
+            '--target',        $request->string('target_lang')->toString(),
+            '--text',          $request->string('text')->toString(),
+            '--stream-output', '-', // mp3 on stdout, TEXT:/FIRST_AUDIO: on stderr
+            '--deadline-ms',   $this->deadlineMs(60),
+        ]);
+
+        // speech.py prints TEXT:"<translation>" before the first audio byte
+        $translated = null;
+        $result = null;
+        while ($translated === null && $process->running()) {
+            if (preg_match('/^TEXT:(.*)$/m', $process->errorOutput(), $match)) {
+                $translated = json_decode($match[1]);
+                break;
+            }
+            usleep(10000);
+        }
+
+        if ($translated === null) {
+            // It may have exited between polls (a TTS cache hit is that fast),
+            // with TEXT: and the whole mp3 already written
+            $result = $process->wait();
+            if (preg_match('/^TEXT:(.*)$/m', $result->errorOutput(), $match)) {
+                $translated = json_decode($match[1]);
+            }
+        }
+
+        if ($translated === null || ($result !== null && ! $result->successful() && $result->output() === '')) {
+            $this->logMetrics('text-translate-audio-stream', $result);
+
+            if ($busy = $this->busy($result)) {
+                return $busy;
+            }
+
+            return response()->json([
+                'success' => false,
+                'error' => $result->errorOutput(),
+            ], 500);
+        }
+
+        return response()->stream(function () use ($process) {
+            while ($process->running()) {
+                echo $process->latestOutput();
+                flush();
+                usleep(20000);
+            }
+
+            $result = $process->wait();
+            echo $process->latestOutput();
+            flush();
+            $this->logMetrics('text-translate-audio-stream', $result);
+        }, 200, [
+            'Content-Type' => 'audio/mpeg',
+            'Cache-Control' => 'no-cache',
+            'X-Accel-Buffering' => 'no', // keep nginx from buffering the whole file
+            'X-Translated-Text' => rawurlencode((string) $translated),
+        ]);
+    }
 }
@@ -1,11 +1,17 @@
 import os
+import re
 import sys
 import tempfile
 import subprocess
-from typing import Optional
-from deep_translator import GoogleTranslator
+from contextlib import ExitStack, contextmanager
+from typing import Dict, List, Optional, Tuple
 import argparse
 
+from speech_translators import get_translator, is_supported
+import speech_deadline
+import speech_lanes
+import speech_metrics
+
 
 # ─────────────────────────────────────────────────────────────────────────────
 # LANGUAGE MAPS
@@ -74,7 +80,8 @@ def text_to_speech_advanced(
     voice: str = "female",
     speed: float = 1.0,
     save_path: Optional[str] = None,
-    play: bool = True
+    play: bool = True,
+    tts_concurrency: int = 4,
 ) -> Optional[str]:
     """
     Convert text to speech using gTTS (online) or pyttsx3 (offline).
@@ -87,36 +94,69 @@ def text_to_speech_advanced(
         speed:      Speaking speed 0.5–2.0 (gTTS only supports slow mode < 1.0).
         save_path:  Optional file path to save the audio.
         play:       Whether to play audio immediately.
+        tts_concurrency: gTTS only — texts longer than TTS_SEGMENT_THRESHOLD
+                    are split at sentence boundaries and this many segments
+                    are synthesized in parallel (1 = one sequential request).
 
     Returns:
         Path to the saved audio file, or None.
     """
 
+    # Stable across processes (unlike hash()), so identical requests can
+    # reuse audio from the content-addressed store instead of re-synthesizing.
+    from speech_cache import AudioStore, get_audio_store
+
+    fmt = (os.path.splitext(save_path)[1].lstrip(".").lower() if save_path else "") or "mp3"
+    cache_key = AudioStore.make_key(text, language, engine.lower(), voice, speed, fmt)
+    store = get_audio_store()
+
     if engine.lower() == "gtts":
         try:
-            from gtts import gTTS
-
-            slow = 0.5 <= speed < 1.0
-            tts = gTTS(text=text, lang=language, slow=slow)
+            cached = store.lookup(cache_key, fmt) if store else None
+            speech_metrics.flag("tts_cache_hit", cached is not None)
+
+            if cached is None:
+                from gtts import gTTS
+
+                slow = 0.5 <= speed < 1.0
+                request_timeout = speech_deadline.timeout()   # None without --deadline-ms
+                segments = [text]
+                if tts_concurrency > 1 and len(text) > TTS_SEGMENT_THRESHOLD:
+                    segments = split_tts_segments(text)
+
+                def _synthesize(path):
+                    if len(segments) == 1:
+                        gTTS(text=text, lang=language, slow=slow, timeout=request_timeout).save(path)
+                    else:
+                        synthesize_segments(segments, language, slow, tts_concurrency, path, request_timeout)
+
+                if store:
+                    with speech_metrics.stage("tts", chars=len(text), segments=len(segments)):
+                        cached = store.write(cache_key, fmt, _synthesize)
+                    if cached is None:
+                        # Synthesizing again straight to audio_file would repeat the request
+                        print("gTTS error: synthesis produced no audio.", file=sys.stderr)
+                        return None
+            else:
+                print(f"TTS cache hit: {cached}", file=sys.stderr)
 
             if save_path:
-                os.makedirs(os.path.dirname(save_path), exist_ok=True)
-                tts.save(save_path)
                 audio_file = save_path
             else:
-                temp_dir = tempfile.gettempdir()
-                audio_file = os.path.join(temp_dir, f"tts_{abs(hash(text))}.mp3")
-                tts.save(audio_file)
+                audio_file = os.path.join(tempfile.gettempdir(), f"tts_{cache_key}.mp3")
+
+            if cached:
+                with speech_metrics.stage("write") as m:
+                    store.materialize(cached, audio_file)
+                    m["bytes"] = os.path.getsize(audio_file)
+            else:
+                os.makedirs(os.path.dirname(audio_file) or ".", exist_ok=True)
+                with speech_metrics.stage("tts", chars=len(text), segments=len(segments)) as m:
+                    _synthesize(audio_file)
+                    m["bytes"] = os.path.getsize(audio_file)
 
             if play:
-                if os.name == "nt":                              # Windows
-                    os.system(f'start "" "{audio_file}"')
-                elif os.name == "posix":
-                    sysname = os.uname().sysname.lower()
-                    if "darwin" in sysname:                      # macOS
-                        os.system(f'afplay "{audio_file}"')
-                    else:                                        # Linux
-                        os.system(f'mpg123 "{audio_file}" 2>/dev/null || play "{audio_file}"')
+                play_audio_file(audio_file)
 
             return audio_file
 
@@ -128,6 +168,13 @@ def text_to_speech_advanced(
             return None
 
     elif engine.lower() == "pyttsx3":
+        cached = store.lookup(cache_key, fmt) if store and save_path else None
+        speech_metrics.flag("tts_cache_hit", cached is not None)
+        if cached:
+            print(f"TTS cache hit: {cached}", file=sys.stderr)
+            with speech_metrics.stage("write"):
+                return store.materialize(cached, save_path)
+
         try:
             import pyttsx3
 
@@ -144,9 +191,20 @@ def text_to_speech_advanced(
             _engine.setProperty("volume", 1.0)
 
             if save_path:
-                os.makedirs(os.path.dirname(save_path), exist_ok=True)
-                _engine.save_to_file(text, save_path)
-                _engine.runAndWait()
+                def _synthesize(path):
+                    with speech_metrics.stage("tts", chars=len(text)):
+                        _engine.save_to_file(text, path)
+                        _engine.runAndWait()
+
+                if store:
+                    cached = store.write(cache_key, fmt, _synthesize)
+                    if not cached:
+                        return None
+                    with speech_metrics.stage("write"):
+                        return store.materialize(cached, save_path)
+
+                os.makedirs(os.path.dirname(save_path) or ".", exist_ok=True)
+                _synthesize(save_path)
                 return save_path
 
             _engine.say(text)
@@ -165,17 +223,395 @@ def text_to_speech_advanced(
         return None
 
 
+def play_audio_file(audio_file: str):
+    """Play an audio file on this machine (blocks until playback ends on macOS/Linux)."""
+    if os.name == "nt":                              # Windows
+        os.system(f'start "" "{audio_file}"')
+    elif os.name == "posix":
+        sysname = os.uname().sysname.lower()
+        if "darwin" in sysname:                      # macOS
+            os.system(f'afplay "{audio_file}"')
+        else:                                        # Linux
+            os.system(f'mpg123 "{audio_file}" 2>/dev/null || play "{audio_file}"')
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 1b. SEGMENTED TTS  (long replies: sentences synthesized in parallel)
+#     gTTS requests its ~100-character chunks one after another, so one long
+#     text is one long serial wait. Every chunk comes back as plain MPEG audio
+#     frames, which is also how gTTS joins them — so independently synthesized
+#     segments can be concatenated byte for byte, without re-encoding.
+# ─────────────────────────────────────────────────────────────────────────────
+
+TTS_SEGMENT_THRESHOLD = 300   # chars — shorter texts go out as one request
+TTS_SEGMENT_CHARS = 200       # target segment size when splitting
+
+_SENTENCE_END = re.compile(r"(?<=[.!?…;:])\s+")
+_CLAUSE_END = re.compile(r"(?<=[,、，])\s+")
+
+
+def split_tts_segments(text: str, max_chars: int = TTS_SEGMENT_CHARS) -> List[str]:
+    """
+    Split text into segments of at most ~max_chars, cutting at sentence ends,
+    then at clause boundaries, then between words — never inside a word.
+    Neighbouring short sentences are packed together so we don't pay a
+    round trip per "Yes." or "Thank you.".
+    """
+    pieces = []
+    for sentence in _SENTENCE_END.split(text.strip()):
+        if len(sentence) <= max_chars:
+            pieces.append(sentence)
+            continue
+        for clause in _CLAUSE_END.split(sentence):
+            while len(clause) > max_chars:
+                cut = clause.rfind(" ", 0, max_chars)
+                if cut <= 0:
+                    cut = max_chars
+                pieces.append(clause[:cut])
+                clause = clause[cut:].lstrip()
+            if clause:
+                pieces.append(clause)
+
+    segments = []
+    for piece in pieces:
+        if not piece.strip():
+            continue
+        if segments and len(segments[-1]) + 1 + len(piece) <= max_chars:
+            segments[-1] = f"{segments[-1]} {piece}"
+        else:
+            segments.append(piece)
+    return segments
+
+
+def synthesize_segments(
+    segments: List[str],
+    language: str,
+    slow: bool,
+    concurrency: int,
+    path: str,
+    timeout: Optional[float] = None,
+):
+    """
+    gTTS each segment on a bounded pool and write the audio to `path` in
+    segment order. Any failed segment fails the whole file (raises), so a
+    reply is never silently missing a sentence. `timeout` applies to each
+    gTTS request.
+    """
+    import io
+    from concurrent.futures import ThreadPoolExecutor
+    from gtts import gTTS
+
+    def _one(segment: str) -> bytes:
+        buf = io.BytesIO()
+        gTTS(text=segment, lang=language, slow=slow, timeout=timeout).write_to_fp(buf)
+        return buf.getvalue()
+
+    with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(segments)))) as pool:
+        # map() yields in submission order, so the join below is ordered
+        with open(path, "wb") as fh:
+            for audio in pool.map(_one, segments):
+                fh.write(audio)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 1c. STREAMING TTS  (--stream-output: audio is written while it is synthesized)
+#     Segments are still synthesized in parallel, but segment N is written out
+#     chunk by chunk as soon as segments 0..N-1 are out, so a client can start
+#     playback after the first sentence. A FIRST_AUDIO:<ms> line on stderr
+#     marks the moment the first bytes were flushed.
+# ─────────────────────────────────────────────────────────────────────────────
+
+STREAM_COPY_CHUNK = 64 * 1024
+
+
+def open_stream_output(target: str):
+    """'-' → binary stdout; anything else (file, FIFO) is opened for writing."""
+    if target == "-":
+        return sys.stdout.buffer
+    os.makedirs(os.path.dirname(target) or ".", exist_ok=True)
+    return open(target, "wb")
+
+
+def stream_text_to_speech(
+    text: str,
+    out,
+    language: str = "en",
+    speed: float = 1.0,
+    tts_concurrency: int = 4,
+) -> int:
+    """
+    gTTS `text` into the binary file object `out`, flushing after every chunk.
+
+    Returns:
+        Number of bytes written.
+
+    Raises:
+        Any gTTS / network error — bytes already written stay written.
+    """
+    import queue
+    import threading
+    import time
+    from speech_cache import AudioStore, get_audio_store
+
+    cache_key = AudioStore.make_key(text, language, "gtts", "female", speed, "mp3")
+    store = get_audio_store()
+    cached = store.lookup(cache_key, "mp3") if store else None
+    speech_metrics.flag("tts_cache_hit", cached is not None)
+
+    written = 0
+
+    def _emit(chunk: bytes):
+        nonlocal written
+        if not chunk:
+            return
+        out.write(chunk)
+        out.flush()
+        if written == 0:
+            metrics = speech_metrics.current()
+            if metrics is not None:
+                first_ms = round((time.perf_counter() - metrics.started) * 1000.0, 2)
+                metrics.flag("first_audio_ms", first_ms)
+                print(f"FIRST_AUDIO:{first_ms}", file=sys.stderr, flush=True)
+            else:
+                print("FIRST_AUDIO:", file=sys.stderr, flush=True)
+        written += len(chunk)
+
+    if cached:
+        with speech_metrics.stage("write") as m, open(cached, "rb") as fh:
+            for chunk in iter(lambda: fh.read(STREAM_COPY_CHUNK), b""):
+                _emit(chunk)
+            m["bytes"] = written
+        return written
+
+    from gtts import gTTS
+
+    slow = 0.5 <= speed < 1.0
+    request_timeout = speech_deadline.timeout()
+    segments = [text]
+    if tts_concurrency > 1 and len(text) > TTS_SEGMENT_THRESHOLD:
+        segments = split_tts_segments(text)
+
+    # One queue per segment; workers fill them, we drain them strictly in order
+    queues = [queue.Queue() for _ in segments]
+    done = object()
+    cancelled = threading.Event()
+    next_segment = iter(range(len(segments)))
+    next_lock = threading.Lock()
+
+    def _worker():
+        while not cancelled.is_set():
+            with next_lock:
+                i = next(next_segment, None)
+            if i is None:
+                return
+            try:
+                tts = gTTS(text=segments[i], lang=language, slow=slow, timeout=request_timeout)
+                for chunk in tts.stream():
+                    queues[i].put(chunk)
+                    if cancelled.is_set():
+                        return
+                queues[i].put(done)
+            except Exception as e:
+                queues[i].put(e)
+
+    threads = [
+        threading.Thread(target=_worker, daemon=True)
+        for _ in range(max(1, min(tts_concurrency, len(segments))))
+    ]
+    produced = []
+    with speech_metrics.stage("tts", chars=len(text), segments=len(segments)) as m:
+        for t in threads:
+            t.start()
+        try:
+            for q in queues:
+                while True:
+                    item = q.get()
+                    if item is done:
+                        break
+                    if isinstance(item, Exception):
+                        raise item
+                    produced.append(item)
+                    _emit(item)
+        finally:
+            cancelled.set()
+        m["bytes"] = written
+
+    if store:
+        audio = b"".join(produced)
+
+        def _write(path):
+            with open(path, "wb") as fh:
+                fh.write(audio)
+
+        store.write(cache_key, "mp3", _write)
+    return written
+
+
+def stream_to_output(text: str, target: str, language: str = "en", tts_concurrency: int = 4) -> int:
+    """Stream TTS of `text` to a --stream-output target ('-', a file or a FIFO)."""
+    if target == "-":
+        import json
+
+        # stdout carries the audio now — the translated text goes out first, on stderr
+        print(f"TEXT:{json.dumps(text, ensure_ascii=False)}", file=sys.stderr, flush=True)
+
+    out = open_stream_output(target)
+    try:
+        return stream_text_to_speech(text, out, language=language, tts_concurrency=tts_concurrency)
+    finally:
+        if out is not sys.stdout.buffer:
+            out.close()
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # 2a. AUDIO CONVERSION  (mp3 / mp4 / ogg / m4a → wav 16kHz mono)
 #     SpeechRecognition only reads WAV — ffmpeg handles everything else.
 # ─────────────────────────────────────────────────────────────────────────────
 
+MAX_AUDIO_SECONDS = float(os.environ.get("SPEECH_MAX_AUDIO_SECONDS", 1800))        # 30 min
+MAX_PCM_BYTES = int(os.environ.get("SPEECH_MAX_PCM_BYTES", 64 * 1024 * 1024))       # ~35 min @ 16 kHz
+PCM_READ_CHUNK = 64 * 1024
+
+# First audio stream only — video, subtitle and data streams are never decoded
+AUDIO_ONLY_ARGS = ["-map", "0:a:0", "-vn", "-sn", "-dn"]
+
+# Video uploads (phone recordings): the first audio track is stream-copied out
+# of the container once, and every ffmpeg run after that reads the small copy
+# instead of demuxing the whole video again. SPEECH_VIDEO_EXTRACT=0 disables it.
+VIDEO_EXTENSIONS = (".mp4", ".m4v", ".mov", ".3gp", ".mkv", ".webm")
+COPYABLE_AUDIO_CODECS = ("aac", "mp3", "opus", "vorbis", "flac", "alac", "ac3", "eac3")
+VIDEO_EXTRACT = os.environ.get("SPEECH_VIDEO_EXTRACT", "1").lower() not in ("0", "false", "no")
+PROBE_TIMEOUT_S = 10.0
+
+
+def probe_media(input_path: str, timeout: float = PROBE_TIMEOUT_S) -> Optional[dict]:
+    """
+    ffprobe the first audio stream of a file, giving up after `timeout` s.
+
+    Returns:
+        {"codec", "sample_rate", "channels", "duration"} — {} when the file
+        has no audio stream, None when ffprobe is missing or fails.
+    """
+    import json
+
+    try:
+        result = subprocess.run(
+            [
+                "ffprobe",
+                "-v", "error",
+                "-select_streams", "a:0",
+                "-show_entries", "stream=codec_name,sample_rate,channels:format=duration",
+                "-of", "json",
+                input_path,
+            ],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            timeout=speech_deadline.timeout(timeout, reserve=DEADLINE_TRANSLATE_RESERVE_S),
+        )
+        info = json.loads(result.stdout) if result.returncode == 0 else None
+    except (FileNotFoundError, subprocess.TimeoutExpired, speech_deadline.DeadlineExceeded, ValueError):
+        return None
+    if info is None:
+        print(f"ffprobe error: {result.stderr.decode(errors='replace').strip()}", file=sys.stderr)
+        return None
+
+    streams = info.get("streams") or []
+    if not streams:
+        return {}
+    duration = (info.get("format") or {}).get("duration")
+    return {
+        "codec": streams[0].get("codec_name"),
+        "sample_rate": int(streams[0].get("sample_rate") or 0),
+        "channels": int(streams[0].get("channels") or 0),
+        "duration": float(duration) if duration not in (None, "N/A") else None,
+    }
+
+
+def extract_audio_track(input_path: str) -> Optional[str]:
+    """
+    Stream-copy (no decode, no re-encode) the first audio track of a video
+    into a Matroska file in the ConversionStore, shared and refcounted like
+    converted WAVs. Hand it back with release_converted() when done.
+
+    Returns:
+        Path of the audio-only file, or None when the codec can't be copied
+        or ffprobe/ffmpeg aren't usable — callers then read the video itself.
+    """
+    from speech_cache import ConversionStore, fingerprint_file, get_conversion_store
+
+    store = get_conversion_store()
+    if store is None:
+        return None
+
+    def _copy(path: str) -> bool:
+        # Only runs when no other request has extracted this upload yet
+        probe = probe_media(input_path)
+        if not probe or probe.get("codec") not in COPYABLE_AUDIO_CODECS:
+            return False
+        result = subprocess.run(
+            [
+                "ffmpeg", "-y", "-nostdin",
+                "-i", input_path,
+                *AUDIO_ONLY_ARGS,
+                "-t", str(MAX_AUDIO_SECONDS),   # duration cap
+                "-c:a", "copy",                  # packets as they are
+                "-f", "matroska",                # holds any of COPYABLE_AUDIO_CODECS
+                path,
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            timeout=speech_deadline.timeout(reserve=DEADLINE_TRANSLATE_RESERVE_S),
+        )
+        if result.returncode != 0:
+            print(f"Audio track copy failed (code {result.returncode}): "
+                  f"{result.stderr.decode(errors='replace').strip()}", file=sys.stderr)
+            return False
+        return True
+
+    try:
+        with speech_metrics.stage("extract", bytes_in=os.path.getsize(input_path)) as m:
+            key = ConversionStore.make_key(fingerprint_file(input_path), "audio-copy", MAX_AUDIO_SECONDS)
+            track = store.acquire(key, "mka", _copy)
+            m["bytes_out"] = os.path.getsize(track) if track else 0
+    except (subprocess.TimeoutExpired, speech_deadline.DeadlineExceeded):
+        print("Audio track copy stopped: the request deadline ran out.", file=sys.stderr)
+        return None
+    except FileNotFoundError:
+        return None   # no ffmpeg — the regular conversion reports it
+
+    if track:
+        print(f"Extracted audio track: {track}", file=sys.stderr)
+    return track
+
+
+@contextmanager
+def audio_source(input_path: str):
+    """
+    The file ffmpeg should read for `input_path`: the extracted audio track
+    for video uploads (see extract_audio_track), the file itself otherwise.
+    Nested uses share one extraction.
+    """
+    track = None
+    if VIDEO_EXTRACT and input_path.lower().endswith(VIDEO_EXTENSIONS):
+        track = extract_audio_track(input_path)
+    try:
+        yield track or input_path
+    finally:
+        if track:
+            release_converted(track)
+
+
 def convert_to_wav(input_path: str) -> Optional[str]:
     """
     Convert any audio/video file to a 16kHz mono WAV suitable for
     Google Speech Recognition.
 
     - If the file is already .wav it is returned as-is (no re-encode).
+    - Otherwise the WAV is named by a digest of the input's content and
+      shared: concurrent requests for the same upload run ffmpeg once.
+      Hand it back with release_converted() when done.
+    - Video uploads are read through audio_source(): first audio track only,
+      copied out of the container once.
     - Requires ffmpeg to be installed on the system.
 
     Args:
@@ -192,17 +628,16 @@ def convert_to_wav(input_path: str) -> Optional[str]:
     if input_path.lower().endswith(".wav"):
         return input_path
 
-    wav_path = os.path.join(
-        tempfile.gettempdir(),
-        f"stt_converted_{abs(hash(input_path))}.wav"
-    )
+    from speech_cache import ConversionStore, fingerprint_file, get_conversion_store
 
-    try:
+    def _ffmpeg(source: str, wav_path: str) -> bool:
         result = subprocess.run(
             [
                 "ffmpeg",
                 "-y",              # overwrite output without asking
-                "-i", input_path,  # input file (any format ffmpeg supports)
+                "-i", source,      # input file (any format ffmpeg supports)
+                *AUDIO_ONLY_ARGS,
+                "-t", str(MAX_AUDIO_SECONDS),   # duration cap
                 "-ar", "16000",    # sample rate: 16kHz (optimal for Google STT)
                 "-ac", "1",        # channels: mono
                 "-f",  "wav",      # force wav container
@@ -210,18 +645,49 @@ def convert_to_wav(input_path: str) -> Optional[str]:
             ],
             stdout=subprocess.DEVNULL,
             stderr=subprocess.PIPE,
+            timeout=speech_deadline.timeout(reserve=DEADLINE_TRANSLATE_RESERVE_S),
         )
 
         if result.returncode != 0:
             print(
-                f"ffmpeg error (code {result.returncode}): {result.stderr.decode().strip()}",
+                f"ffmpeg error (code {result.returncode}): {result.stderr.decode(errors='replace').strip()}",
                 file=sys.stderr,
             )
+            return False
+        return True
+
+    try:
+        store = get_conversion_store()
+        if store is not None:
+            key = ConversionStore.make_key(fingerprint_file(input_path), "wav", 16000, 1)
+            # Share a finished conversion as is; otherwise extract the audio
+            # track first — not inside acquire(), which holds the wav's lock
+            wav_path = store.acquire(key, "wav", None)
+            if wav_path is None:
+                with audio_source(input_path) as source:
+                    wav_path = store.acquire(key, "wav", lambda path: _ffmpeg(source, path))
+        else:
+            # No shared store — a private temp file, deleted by release_converted()
+            fd, wav_path = tempfile.mkstemp(prefix="stt_converted_", suffix=".wav")
+            os.close(fd)
+            converted = False
+            try:
+                with audio_source(input_path) as source:
+                    converted = _ffmpeg(source, wav_path)
+            finally:
+                if not converted:
+                    os.unlink(wav_path)
+            wav_path = wav_path if converted else None
+
+        if wav_path is None:
             return None
 
         print(f"Converted to wav: {wav_path}", file=sys.stderr)
         return wav_path
 
+    except (subprocess.TimeoutExpired, speech_deadline.DeadlineExceeded):
+        print("Conversion stopped: the request deadline ran out.", file=sys.stderr)
+        return None
     except FileNotFoundError:
         print(
             "ffmpeg not found. Install it:\n"
@@ -235,16 +701,550 @@ def convert_to_wav(input_path: str) -> Optional[str]:
         return None
 
 
+def release_converted(path: str):
+    """
+    Hand back a file from convert_to_wav() or extract_audio_track() — the
+    last user of a shared conversion removes it.
+    """
+    from speech_cache import get_conversion_store
+
+    store = get_conversion_store()
+    if store is not None and store.owns(path):
+        store.release(path)
+    elif os.path.exists(path):
+        os.unlink(path)
+
+
+def decode_pcm(
+    input_path: str,
+    max_seconds: float = MAX_AUDIO_SECONDS,
+    max_bytes: int = MAX_PCM_BYTES,
+) -> Optional[bytes]:
+    """
+    Decode any audio/video file to raw 16kHz mono s16le PCM through an ffmpeg
+    pipe — no temp WAV on disk.
+
+    ffmpeg stops after `max_seconds`, and reading stops once `max_bytes` have
+    arrived, so a huge upload is truncated instead of exhausting memory.
+
+    Args:
+        input_path: Path to the source audio file.
+        max_seconds: Maximum duration to decode.
+        max_bytes:   Memory ceiling for the decoded PCM.
+
+    Returns:
+        PCM bytes, or None on failure.
+    """
+    if not os.path.exists(input_path):
+        print(f"decode_pcm: file not found: {input_path}", file=sys.stderr)
+        return None
+
+    with audio_source(input_path) as source:
+        try:
+            time_limit = speech_deadline.timeout(reserve=DEADLINE_TRANSLATE_RESERVE_S)
+        except speech_deadline.DeadlineExceeded:
+            print("Decode skipped: the request deadline ran out.", file=sys.stderr)
+            return None
+        return _decode_pcm(source, max_seconds, max_bytes, time_limit)
+
+
+def _decode_pcm(source: str, max_seconds: float, max_bytes: int, time_limit: Optional[float]) -> Optional[bytes]:
+    # Only stdout is read while ffmpeg runs, so stderr goes to a file: a pipe
+    # nobody drains would block ffmpeg once a noisy input filled it
+    errors = tempfile.TemporaryFile()
+    try:
+        proc = subprocess.Popen(
+            [
+                "ffmpeg",
+                "-nostdin",
+                "-loglevel", "error",
+                "-nostats",
+                "-i", source,
+                *AUDIO_ONLY_ARGS,
+                "-t", str(max_seconds),  # duration cap
+                "-ar", "16000",          # sample rate: 16kHz (optimal for Google STT)
+                "-ac", "1",              # channels: mono
+                "-f", "s16le",           # raw PCM, no container
+                "pipe:1",
+            ],
+            stdout=subprocess.PIPE,
+            stderr=errors,
+        )
+    except FileNotFoundError:
+        errors.close()
+        print(
+            "ffmpeg not found. Install it:\n"
+            "  macOS : brew install ffmpeg\n"
+            "  Ubuntu: sudo apt install ffmpeg",
+            file=sys.stderr,
+        )
+        return None
+
+    import threading
+
+    # The blocking read below can't time out by itself — kill ffmpeg instead
+    out_of_time = threading.Event()
+    watchdog = None
+    if time_limit is not None:
+        watchdog = threading.Timer(time_limit, lambda: (out_of_time.set(), proc.kill()))
+        watchdog.daemon = True
+        watchdog.start()
+
+    pcm = bytearray()
+    truncated = False
+    try:
+        while True:
+            chunk = proc.stdout.read(PCM_READ_CHUNK)
+            if not chunk:
+                break
+            room = max_bytes - len(pcm)
+            if len(chunk) >= room:
+                pcm += chunk[:room]
+                truncated = True
+                proc.kill()
+                break
+            pcm += chunk
+        proc.communicate()
+        errors.seek(0)
+        err = errors.read().decode(errors="replace")
+    except Exception as e:
+        proc.kill()
+        proc.wait()
+        print(f"Unexpected decode error: {e}", file=sys.stderr)
+        return None
+    finally:
+        errors.close()
+        if watchdog is not None:
+            watchdog.cancel()
+
+    if out_of_time.is_set():
+        print("Decode stopped: the request deadline ran out.", file=sys.stderr)
+        return None
+
+    if proc.returncode != 0 and not truncated:
+        print(f"ffmpeg error (code {proc.returncode}): {err.strip()}", file=sys.stderr)
+        return None
+
+    if truncated:
+        print(f"Decoded audio hit the {max_bytes}-byte ceiling — truncated.", file=sys.stderr)
+    print(f"Decoded {len(pcm) / 32000:.1f}s of PCM via pipe.", file=sys.stderr)
+    return bytes(pcm)
+
+
+_FFMPEG_DURATION = re.compile(r"Duration: (\d+):(\d{2}):(\d{2}(?:\.\d+)?)")
+
+
+def encode_flac(input_path: str, max_seconds: float = MAX_AUDIO_SECONDS) -> Tuple[Optional[bytes], Optional[float]]:
+    """
+    Encode any audio/video file straight to 16kHz mono FLAC — the format the
+    Google endpoint takes — in one ffmpeg run, read from its stdout.
+
+    recognize_google() would otherwise decode to WAV and then re-encode that
+    to FLAC with the bundled flac binary: one subprocess and one full encode
+    more, per request.
+
+    Args:
+        input_path:  Path to the source audio file.
+        max_seconds: Maximum duration to encode.
+
+    Returns:
+        (FLAC bytes, duration of the source in seconds or None if ffmpeg
+        didn't report one). The bytes are None on failure.
+    """
+    if not os.path.exists(input_path):
+        print(f"encode_flac: file not found: {input_path}", file=sys.stderr)
+        return None, None
+
+    try:
+        with audio_source(input_path) as source:
+            result = subprocess.run(
+                [
+                    "ffmpeg",
+                    "-nostdin",
+                    "-i", source,
+                    *AUDIO_ONLY_ARGS,
+                    "-t", str(max_seconds),   # duration cap
+                    "-ar", "16000",           # sample rate: 16kHz (optimal for Google STT)
+                    "-ac", "1",               # channels: mono
+                    "-sample_fmt", "s16",     # the endpoint wants 16-bit samples
+                    "-f", "flac",
+                    "pipe:1",
+                ],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                timeout=speech_deadline.timeout(reserve=DEADLINE_TRANSLATE_RESERVE_S),
+            )
+    except (subprocess.TimeoutExpired, speech_deadline.DeadlineExceeded):
+        print("Encoding stopped: the request deadline ran out.", file=sys.stderr)
+        return None, None
+    except FileNotFoundError:
+        print(
+            "ffmpeg not found. Install it:\n"
+            "  macOS : brew install ffmpeg\n"
+            "  Ubuntu: sudo apt install ffmpeg",
+            file=sys.stderr,
+        )
+        return None, None
+
+    err = result.stderr.decode(errors="replace")
+    if result.returncode != 0 or not result.stdout:
+        print(f"ffmpeg error (code {result.returncode}): {err.strip()}", file=sys.stderr)
+        return None, None
+
+    match = _FFMPEG_DURATION.search(err)
+    duration = None
+    if match:
+        hours, minutes, seconds = match.groups()
+        duration = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+    print(f"Encoded {len(result.stdout)} bytes of FLAC via pipe.", file=sys.stderr)
+    return result.stdout, duration
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 2b. LONG AUDIO  (split on silence → recognise segments in parallel → stitch)
+#     One giant recognize_google request is slow and often rejected for long
+#     files, so anything over LONG_AUDIO_THRESHOLD_S goes through here.
+# ─────────────────────────────────────────────────────────────────────────────
+
+LONG_AUDIO_THRESHOLD_S = 50.0   # the free Google endpoint struggles past ~1 minute
+LONG_AUDIO_SEGMENT_S = 30.0
+
+
+def _recognize(recognizer, audio, language: str, deadline=None) -> str:
+    """
+    recognize_google() through the resilience layer: retries RequestError,
+    hedges slow calls, and fails fast while the STT circuit is open.
+    UnknownValueError ("no speech") is an answer, not an outage.
+    """
+    import speech_recognition as sr
+    import speech_resilience
+
+    return speech_resilience.call(
+        "stt",
+        lambda: recognizer.recognize_google(audio, language=language),
+        permanent=(sr.UnknownValueError,),
+        deadline=deadline,
+        retryable=(sr.RequestError,),
+    )
+
+
+def _flac_upload_available() -> bool:
+    """Whether this SpeechRecognition exposes the Google request helpers _recognize_flac needs."""
+    import importlib.util
+
+    try:
+        return importlib.util.find_spec("speech_recognition.recognizers.google") is not None
+    except ImportError:
+        return False
+
+
+def _recognize_flac(flac: bytes, language: str, timeout: Optional[float] = None, rate: int = 16000) -> str:
+    """
+    recognize_google() for audio that is already FLAC: the request the
+    library would build, minus its WAV → FLAC re-encode. Goes through the
+    resilience layer like _recognize().
+    """
+    from urllib.request import Request
+
+    import speech_recognition as sr
+    import speech_resilience
+    from speech_recognition.recognizers.google import (
+        ENDPOINT,
+        OutputParser,
+        create_request_builder,
+        obtain_transcription,
+    )
+
+    url = create_request_builder(endpoint=ENDPOINT, language=language).build_url()
+    parser = OutputParser(show_all=False, with_confidence=False)
+
+    def _once():
+        request = Request(url, data=flac, headers={"Content-Type": f"audio/x-flac; rate={rate}"})
+        return parser.parse(obtain_transcription(request, timeout=timeout))
+
+    return speech_resilience.call("stt", _once, permanent=(sr.UnknownValueError,), retryable=(sr.RequestError,))
+
+
+def _recognize_segment(recognizer, audio, language: str, deadline=None) -> Tuple[str, int]:
+    """
+    Recognise one segment. Returns (text, attempts) — attempts includes
+    retries and hedged duplicates.
+
+    `deadline` is passed in explicitly — this runs on pool threads, which
+    don't see the request's context — and stops retries that can't finish.
+    """
+    import speech_recognition as sr
+    import speech_resilience
+
+    attempts = 0
+
+    def _once():
+        nonlocal attempts
+        attempts += 1
+        return recognizer.recognize_google(audio, language=language)
+
+    try:
+        text = speech_resilience.call(
+            "stt", _once, permanent=(sr.UnknownValueError,), deadline=deadline, retryable=(sr.RequestError,),
+        )
+    except sr.UnknownValueError:
+        return "", attempts            # silence / noise — nothing to retry
+    return text, attempts
+
+
+def recognize_long_audio(
+    recognizer,
+    audio,
+    language: str = "en-US",
+    concurrency: int = 4,
+    max_segment_s: float = LONG_AUDIO_SEGMENT_S,
+) -> Optional[str]:
+    """
+    Recognise long audio by splitting it on silence into bounded segments and
+    sending them to Google concurrently.
+
+    Args:
+        recognizer:    speech_recognition.Recognizer to use for every segment.
+        audio:         speech_recognition.AudioData holding the whole recording.
+        language:      BCP-47 language code.
+        concurrency:   Max segments in flight at once.
+        max_segment_s: Upper bound on segment length in seconds.
+
+    Returns:
+        The stitched transcript, or None if nothing was recognised.
+
+    Raises:
+        sr.RequestError when a segment failed (see _stitch_segments).
+    """
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+
+    import speech_recognition as sr
+    from speech_audio import DEFAULT_RATE, SAMPLE_WIDTH, split_on_silence
+
+    pcm = audio.get_raw_data(convert_rate=DEFAULT_RATE, convert_width=SAMPLE_WIDTH)
+    bounds = split_on_silence(pcm, DEFAULT_RATE, max_segment_s=max_segment_s)
+    bytes_per_s = DEFAULT_RATE * SAMPLE_WIDTH
+    metrics = speech_metrics.current()   # pool threads don't inherit the request context
+    deadline = speech_deadline.current()
+    print(f"Long audio: {len(pcm) / bytes_per_s:.1f}s in {len(bounds)} segments.", file=sys.stderr)
+
+    def _run(index: int, start: int, end: int):
+        segment = sr.AudioData(pcm[start:end], DEFAULT_RATE, SAMPLE_WIDTH)
+        t0 = time.perf_counter()
+        try:
+            text, attempts = _recognize_segment(recognizer, segment, language, deadline)
+        except Exception as e:
+            print(f"STT segment {index + 1}/{len(bounds)} failed: {e}", file=sys.stderr)
+            return e
+        if metrics is not None:
+            metrics.record("stt_segment", (time.perf_counter() - t0) * 1000.0, bytes=end - start)
+        print(
+            f"STT segment {index + 1}/{len(bounds)} "
+            f"[{start / bytes_per_s:.1f}s–{end / bytes_per_s:.1f}s] "
+            f"{time.perf_counter() - t0:.2f}s (attempts={attempts})",
+            file=sys.stderr,
+        )
+        return text
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        futures = [pool.submit(_run, i, start, end) for i, (start, end) in enumerate(bounds)]
+        parts = [f.result() for f in futures]
+
+    return _stitch_segments(parts, [(start / bytes_per_s, end / bytes_per_s) for start, end in bounds])
+
+
+STT_SEGMENTS_STAGE = "stt_segments"
+
+
+def _stitch_segments(parts: list, spans: list) -> Optional[str]:
+    """
+    Join long-audio segment transcripts, in order.
+
+    A failed segment (its part is the exception) would leave a hole in the
+    transcript, so it fails the recording — unless the request has a
+    deadline: then the gapped transcript is returned and marked partial
+    (STT_SEGMENTS_STAGE skipped, the gaps noted as "stt_gaps" in seconds),
+    and the callers don't cache it.
+
+    Raises:
+        sr.RequestError when a segment failed and the result can't be partial.
+    """
+    import speech_recognition as sr
+
+    failed = [(i, e) for i, e in enumerate(parts) if isinstance(e, BaseException)]
+    transcript = " ".join(p.strip() for p in parts if isinstance(p, str) and p.strip())
+    if failed:
+        first = failed[0][1]
+        if speech_deadline.current() is None or not transcript:
+            raise sr.RequestError(f"{len(failed)} of {len(parts)} segments failed: {first}") from first
+        speech_deadline.skip(STT_SEGMENTS_STAGE, speech_deadline.reason_for(first))
+        speech_deadline.note("stt_gaps", [[round(spans[i][0], 1), round(spans[i][1], 1)] for i, _ in failed])
+    return transcript or None
+
+
+def transcript_is_partial() -> bool:
+    """True when this request's transcript has gaps — it must not be cached."""
+    return speech_deadline.skipped(STT_SEGMENTS_STAGE)
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # 2. SPEECH-TO-TEXT
 # ─────────────────────────────────────────────────────────────────────────────
 
+VAD_ENABLED = os.environ.get("SPEECH_VAD", "1").lower() not in ("0", "false", "no")
+
+
+def trim_audio(audio):
+    """
+    VAD stage: drop leading/trailing silence and shorten long pauses in an
+    sr.AudioData before it is uploaded (see speech_audio.trim_silence).
+    """
+    import speech_recognition as sr
+    from speech_audio import DEFAULT_RATE, SAMPLE_WIDTH, trim_silence
+
+    pcm = audio.get_raw_data(convert_rate=DEFAULT_RATE, convert_width=SAMPLE_WIDTH)
+    with speech_metrics.stage("vad", bytes_in=len(pcm)) as m:
+        trimmed, removed = trim_silence(pcm, DEFAULT_RATE)
+        m["bytes_out"] = len(trimmed)
+        m["removed_s"] = round(removed, 2)
+
+    if removed <= 0:
+        return audio
+    total = len(pcm) / float(DEFAULT_RATE * SAMPLE_WIDTH)
+    print(f"VAD: removed {removed:.1f}s of {total:.1f}s (silence and long pauses).", file=sys.stderr)
+    return sr.AudioData(trimmed, DEFAULT_RATE, SAMPLE_WIDTH)
+
+
+MIC_RECALIBRATE = os.environ.get("SPEECH_RECALIBRATE", "").lower() in ("1", "true", "yes")
+CALIBRATION_S = 1.0
+CALIBRATION_FIELDS = (
+    "energy_threshold",
+    "dynamic_energy_threshold",
+    "dynamic_energy_adjustment_damping",
+    "dynamic_energy_ratio",
+)
+
+
+def microphone_id(mic) -> str:
+    """Stable name for the input device behind an open `mic` — keys its saved calibration."""
+    name = None
+    audio = getattr(mic, "audio", None)   # PyAudio handle, set while an sr.Microphone is open
+    if audio is not None:
+        try:
+            index = getattr(mic, "device_index", None)
+            info = audio.get_device_info_by_index(index) if index is not None else audio.get_default_input_device_info()
+            name = info.get("name")
+        except Exception:
+            pass
+    path = getattr(mic, "filename_or_fileobject", None)   # wav_microphone
+    if name is None and isinstance(path, str):
+        name = f"file:{os.path.basename(path)}"
+    return f"{name or 'default'}@{mic.SAMPLE_RATE}"
+
+
+class MicCalibration:
+    """
+    Ambient-noise calibration for one open microphone, persisted per device
+    in speech_cache.CalibrationStore.
+
+    Installed as the microphone's stream, it watches every chunk
+    recognizer.listen() reads and folds the non-speech ones (below the
+    current threshold) into a running ambient estimate — the same weighted
+    average listen() uses. save() persists that estimate rather than the
+    recognizer's threshold, which listen() also drags up while someone is
+    speaking.
+    """
+
+    def __init__(self, recognizer, mic):
+        from speech_audio import SAMPLE_WIDTH
+
+        self.recognizer = recognizer
+        self.device = microphone_id(mic)
+        self.stream = mic.stream
+        self.seconds_per_buffer = mic.CHUNK / float(mic.SAMPLE_RATE)
+        self.tracking = mic.SAMPLE_WIDTH == SAMPLE_WIDTH   # the estimate reads s16le, like sr.Microphone
+        self.ambient_threshold = None
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.stream.read(size)
+        if data and self.tracking:
+            from speech_audio import rms
+
+            r = self.recognizer
+            energy = rms(data)
+            if energy <= r.energy_threshold:
+                current = self.ambient_threshold if self.ambient_threshold is not None else r.energy_threshold
+                damping = r.dynamic_energy_adjustment_damping ** self.seconds_per_buffer
+                self.ambient_threshold = current * damping + energy * r.dynamic_energy_ratio * (1 - damping)
+        return data
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)   # close(), exhausted …
+
+    def save(self):
+        """Persist the calibration for the next session (best effort)."""
+        from speech_cache import get_calibration_store
+
+        store = get_calibration_store()
+        if store is None:
+            return
+        state = {field: getattr(self.recognizer, field) for field in CALIBRATION_FIELDS}
+        if self.ambient_threshold is not None:
+            state["energy_threshold"] = self.ambient_threshold
+        try:
+            store.put(self.device, state)
+        except OSError as e:
+            print(f"Could not save mic calibration: {e}", file=sys.stderr)
+
+
+def calibrate_microphone(recognizer, mic, recalibrate: bool = MIC_RECALIBRATE) -> MicCalibration:
+    """
+    Set the recognizer's energy threshold for an open `mic`.
+
+    A calibration saved for this device is applied at once, and the
+    returned MicCalibration keeps refining it from the first frames the
+    session reads. Only without a saved state, once it is stale, or with
+    `recalibrate` does this sample CALIBRATION_S of ambient noise first.
+    Call save() on the result when done listening.
+    """
+    from speech_cache import get_calibration_store
+
+    calibration = MicCalibration(recognizer, mic)
+    store = get_calibration_store()
+    state = store.get(calibration.device) if store is not None and not recalibrate else None
+
+    if state is not None:
+        for field in CALIBRATION_FIELDS:
+            if field in state:
+                setattr(recognizer, field, state[field])
+        print(f"Using saved noise calibration for {calibration.device} "
+              f"(threshold {recognizer.energy_threshold:.0f}).", file=sys.stderr)
+        speech_metrics.flag("mic_calibration", "saved")
+    else:
+        print("Adjusting for ambient noise…", file=sys.stderr)
+        with speech_metrics.stage("calibrate"):
+            recognizer.adjust_for_ambient_noise(mic, duration=CALIBRATION_S)
+        speech_metrics.flag("mic_calibration", "full")
+        calibration.ambient_threshold = recognizer.energy_threshold
+        calibration.save()
+
+    mic.stream = calibration
+    return calibration
+
+
 def speech_to_text(
     language: str = "en-US",
     source: str = "mic",
     audio_file: Optional[str] = None,
     timeout: int = 5,
-    phrase_time_limit: int = 10
+    phrase_time_limit: int = 10,
+    long_audio: Optional[bool] = None,
+    stt_concurrency: int = 4,
+    decode: str = "file",
+    vad: bool = VAD_ENABLED,
+    recalibrate: bool = MIC_RECALIBRATE,
+    on_progress=None,
 ) -> Optional[str]:
     """
     Convert speech to text using Google Speech Recognition.
@@ -256,6 +1256,18 @@ def speech_to_text(
         audio_file:        Path to audio file when source='file'.
         timeout:           Seconds to wait before giving up listening.
         phrase_time_limit: Max recording duration in seconds.
+        long_audio:        Force (True) or disable (False) chunked recognition;
+                           None picks it for files over LONG_AUDIO_THRESHOLD_S.
+        stt_concurrency:   Max segments recognised in parallel in long-audio mode.
+        decode:            'file' converts to a temp WAV; 'pipe' streams PCM from
+                           ffmpeg's stdout (see decode_pcm); 'flac' has ffmpeg
+                           encode the upload directly (see encode_flac) —
+                           long files still go through PCM.
+        vad:               Trim silence and long pauses before upload (see trim_audio).
+        recalibrate:       Mic only — sample ambient noise even if a saved
+                           calibration exists (see calibrate_microphone).
+        on_progress:       File only — called as on_progress("decoded", {})
+                           once the audio is decoded, before recognition.
 
     Returns:
         Recognised text string, or None on failure.
@@ -268,7 +1280,8 @@ def speech_to_text(
         return None
 
     recognizer = sr.Recognizer()
-    _temp_wav = None  # track any temp file we create so we can clean up
+    _temp_wav = None  # converted wav we hold a reference to, released when done
+    sources = ExitStack()  # holds an extracted video audio track across decode attempts
 
     try:
         if source == "mic":
@@ -279,14 +1292,16 @@ def speech_to_text(
                 return None
 
             with mic:
-                print("Adjusting for ambient noise…", file=sys.stderr)
-                recognizer.adjust_for_ambient_noise(mic, duration=1)
+                calibration = calibrate_microphone(recognizer, mic, recalibrate=recalibrate)
                 print("Speak now…", file=sys.stderr)
                 audio = recognizer.listen(
                     mic,
                     timeout=timeout,
                     phrase_time_limit=phrase_time_limit
                 )
+            calibration.save()
+            if vad:
+                audio = trim_audio(audio)
 
         elif source == "file":
             if not audio_file:
@@ -296,43 +1311,117 @@ def speech_to_text(
                 print(f"Audio file not found: {audio_file}", file=sys.stderr)
                 return None
 
-            # ── Convert to WAV if needed ────────────────────────────────────
-            wav_file = convert_to_wav(audio_file)
-            if wav_file is None:
-                print("Could not convert audio to WAV. Aborting STT.", file=sys.stderr)
-                return None
-
-            # Track temp file for cleanup (only if a new file was created)
-            if wav_file != audio_file:
-                _temp_wav = wav_file
-
-            with sr.AudioFile(wav_file) as src:
-                audio = recognizer.record(src)
+            bytes_in = os.path.getsize(audio_file)
+            audio_file = sources.enter_context(audio_source(audio_file))
+
+            flac = None
+            with speech_metrics.stage("decode", bytes_in=bytes_in) as m:
+                if decode == "flac" and long_audio is not True and _flac_upload_available():
+                    # ── ffmpeg encodes the upload itself; no WAV, no re-encode ──
+                    # Auto mode only needs enough audio to tell short from long
+                    cap = MAX_AUDIO_SECONDS if long_audio is False else LONG_AUDIO_THRESHOLD_S + 1
+                    flac, source_s = encode_flac(audio_file, max_seconds=cap)
+                    if flac is None:
+                        print("Could not encode audio to FLAC. Aborting STT.", file=sys.stderr)
+                        return None
+                    if long_audio is None and (source_s is None or source_s > LONG_AUDIO_THRESHOLD_S):
+                        # No duration (streamed webm/ogg): the capped FLAC may be a fraction of it
+                        reason = "Long audio" if source_s is not None else "Unknown duration"
+                        print(f"{reason} — decoding PCM for chunked recognition instead.", file=sys.stderr)
+                        flac = None
+                    else:
+                        m["bytes_out"] = len(flac)
+                        m["format"] = "flac"
+
+                if flac is None and decode in ("pipe", "flac"):
+                    # ── Stream PCM straight from ffmpeg, no temp WAV ────────
+                    pcm = decode_pcm(audio_file)
+                    if not pcm:
+                        print("Could not decode audio. Aborting STT.", file=sys.stderr)
+                        return None
+                    audio = sr.AudioData(pcm, 16000, 2)
+
+                elif flac is None:
+                    # ── Convert to WAV if needed ────────────────────────────
+                    wav_file = convert_to_wav(audio_file)
+                    if wav_file is None:
+                        print("Could not convert audio to WAV. Aborting STT.", file=sys.stderr)
+                        return None
+
+                    # Track the converted file so it is released (only if one was created)
+                    if wav_file != audio_file:
+                        _temp_wav = wav_file
+
+                    with sr.AudioFile(wav_file) as src:
+                        audio = recognizer.record(src)
+
+                if flac is None:
+                    m["bytes_out"] = len(audio.frame_data)
+            speech_deadline.complete("decode")
+            if on_progress is not None:
+                on_progress("decoded", {})
+
+            if flac is not None:
+                # VAD needs PCM, so it doesn't run here — the upload is ffmpeg's FLAC as-is
+                with speech_metrics.stage("stt", bytes=len(flac), format="flac"):
+                    text = _recognize_flac(
+                        flac, language, timeout=speech_deadline.timeout(reserve=DEADLINE_TRANSLATE_RESERVE_S)
+                    )
+                print(f"Recognised: \"{text}\"", file=sys.stderr)
+                speech_deadline.complete("stt")
+                return text
+
+            if vad:
+                audio = trim_audio(audio)
+
+            # Leave room for the translation after recognition (None = library default)
+            recognizer.operation_timeout = speech_deadline.timeout(reserve=DEADLINE_TRANSLATE_RESERVE_S)
+
+            duration = len(audio.frame_data) / float(audio.sample_rate * audio.sample_width)
+            if long_audio or (long_audio is None and duration > LONG_AUDIO_THRESHOLD_S):
+                with speech_metrics.stage("stt", bytes=len(audio.frame_data), audio_s=round(duration, 2)):
+                    text = recognize_long_audio(
+                        recognizer, audio, language=language, concurrency=stt_concurrency
+                    )
+                if not text:
+                    print("Could not understand audio.", file=sys.stderr)
+                    return None
+                print(f"Recognised: \"{text}\"", file=sys.stderr)
+                speech_deadline.complete("stt")
+                return text
 
         else:
             print("Invalid source. Use 'mic' or 'file'.", file=sys.stderr)
             return None
 
-        text = recognizer.recognize_google(audio, language=language)
+        recognizer.operation_timeout = speech_deadline.timeout(reserve=DEADLINE_TRANSLATE_RESERVE_S)
+        with speech_metrics.stage("stt", bytes=len(audio.frame_data)):
+            text = _recognize(recognizer, audio, language)
         print(f"Recognised: \"{text}\"", file=sys.stderr)
+        speech_deadline.complete("stt")
         return text
 
+    except speech_deadline.DeadlineExceeded:
+        print("Speech recognition skipped: the request deadline ran out.", file=sys.stderr)
+        speech_deadline.skip("stt", "deadline")
     except sr.WaitTimeoutError:
         print("Listening timed out — no speech detected.", file=sys.stderr)
     except sr.UnknownValueError:
         print("Could not understand audio.", file=sys.stderr)
     except sr.RequestError as e:
         print(f"Google API error: {e}", file=sys.stderr)
+        speech_deadline.skip("stt", speech_deadline.reason_for(e))
     except Exception as e:
         print(f"Unexpected STT error: {e}", file=sys.stderr)
     finally:
-        # Clean up temp wav if we created one
-        if _temp_wav and os.path.exists(_temp_wav):
-            try:
-                os.unlink(_temp_wav)
-                print(f"Cleaned up temp wav: {_temp_wav}", file=sys.stderr)
-            except Exception:
-                pass
+        # Release the converted wav and any extracted audio track — each is
+        # removed once no other request is using it
+        try:
+            if _temp_wav:
+                release_converted(_temp_wav)
+            sources.close()
+        except Exception as e:
+            print(f"Could not release temp audio: {e}", file=sys.stderr)
 
     return None
 
@@ -360,9 +1449,6 @@ def translate_text(
         Translated text string, or an error message.
     """
 
-    translator = GoogleTranslator(source="en", target="es")
-    list_of_sources = translator.get_supported_languages(as_dict=True)
-
     if source_lang is None:
         source_lang = input("Enter the source language: ").strip()
     if target_lang is None:
@@ -373,15 +1459,9 @@ def translate_text(
     source_lang = source_lang.lower()
     target_lang = target_lang.lower()
 
-    source_ok = source_lang in list_of_sources or source_lang in list_of_sources.values()
-    target_ok = target_lang in list_of_sources or target_lang in list_of_sources.values()
-
-    if source_ok and target_ok:
+    if is_supported(source_lang) and is_supported(target_lang):
         try:
-            translated = GoogleTranslator(
-                source=source_lang,
-                target=target_lang
-            ).translate(text_to_translate)
+            translated = get_translator(source_lang, target_lang).translate(text_to_translate)
 
             print(f"Translated text: {translated}", file=sys.stderr)
 
@@ -405,6 +1485,138 @@ def translate_text(
 # 4. SPEECH-TO-SPEECH  (full pipeline)
 # ─────────────────────────────────────────────────────────────────────────────
 
+# --deadline-ms budgeting: decode/STT keep DEADLINE_TRANSLATE_RESERVE_S back
+# so there is still time to translate what was heard; gTTS is only attempted
+# with at least DEADLINE_TTS_MIN_S left; below that we speak offline or
+# return the text without audio.
+DEADLINE_TRANSLATE_RESERVE_S = 2.0
+DEADLINE_TTS_MIN_S = 3.0
+
+# Pipeline cache key: 'bytes' hashes the whole upload (exact re-uploads);
+# 'pcm-prefix' hashes the first PCM_PREFIX_SECONDS of decoded audio plus the
+# file size — one short ffmpeg run instead of reading a huge video in full.
+PIPELINE_FINGERPRINT = os.environ.get("SPEECH_PIPELINE_FINGERPRINT", "bytes")
+PCM_PREFIX_SECONDS = 20.0
+
+
+def audio_fingerprint(path: str, mode: str = PIPELINE_FINGERPRINT) -> Optional[str]:
+    """Fingerprint of an audio file for the pipeline cache, or None if it can't be taken."""
+    if mode == "pcm-prefix":
+        import hashlib
+
+        pcm = decode_pcm(path, max_seconds=PCM_PREFIX_SECONDS)
+        if not pcm:
+            return None
+        digest = hashlib.sha256(pcm)
+        digest.update(f"|{os.path.getsize(path)}".encode("ascii"))
+        return f"pcm:{digest.hexdigest()}"
+
+    from speech_cache import fingerprint_file
+
+    try:
+        return f"bytes:{fingerprint_file(path)}"
+    except OSError as e:
+        print(f"Could not fingerprint {path}: {e}", file=sys.stderr)
+        return None
+
+
+def _offline_tts_available() -> bool:
+    import importlib.util
+
+    return importlib.util.find_spec("pyttsx3") is not None
+
+
+def speak_within_deadline(
+    text: str,
+    language: str,
+    engine: str = "gtts",
+    play: bool = False,
+    save_path: Optional[str] = None,
+    tts_concurrency: int = 4,
+    stage: str = "tts",
+) -> Optional[str]:
+    """
+    text_to_speech_advanced(), degraded to fit the current request deadline:
+    with too little time left for gTTS it falls back to pyttsx3 (if installed)
+    or skips audio, and records what happened under `stage` for the PARTIAL:
+    report.
+    """
+    deadline = speech_deadline.current()
+    if deadline is not None and engine == "gtts" and deadline.remaining() < DEADLINE_TTS_MIN_S:
+        if not _offline_tts_available():
+            print("Skipping TTS: not enough time left before the deadline.", file=sys.stderr)
+            speech_deadline.skip(stage, "deadline")
+            return None
+        print("Little time left before the deadline — using offline TTS.", file=sys.stderr)
+        speech_deadline.note(f"{stage}_engine", "pyttsx3")
+        engine = "pyttsx3"
+
+    audio_file = text_to_speech_advanced(
+        text=text,
+        language=language,
+        engine=engine,
+        play=play,
+        save_path=save_path,
+        tts_concurrency=tts_concurrency,
+    )
+    if audio_file:
+        speech_deadline.complete(stage)
+    elif deadline is not None:
+        speech_deadline.skip(stage, "deadline" if deadline.remaining() < DEADLINE_TTS_MIN_S else "error")
+    return audio_file
+
+
+def _check_pipeline_languages(source_lang: str, target_langs: List[str]) -> bool:
+    supported = list(NIGERIAN_LANGUAGE_MAP["stt"].keys())
+
+    if source_lang not in supported:
+        print(f"Source language '{source_lang}' not supported. Choose from: {supported}", file=sys.stderr)
+        return False
+
+    for target_lang in target_langs:
+        if target_lang not in supported:
+            print(f"Target language '{target_lang}' not supported. Choose from: {supported}", file=sys.stderr)
+            return False
+    return True
+
+
+def _pipeline_lookup(
+    source: str,
+    audio_file: Optional[str],
+    source_lang: str,
+    target_langs: List[str],
+    fingerprint: str,
+) -> Tuple[object, Dict[str, str], Dict[str, dict]]:
+    """
+    Pipeline-cache keys and hits for a file recording, per target language.
+
+    Returns (cache, {target: key}, {target: entry}) — no keys when the
+    source isn't a file or caching is off.
+    """
+    if source != "file" or not audio_file or not os.path.exists(audio_file):
+        return None, {}, {}
+
+    from speech_cache import PipelineCache, get_pipeline_cache
+
+    pipeline_cache = get_pipeline_cache()
+    if pipeline_cache is None:
+        return None, {}, {}
+
+    with speech_metrics.stage("fingerprint", mode=fingerprint):
+        digest = audio_fingerprint(audio_file, fingerprint)
+    if not digest:
+        return None, {}, {}
+
+    keys, cached = {}, {}
+    for target_lang in target_langs:
+        keys[target_lang] = PipelineCache.make_key(digest, source_lang, target_lang)
+        entry = pipeline_cache.get(keys[target_lang])
+        if entry is not None:
+            cached[target_lang] = entry
+    speech_metrics.flag("pipeline_cache_hit", len(cached) == len(target_langs))
+    return pipeline_cache, keys, cached
+
+
 def speech_to_speech(
     source_lang: str = "english",
     target_lang: str = "yoruba",
@@ -416,77 +1628,278 @@ def speech_to_speech(
     save_output: Optional[str] = None,
     play: bool = True,
     do_tts: bool = True,
+    long_audio: Optional[bool] = None,
+    stt_concurrency: int = 4,
+    decode: str = "file",
+    vad: bool = VAD_ENABLED,
+    tts_concurrency: int = 4,
+    stream_output: Optional[str] = None,
+    fingerprint: str = PIPELINE_FINGERPRINT,
+    on_progress=None,
 ) -> Optional[str]:
     """
     Full speech-to-speech translation pipeline.
     Flow:  Microphone/File → (convert to WAV) → STT → Translate → TTS → Speaker/File
+
+    With `stream_output` ('-', a file or a FIFO) the translated speech is
+    streamed there as it is synthesized instead of being saved at the end.
+
+    For files, the transcript and translation are cached by audio fingerprint
+    (see audio_fingerprint), so a re-upload of the same recording skips
+    ffmpeg, STT and translation; its reply audio comes from the TTS store.
+
+    `on_progress(stage, fields)` is called as the pipeline moves on:
+    "decoded" (files only), "recognized" ({"transcript"}), "translated"
+    ({"translation"}) and, with TTS, "synthesized" ({"audio"}).
     """
 
     source_lang = source_lang.lower().strip()
     target_lang = target_lang.lower().strip()
 
-    supported = list(NIGERIAN_LANGUAGE_MAP["stt"].keys())
+    def _progress(stage: str, **fields):
+        if on_progress is not None:
+            on_progress(stage, fields)
 
-    if source_lang not in supported:
-        print(f"Source language '{source_lang}' not supported. Choose from: {supported}", file=sys.stderr)
+    if not _check_pipeline_languages(source_lang, [target_lang]):
         return None
 
-    if target_lang not in supported:
-        print(f"Target language '{target_lang}' not supported. Choose from: {supported}", file=sys.stderr)
-        return None
+    # ── Step 0 : Same recording seen before? ────────────────────────────────
+    pipeline_cache, keys, cached = _pipeline_lookup(source, audio_file, source_lang, [target_lang], fingerprint)
 
-    # ── Step 1 : Speech → Text (convert_to_wav happens inside speech_to_text) ──
-    recognized_text = speech_to_text(
-        language=NIGERIAN_LANGUAGE_MAP["stt"][source_lang],
-        source=source,
-        audio_file=audio_file,
-        timeout=timeout,
-        phrase_time_limit=phrase_time_limit
-    )
+    if cached:
+        recognized_text, translated_text = cached[target_lang]["transcript"], cached[target_lang]["translated"]
+        print(f"Pipeline cache hit: \"{recognized_text}\"", file=sys.stderr)
+        for stage in ("decode", "stt", "translate"):
+            speech_deadline.complete(stage)
+        _progress("decoded")
+        _progress("recognized", transcript=recognized_text)
 
-    if not recognized_text:
-        print("Speech recognition failed. Aborting.", file=sys.stderr)
-        return None
-
-    # ── Step 2 : Text → Translated Text ─────────────────────────────────────
-    if source_lang == target_lang:
-        translated_text = recognized_text
     else:
-        try:
-            translated_text = GoogleTranslator(
-                source=NIGERIAN_LANGUAGE_MAP["translate"][source_lang],
-                target=NIGERIAN_LANGUAGE_MAP["translate"][target_lang]
-            ).translate(recognized_text)
+        # ── Step 1 : Speech → Text (convert_to_wav happens inside speech_to_text) ──
+        recognized_text = speech_to_text(
+            language=NIGERIAN_LANGUAGE_MAP["stt"][source_lang],
+            source=source,
+            audio_file=audio_file,
+            timeout=timeout,
+            phrase_time_limit=phrase_time_limit,
+            long_audio=long_audio,
+            stt_concurrency=stt_concurrency,
+            decode=decode,
+            vad=vad,
+            on_progress=on_progress,
+        )
+
+        if not recognized_text:
+            print("Speech recognition failed. Aborting.", file=sys.stderr)
+            return None
+        _progress("recognized", transcript=recognized_text)
 
-            if not translated_text:
-                print("Translation returned empty result.", file=sys.stderr)
+        # ── Step 2 : Text → Translated Text ─────────────────────────────────
+        if source_lang == target_lang:
+            translated_text = recognized_text
+        else:
+            try:
+                translated_text = _translate_nigerian_text(source_lang, target_lang, recognized_text)
+            except Exception as e:
+                print(f"Translation error: {e}", file=sys.stderr)
+                # Under a deadline, the transcript is still worth reporting
+                speech_deadline.skip("translate", speech_deadline.reason_for(e))
+                speech_deadline.note("transcript", recognized_text)
                 return None
+        speech_deadline.complete("translate")
 
-        except Exception as e:
-            print(f"Translation error: {e}", file=sys.stderr)
-            return None
+        if keys and not transcript_is_partial():
+            pipeline_cache.put(keys[target_lang], recognized_text, translated_text)
+    _progress("translated", translation=translated_text)
 
     # ── Step 3 : Translated Text → Speech ───────────────────────────────────
-    if do_tts:
+    if stream_output:
+        tts_lang = resolve_tts_language(NIGERIAN_LANGUAGE_MAP["tts"][target_lang], engine="gtts")
+        try:
+            stream_to_output(translated_text, stream_output, language=tts_lang, tts_concurrency=tts_concurrency)
+            speech_deadline.complete("tts")
+        except Exception as e:
+            print(f"Streaming TTS error: {e}", file=sys.stderr)
+            if speech_deadline.current() is None:
+                return None
+            speech_deadline.skip("tts", speech_deadline.reason_for(e))
+
+    elif do_tts:
         tts_lang = resolve_tts_language(
             NIGERIAN_LANGUAGE_MAP["tts"][target_lang],
             engine=engine
         )
 
-        text_to_speech_advanced(
-            text=translated_text,
-            language=tts_lang,
+        reply_audio = speak_within_deadline(
+            translated_text,
+            tts_lang,
             engine=engine,
             play=play,
-            save_path=save_output
+            save_path=save_output,
+            tts_concurrency=tts_concurrency,
         )
 
-        if save_output:
+        if save_output and reply_audio:
             print(f"Output saved to: {save_output}", file=sys.stderr)
+        if reply_audio:
+            _progress("synthesized", audio=reply_audio)
 
     return translated_text
 
 
+def target_output_path(save_output: Optional[str], target_lang: str) -> Optional[str]:
+    """Per-target audio path for a fan-out: 'reply.mp3' → 'reply.hausa.mp3'."""
+    if not save_output:
+        return None
+    root, ext = os.path.splitext(save_output)
+    return f"{root}.{target_lang}{ext or '.mp3'}"
+
+
+def fan_out_targets(
+    text: str,
+    source_lang: str,
+    target_langs: List[str],
+    engine: str = "gtts",
+    save_output: Optional[str] = None,
+    do_tts: bool = True,
+    tts_concurrency: int = 4,
+    translations: Optional[Dict[str, str]] = None,
+) -> List[dict]:
+    """
+    Translate `text` into every target language and synthesize each reply,
+    all targets concurrently.
+
+    Args:
+        translations: Targets whose translation is already known (pipeline
+                      cache hits) — only their TTS runs.
+
+    Returns:
+        One dict per target, in order: {"target", "output", "audio"} or
+        {"target", "error"}. Deadline stages are named "translate:<target>"
+        and "tts:<target>".
+    """
+    import contextvars
+    from concurrent.futures import ThreadPoolExecutor
+
+    translations = translations or {}
+
+    def _one(target_lang: str) -> dict:
+        result = {"target": target_lang}
+        translated = translations.get(target_lang)
+        if translated is None:
+            try:
+                if target_lang == source_lang:
+                    translated = text
+                else:
+                    translated = _translate_nigerian_text(source_lang, target_lang, text)
+            except Exception as e:
+                print(f"Translation error ({target_lang}): {e}", file=sys.stderr)
+                speech_deadline.skip(f"translate:{target_lang}", speech_deadline.reason_for(e))
+                result["error"] = str(e)
+                return result
+        speech_deadline.complete(f"translate:{target_lang}")
+        result["output"] = translated
+
+        if do_tts:
+            result["audio"] = speak_within_deadline(
+                translated,
+                resolve_tts_language(NIGERIAN_LANGUAGE_MAP["tts"][target_lang], engine=engine),
+                engine=engine,
+                save_path=target_output_path(save_output, target_lang),
+                tts_concurrency=tts_concurrency,
+                stage=f"tts:{target_lang}",
+            )
+        return result
+
+    with speech_metrics.stage("fan_out", targets=len(target_langs)):
+        with ThreadPoolExecutor(max_workers=max(1, len(target_langs)), thread_name_prefix="speech-target") as pool:
+            # Each target runs in a copy of the request context (deadline, metrics)
+            futures = [pool.submit(contextvars.copy_context().run, _one, t) for t in target_langs]
+            return [future.result() for future in futures]
+
+
+def speech_to_speech_targets(
+    source_lang: str = "english",
+    target_langs: Optional[List[str]] = None,
+    source: str = "file",
+    audio_file: Optional[str] = None,
+    engine: str = "gtts",
+    timeout: int = 5,
+    phrase_time_limit: int = 10,
+    save_output: Optional[str] = None,
+    do_tts: bool = True,
+    long_audio: Optional[bool] = None,
+    stt_concurrency: int = 4,
+    decode: str = "file",
+    vad: bool = VAD_ENABLED,
+    tts_concurrency: int = 4,
+    fingerprint: str = PIPELINE_FINGERPRINT,
+) -> Optional[dict]:
+    """
+    speech_to_speech() for several target languages at once (group calls).
+
+    The audio is decoded and recognized once; translation and TTS then fan
+    out concurrently per target (see fan_out_targets), so N targets cost one
+    STT plus N parallel translations. Reply audio for each target goes to
+    target_output_path(save_output, target), or a temp file without one.
+
+    Returns:
+        {"transcript": ..., "results": [...per target...]}, or None when
+        the languages are invalid or recognition failed.
+    """
+    source_lang = source_lang.lower().strip()
+    target_langs = list(dict.fromkeys(t.lower().strip() for t in target_langs or []))
+
+    if not target_langs or not _check_pipeline_languages(source_lang, target_langs):
+        return None
+
+    # ── Step 0 : Same recording seen before (for any target)? ───────────────
+    pipeline_cache, keys, cached = _pipeline_lookup(source, audio_file, source_lang, target_langs, fingerprint)
+
+    if cached:
+        # The transcript doesn't depend on the target — any hit has it
+        recognized_text = next(iter(cached.values()))["transcript"]
+        print(f"Pipeline cache hit: \"{recognized_text}\"", file=sys.stderr)
+        for stage in ("decode", "stt"):
+            speech_deadline.complete(stage)
+
+    else:
+        # ── Step 1 : Speech → Text, once for every target ───────────────────
+        recognized_text = speech_to_text(
+            language=NIGERIAN_LANGUAGE_MAP["stt"][source_lang],
+            source=source,
+            audio_file=audio_file,
+            timeout=timeout,
+            phrase_time_limit=phrase_time_limit,
+            long_audio=long_audio,
+            stt_concurrency=stt_concurrency,
+            decode=decode,
+            vad=vad,
+        )
+
+        if not recognized_text:
+            print("Speech recognition failed. Aborting.", file=sys.stderr)
+            return None
+
+    # ── Steps 2–3 : Translate + TTS per target, concurrently ────────────────
+    results = fan_out_targets(
+        recognized_text,
+        source_lang,
+        target_langs,
+        engine=engine,
+        save_output=save_output,
+        do_tts=do_tts,
+        tts_concurrency=tts_concurrency,
+        translations={t: entry["translated"] for t, entry in cached.items()},
+    )
+
+    for result in results:
+        if keys and result["target"] not in cached and "output" in result and not transcript_is_partial():
+            pipeline_cache.put(keys[result["target"]], recognized_text, result["output"])
+
+    return {"transcript": recognized_text, "results": results}
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # 5. INTERACTIVE CLI WRAPPER
 # ─────────────────────────────────────────────────────────────────────────────
@@ -508,6 +1921,15 @@ def speech_to_speech_interactive():
 
     save_output = input("Save output audio? Enter path or leave blank: ").strip() or None
 
+    if source == "mic" and input("Keep listening (conversation mode)? [y/N]: ").strip().lower() == "y":
+        converse(
+            source_lang=source_lang,
+            target_langs=[target_lang],
+            save_output=save_output,
+            play=True,
+        )
+        return
+
     speech_to_speech(
         source_lang=source_lang,
         target_lang=target_lang,
@@ -519,11 +1941,293 @@ def speech_to_speech_interactive():
     )
 
 
+# ─────────────────────────────────────────────────────────────────────────────
+# 5b. CONVERSATION MODE  (--converse: keep listening, translate every utterance)
+#     A capture thread listens continuously while earlier utterances are
+#     still being recognized, translated and synthesized on worker threads.
+#     Ambient noise is calibrated once per session, not once per utterance,
+#     and replies are emitted (and played) in the order they were spoken.
+# ─────────────────────────────────────────────────────────────────────────────
+
+CONVERSE_PAUSE_S = 0.6           # silence that ends an utterance (SpeechRecognition default: 0.8)
+CONVERSE_POLL_S = 1.0            # how often the capture loop checks for a stop request
+CONVERSE_WORKERS = 3             # utterances in flight at once
+FAKE_MIC_CHUNK = 1024            # frames per read, as sr.Microphone
+
+
+class _PacedStream:
+    """Wraps an sr.AudioFile stream so reads arrive no faster than real time × speed."""
+
+    def __init__(self, stream, bytes_per_second: float, speed: float = 1.0):
+        self.stream = stream
+        self.bytes_per_second = bytes_per_second * max(speed, 0.01)
+        self.exhausted = False
+        self._sent = 0
+        self._started = None
+
+    def read(self, size: int = -1) -> bytes:
+        import time
+
+        if self._started is None:
+            self._started = time.perf_counter()
+        data = self.stream.read(size)
+        if not data:
+            self.exhausted = True
+            return data
+        # A microphone hands a chunk over once it has been spoken, not before
+        self._sent += len(data)
+        ahead = self._sent / self.bytes_per_second - (time.perf_counter() - self._started)
+        if ahead > 0:
+            time.sleep(ahead)
+        return data
+
+
+def wav_microphone(path: str, speed: float = 1.0):
+    """
+    An sr.AudioSource that plays a WAV file as if it were a live microphone:
+    small chunks, paced in real time (scaled by `speed`). Its stream's
+    `exhausted` flag turns True at the end of the file.
+    """
+    import speech_recognition as sr
+
+    class WavMicrophone(sr.AudioFile):
+        def __enter__(self):
+            super().__enter__()
+            self.CHUNK = FAKE_MIC_CHUNK
+            self.stream = _PacedStream(self.stream, self.SAMPLE_RATE * self.SAMPLE_WIDTH, speed)
+            return self
+
+    return WavMicrophone(path)
+
+
+def _turn_output_path(save_output: Optional[str], turn: int) -> Optional[str]:
+    """'reply.mp3' → 'reply.turn003.mp3' (fan_out_targets then adds the target)."""
+    if not save_output:
+        return None
+    root, ext = os.path.splitext(save_output)
+    return f"{root}.turn{turn:03d}{ext or '.mp3'}"
+
+
+def _audio_has_speech(audio, threshold: float) -> bool:
+    from speech_audio import frame_energies
+
+    return any(e > threshold for e in frame_energies(audio.frame_data, audio.sample_rate))
+
+
+def _converse_turn(
+    recognizer,
+    audio,
+    turn: int,
+    ended_at: float,
+    source_lang: str,
+    target_langs: List[str],
+    engine: str,
+    save_output: Optional[str],
+    do_tts: bool,
+    vad: bool,
+    tts_concurrency: int,
+) -> dict:
+    """
+    One utterance through STT → translate → TTS (runs on a worker thread).
+
+    "latency_ms" is measured from the moment the utterance was handed over
+    (after CONVERSE_PAUSE_S of trailing silence) to the last reply audio
+    being ready; "stages" breaks it down per pipeline stage.
+    """
+    import time
+
+    import speech_recognition as sr
+
+    with speech_metrics.recording(mode="converse", turn=turn) as metrics:
+        result = {
+            "turn": turn,
+            "utterance_s": round(len(audio.frame_data) / float(audio.sample_rate * audio.sample_width), 2),
+        }
+        try:
+            if vad:
+                audio = trim_audio(audio)
+            with speech_metrics.stage("stt", bytes=len(audio.frame_data)):
+                text = _recognize(recognizer, audio, NIGERIAN_LANGUAGE_MAP["stt"][source_lang])
+        except sr.UnknownValueError:
+            result["error"] = "Could not understand audio."
+        except Exception as e:
+            print(f"Turn {turn}: STT error: {e}", file=sys.stderr)
+            result["error"] = str(e)
+        else:
+            result["transcript"] = text
+            result["results"] = fan_out_targets(
+                text,
+                source_lang,
+                target_langs,
+                engine=engine,
+                save_output=_turn_output_path(save_output, turn),
+                do_tts=do_tts,
+                tts_concurrency=tts_concurrency,
+            )
+
+        result["latency_ms"] = round((time.perf_counter() - ended_at) * 1000.0, 1)
+        result["stages"] = {name: entry["ms"] for name, entry in metrics.to_dict()["stages"].items()}
+    return result
+
+
+def converse(
+    source_lang: str = "english",
+    target_langs: Optional[List[str]] = None,
+    engine: str = "gtts",
+    save_output: Optional[str] = None,
+    do_tts: bool = True,
+    play: bool = False,
+    vad: bool = VAD_ENABLED,
+    tts_concurrency: int = 4,
+    phrase_time_limit: int = 10,
+    mic_file: Optional[str] = None,
+    mic_speed: float = 1.0,
+    max_turns: int = 0,
+    workers: int = CONVERSE_WORKERS,
+    recalibrate: bool = MIC_RECALIBRATE,
+    on_turn=None,
+) -> Optional[List[dict]]:
+    """
+    Continuous speech-to-speech: listen until interrupted (Ctrl+C), the
+    --mic-file ends, or `max_turns` utterances have been captured.
+
+    Args:
+        mic_file:  WAV played as a fake microphone (see wav_microphone) —
+                   the same capture path, reproducibly, without audio hardware.
+        mic_speed: Playback rate of mic_file (1 = real time).
+        max_turns: Stop after this many utterances (0 = no limit).
+        workers:   Utterances processed concurrently while capture continues.
+        recalibrate: Sample ambient noise even if a saved calibration exists.
+        on_turn:   Called with each turn's result dict, in spoken order.
+
+    Returns:
+        The turn results in spoken order (see _converse_turn), or None when
+        the languages are invalid or there is no microphone.
+    """
+    import queue
+    import threading
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+
+    try:
+        import speech_recognition as sr
+    except ImportError:
+        print("SpeechRecognition not installed. Run: pip install SpeechRecognition", file=sys.stderr)
+        return None
+
+    source_lang = source_lang.lower().strip()
+    target_langs = list(dict.fromkeys(t.lower().strip() for t in target_langs or []))
+    if not target_langs or not _check_pipeline_languages(source_lang, target_langs):
+        return None
+
+    if mic_file:
+        if not os.path.exists(mic_file):
+            print(f"Audio file not found: {mic_file}", file=sys.stderr)
+            return None
+        mic = wav_microphone(mic_file, speed=mic_speed)
+    else:
+        try:
+            mic = sr.Microphone()
+        except OSError:
+            print("No microphone found. Check your audio device.", file=sys.stderr)
+            return None
+
+    recognizer = sr.Recognizer()
+    recognizer.pause_threshold = CONVERSE_PAUSE_S
+    recognizer.non_speaking_duration = min(recognizer.non_speaking_duration, CONVERSE_PAUSE_S)
+
+    captured = queue.Queue()   # turn futures in spoken order, then `done`
+    done = object()
+    stop = threading.Event()
+    metrics = speech_metrics.current()
+
+    def _capture(pool):
+        count = 0
+        try:
+            with mic:
+                # A fake mic keeps the default threshold so no speech at the
+                # start of the file is spent on calibration
+                calibration = None if mic_file else calibrate_microphone(recognizer, mic, recalibrate=recalibrate)
+                print("Listening — speak any time (Ctrl+C to stop)…", file=sys.stderr)
+
+                while not stop.is_set() and not (max_turns and count >= max_turns):
+                    try:
+                        audio = recognizer.listen(mic, timeout=CONVERSE_POLL_S, phrase_time_limit=phrase_time_limit)
+                    except sr.WaitTimeoutError:
+                        continue
+                    ended_at = time.perf_counter()
+                    if calibration is not None:
+                        calibration.save()
+                    exhausted = getattr(mic.stream, "exhausted", False)
+                    # At the end of a --mic-file, listen() returns whatever was left over
+                    if not exhausted or _audio_has_speech(audio, recognizer.energy_threshold):
+                        count += 1
+                        print(f"Turn {count}: utterance captured.", file=sys.stderr)
+                        captured.put(pool.submit(
+                            _converse_turn, recognizer, audio, count, ended_at, source_lang, target_langs,
+                            engine, save_output, do_tts, vad, tts_concurrency,
+                        ))
+                    if exhausted:
+                        break
+        except Exception as e:
+            print(f"Capture error: {e}", file=sys.stderr)
+        finally:
+            captured.put(done)
+
+    turns = []
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="speech-turn") as pool:
+        capture = threading.Thread(target=_capture, args=(pool,), name="speech-capture", daemon=True)
+        capture.start()
+
+        future = None
+        while True:
+            try:
+                if future is None:
+                    future = captured.get()
+                if future is done:
+                    break
+                turn = future.result()
+            except KeyboardInterrupt:
+                if stop.is_set():
+                    raise
+                print("Stopping — finishing the utterances already captured…", file=sys.stderr)
+                stop.set()
+                continue
+            future = None
+
+            print(
+                f"Turn {turn['turn']}: {turn['latency_ms']:.0f} ms utterance-to-audio "
+                f"({', '.join(f'{name} {ms:.0f}' for name, ms in turn['stages'].items())})",
+                file=sys.stderr,
+            )
+            if metrics is not None:
+                metrics.record("turn", turn["latency_ms"])
+            if play:
+                for result in turn.get("results", []):
+                    if result.get("audio"):
+                        play_audio_file(result["audio"])
+            turns.append(turn)
+            if on_turn is not None:
+                on_turn(turn)
+
+        capture.join()
+
+    latencies = sorted(t["latency_ms"] for t in turns)
+    if latencies:
+        p50 = latencies[len(latencies) // 2]
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        print(f"Conversation: {len(turns)} turns, latency p50 {p50:.0f} ms, p95 {p95:.0f} ms.", file=sys.stderr)
+        if metrics is not None:
+            metrics.flag("turn_latency_p50_ms", p50)
+            metrics.flag("turn_latency_p95_ms", p95)
+    return turns
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # 6. INTERNAL HELPER
 # ─────────────────────────────────────────────────────────────────────────────
 
-def _translate_nigerian_text(source_lang: str, target_lang: str, text: str) -> str:
+def _resolve_translate_codes(source_lang: str, target_lang: str) -> Tuple[str, str]:
     source_lang = source_lang.lower().strip()
     target_lang = target_lang.lower().strip()
 
@@ -533,83 +2237,791 @@ def _translate_nigerian_text(source_lang: str, target_lang: str, text: str) -> s
     if target_lang not in supported:
         raise ValueError(f"Unsupported target_lang '{target_lang}'. Choose from: {supported}")
 
-    translated = GoogleTranslator(
-        source=NIGERIAN_LANGUAGE_MAP["translate"][source_lang],
-        target=NIGERIAN_LANGUAGE_MAP["translate"][target_lang],
-    ).translate(text)
+    return (
+        NIGERIAN_LANGUAGE_MAP["translate"][source_lang],
+        NIGERIAN_LANGUAGE_MAP["translate"][target_lang],
+    )
+
+
+def _translate_codes(source_code: str, target_code: str, text: str) -> str:
+    """
+    One backend request (retried/hedged by speech_resilience) — no
+    validation, no cache.
+    """
+    from deep_translator.exceptions import (
+        LanguageNotSupportedException,
+        NotValidLength,
+        NotValidPayload,
+        RequestError,
+        TooManyRequests,
+        TranslationNotFound,
+    )
+    import speech_resilience
+
+    # get_translator() is per thread, so a hedged duplicate gets its own instance
+    translated = speech_resilience.call(
+        "translate",
+        lambda: get_translator(source_code, target_code).translate(text),
+        permanent=(LanguageNotSupportedException, NotValidLength, NotValidPayload, TranslationNotFound),
+        retryable=(RequestError, TooManyRequests),
+    )
 
     if not translated:
         raise RuntimeError("Translation returned empty result.")
     return translated
 
 
+def _translate_nigerian_text(source_lang: str, target_lang: str, text: str) -> str:
+    source_code, target_code = _resolve_translate_codes(source_lang, target_lang)
+
+    # Nothing to translate (e.g. the `run` ping) — don't load the backend at all
+    if source_code == target_code:
+        return text
+
+    from speech_cache import get_translation_cache
+
+    cache = get_translation_cache()
+    if cache is not None:
+        cached = cache.get(source_code, target_code, text)
+        speech_metrics.flag("translate_cache_hit", cached is not None)
+        if cached is not None:
+            return cached
+
+    with speech_metrics.stage("translate", chars=len(text)):
+        translated = _translate_codes(source_code, target_code, text)
+
+    if cache is not None:
+        cache.put(source_code, target_code, text, translated)
+    return translated
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # 7. CLI ENTRY POINT  (called by Laravel via Process::run)
 # ─────────────────────────────────────────────────────────────────────────────
 
-def main(argv) -> int:
-    parser = argparse.ArgumentParser(description="Nigerian Speech/Text Translation Utility")
-    parser.add_argument("--source",      required=True, help="Source language (english|hausa|yoruba|igbo|pidgin)")
-    parser.add_argument("--target",      required=True, help="Target language (english|hausa|yoruba|igbo|pidgin)")
+class _RequestParser(argparse.ArgumentParser):
+    """ArgumentParser that raises instead of exiting, so worker requests can't kill the server."""
+
+    def error(self, message):
+        raise ValueError(message)
+
+
+def build_parser(parser_class=argparse.ArgumentParser) -> argparse.ArgumentParser:
+    parser = parser_class(description="Nigerian Speech/Text Translation Utility")
+    parser.add_argument("--source",      help="Source language (english|hausa|yoruba|igbo|pidgin)")
+    parser.add_argument("--target",      action="append",
+                        help="Target language (english|hausa|yoruba|igbo|pidgin); repeat it to translate "
+                             "into several at once (one recognition, per-target results as JSON lines)")
     parser.add_argument("--text",        help="Text to translate (skips STT)")
     parser.add_argument("--file",        dest="audio_file", help="Audio file path — mp3/mp4/ogg/wav (triggers STT)")
     parser.add_argument("--engine",      default="gtts", choices=["gtts", "pyttsx3"])
     parser.add_argument("--save-output", dest="save_output", help="Path to save output audio file")
     parser.add_argument("--play",        action="store_true", help="Play audio on the server")
     parser.add_argument("--tts",         action="store_true", help="Enable TTS output")
+    parser.add_argument("--long-audio",  dest="long_audio", action=argparse.BooleanOptionalAction, default=None,
+                        help="Force/disable chunked recognition (default: auto for long files)")
+    parser.add_argument("--stt-concurrency", dest="stt_concurrency", type=int, default=4,
+                        help="Max audio segments recognised in parallel in long-audio mode")
+    parser.add_argument("--decode",      default="file", choices=["file", "pipe", "flac"],
+                        help="'pipe' streams PCM from ffmpeg instead of writing a temp WAV; "
+                             "'flac' has ffmpeg encode the STT upload directly (no VAD)")
+    parser.add_argument("--vad",         action=argparse.BooleanOptionalAction, default=VAD_ENABLED,
+                        help="Trim silence and long pauses before STT upload (default: on, SPEECH_VAD=0 disables)")
+    parser.add_argument("--tts-concurrency", dest="tts_concurrency", type=int, default=4,
+                        help="Max sentence segments synthesized in parallel for long gTTS texts (1 = off)")
+    parser.add_argument("--stream-output", dest="stream_output",
+                        help="Stream the gTTS audio here while it is synthesized: a file, a FIFO or '-' (stdout)")
+    parser.add_argument("--deadline-ms", dest="deadline_ms", type=float,
+                        help="Total time budget; stages get per-call timeouts and degrade instead of overrunning")
+    parser.add_argument("--fingerprint", default=PIPELINE_FINGERPRINT, choices=["bytes", "pcm-prefix"],
+                        help="How --file uploads are fingerprinted for the pipeline cache")
+    parser.add_argument("--batch-file",  dest="batch_file", help="JSON array / JSONL of texts to translate ('-' = stdin)")
+    parser.add_argument("--batch-concurrency", dest="batch_concurrency", type=int, default=4,
+                        help="Max translation calls in flight for --batch-file")
+    parser.add_argument("--metrics-file", dest="metrics_file", help="Also append the METRICS JSON line to this file")
+    parser.add_argument("--converse",    action="store_true",
+                        help="Listen continuously and translate every utterance (one JSON line per turn)")
+    parser.add_argument("--mic-file",    dest="mic_file", help="WAV played as a fake microphone in --converse mode")
+    parser.add_argument("--mic-speed",   dest="mic_speed", type=float, default=1.0,
+                        help="Playback rate of --mic-file (1 = real time)")
+    parser.add_argument("--turns",       type=int, default=0, help="Stop --converse after this many utterances")
+    parser.add_argument("--recalibrate", action="store_true", default=MIC_RECALIBRATE,
+                        help="Sample ambient noise before listening even if a saved calibration exists "
+                             "(SPEECH_RECALIBRATE=1 makes it the default)")
+    parser.add_argument("--serve",       action="store_true", help="Run as a long-lived worker on --socket")
+    parser.add_argument("--socket",      default=DEFAULT_SOCKET, help="Unix socket path for --serve")
+    parser.add_argument("--workers",     type=int, default=8,
+                        help="Max concurrent text requests in --serve mode; short audio gets half, "
+                             "long audio and batches a quarter (SPEECH_LANES overrides)")
+    return parser
+
+
+def handle_request(args: argparse.Namespace, batch_input: Optional[str] = None) -> dict:
+    """
+    Run one translation request (text or file branch) and return its result.
 
-    args = parser.parse_args(argv)
+    Shared by the CLI and the worker so both keep exactly the same contract.
+    `batch_input` carries the --batch-file contents when the worker received
+    them inline instead of as a readable path.
 
-    try:
-        # Must provide exactly one of --text or --file
-        if bool(args.text) == bool(args.audio_file):
-            raise ValueError("Provide exactly one of --text or --file.")
-
-        # ── TEXT branch (translateText / textTranslateAudio) ─────────────────
-        if args.text is not None:
-            translated = _translate_nigerian_text(args.source, args.target, args.text)
-
-            if args.tts:
-                tts_lang = resolve_tts_language(
-                    NIGERIAN_LANGUAGE_MAP["tts"].get(args.target.lower().strip(), "en"),
-                    engine=args.engine
-                )
-                audio_path = text_to_speech_advanced(
-                    text=translated,
-                    language=tts_lang,
-                    engine=args.engine,
-                    play=args.play,
-                    save_path=args.save_output,
-                )
-                print(f"AUDIO:{audio_path}", file=sys.stderr)
+    Returns:
+        {"output": <translated text>, "audio": <path>} — "audio" is only
+        present for the text branch with --tts, mirroring the AUDIO: line.
+        Batch runs also return "results" and "failed" (count of bad items),
+        and so do runs with several --target values (see _handle_targets).
+
+    Raises:
+        ValueError / RuntimeError on invalid input or pipeline failure.
+    """
+    if not args.source or not args.target:
+        raise ValueError("--source and --target are required.")
+    targets = list(dict.fromkeys(t.lower().strip() for t in args.target))
+    if len(targets) > 1:
+        return _handle_targets(args, targets)
+    target = targets[0]
+    if args.stream_output:
+        if args.save_output or args.batch_file:
+            raise ValueError("--stream-output can't be combined with --save-output or --batch-file.")
+        if args.engine != "gtts":
+            raise ValueError("--stream-output needs --engine gtts.")
+
+    # ── BATCH branch ─────────────────────────────────────────────────────────
+    if args.batch_file:
+        if args.text or args.audio_file:
+            raise ValueError("--batch-file can't be combined with --text or --file.")
+        import json
+
+        results = translate_batch(
+            args.source,
+            target,
+            _load_batch(args.batch_file, batch_input),
+            concurrency=args.batch_concurrency,
+        )
+        return {
+            "output": "\n".join(json.dumps(r, ensure_ascii=False) for r in results),
+            "results": results,
+            "failed": sum(1 for r in results if "error" in r),
+        }
+
+    # Must provide exactly one of --text or --file
+    if bool(args.text) == bool(args.audio_file):
+        raise ValueError("Provide exactly one of --text, --file or --batch-file.")
+
+    # ── TEXT branch (translateText / textTranslateAudio) ─────────────────────
+    if args.text is not None:
+        try:
+            translated = _translate_nigerian_text(args.source, target, args.text)
+        except Exception as e:
+            speech_deadline.skip("translate", speech_deadline.reason_for(e))
+            raise
+        speech_deadline.complete("translate")
+        result = {"output": translated}
+
+        if args.stream_output:
+            tts_lang = resolve_tts_language(
+                NIGERIAN_LANGUAGE_MAP["tts"].get(target, "en"),
+                engine="gtts"
+            )
+            try:
+                stream_to_output(translated, args.stream_output, language=tts_lang, tts_concurrency=args.tts_concurrency)
+            except Exception as e:
+                if speech_deadline.current() is None:
+                    raise
+                print(f"Streaming TTS error: {e}", file=sys.stderr)
+                speech_deadline.skip("tts", speech_deadline.reason_for(e))
+            else:
+                speech_deadline.complete("tts")
+            if args.stream_output != "-":
+                result["audio"] = args.stream_output
+
+        elif args.tts:
+            tts_lang = resolve_tts_language(
+                NIGERIAN_LANGUAGE_MAP["tts"].get(target, "en"),
+                engine=args.engine
+            )
+            audio_file = speak_within_deadline(
+                translated,
+                tts_lang,
+                engine=args.engine,
+                play=args.play,
+                save_path=args.save_output,
+                tts_concurrency=args.tts_concurrency,
+            )
+            if audio_file or speech_deadline.current() is None:
+                result["audio"] = audio_file
+
+        return result
+
+    # ── FILE branch (translateAudio) ─────────────────────────────────────────
+    # convert_to_wav() is called internally by speech_to_text()
+    # so mp3/mp4/ogg/m4a all work transparently here
+    out = speech_to_speech(
+        source_lang=args.source,
+        target_lang=target,
+        source="file",
+        audio_file=args.audio_file,
+        engine=args.engine,
+        save_output=args.save_output,
+        play=args.play,
+        do_tts=args.tts,
+        long_audio=args.long_audio,
+        stt_concurrency=args.stt_concurrency,
+        decode=args.decode,
+        vad=args.vad,
+        tts_concurrency=args.tts_concurrency,
+        stream_output=args.stream_output,
+        fingerprint=args.fingerprint,
+    )
+
+    if not out:
+        raise RuntimeError("Speech pipeline failed.")
+
+    return {"output": out}
 
-            print(translated)   # ← Laravel reads this via $result->output()
-            return 0
 
-        # ── FILE branch (translateAudio) ─────────────────────────────────────
-        # convert_to_wav() is called internally by speech_to_text()
-        # so mp3/mp4/ogg/m4a all work transparently here
-        out = speech_to_speech(
+def _handle_targets(args: argparse.Namespace, targets: List[str]) -> dict:
+    """
+    handle_request() for several --target values: recognize (or take the
+    text) once, then translate and synthesize for every target concurrently.
+
+    "output" is one JSON line per target, in the order given —
+    {"target": "hausa", "output": "...", "audio": "..."} or
+    {"target": "hausa", "error": "..."} — and "failed" counts the errors.
+    """
+    if args.stream_output or args.batch_file:
+        raise ValueError("Several --target values can't be combined with --stream-output or --batch-file.")
+    if args.play:
+        raise ValueError("--play can't be used with several --target values.")
+    if bool(args.text) == bool(args.audio_file):
+        raise ValueError("Provide exactly one of --text or --file.")
+    import json
+
+    if args.text is not None:
+        for target in targets:
+            _resolve_translate_codes(args.source, target)   # raises on unsupported languages
+        fanned = {
+            "transcript": args.text,
+            "results": fan_out_targets(
+                args.text,
+                args.source.lower().strip(),
+                targets,
+                engine=args.engine,
+                save_output=args.save_output,
+                do_tts=args.tts,
+                tts_concurrency=args.tts_concurrency,
+            ),
+        }
+    else:
+        fanned = speech_to_speech_targets(
             source_lang=args.source,
-            target_lang=args.target,
+            target_langs=targets,
             source="file",
             audio_file=args.audio_file,
             engine=args.engine,
             save_output=args.save_output,
-            play=args.play,
             do_tts=args.tts,
+            long_audio=args.long_audio,
+            stt_concurrency=args.stt_concurrency,
+            decode=args.decode,
+            vad=args.vad,
+            tts_concurrency=args.tts_concurrency,
+            fingerprint=args.fingerprint,
         )
-
-        if not out:
+        if fanned is None:
             raise RuntimeError("Speech pipeline failed.")
 
-        print(out)  # ← Laravel reads this via $result->output()
-        return 0
+    results = fanned["results"]
+    return {
+        "output": "\n".join(json.dumps(r, ensure_ascii=False) for r in results),
+        "transcript": fanned["transcript"],
+        "results": results,
+        "failed": sum(1 for r in results if "error" in r),
+    }
+
+
+def _request_mode(args: argparse.Namespace) -> str:
+    if args.batch_file:
+        return "batch"
+    return "file" if args.audio_file else "text"
+
+
+# Audio whose duration can't be read (no ffprobe) counts as long above this size
+LANE_LONG_AUDIO_BYTES = 1024 * 1024   # ~1 min of 128 kbps mp3
+LANE_PROBE_TIMEOUT_S = 2.0            # picking a lane must not hold a request up like PROBE_TIMEOUT_S can
+
+
+def audio_seconds(path: str, timeout: float = PROBE_TIMEOUT_S) -> Optional[float]:
+    """Duration of an audio file from its header (WAV) or ffprobe, None if unknown or slower than `timeout`."""
+    if path.lower().endswith(".wav"):
+        import wave
+
+        try:
+            with wave.open(path, "rb") as wav:
+                return wav.getnframes() / float(wav.getframerate())
+        except (OSError, EOFError, wave.Error):
+            pass
+    info = probe_media(path, timeout=timeout)
+    return info.get("duration") if info else None
+
+
+def request_lane(args: argparse.Namespace) -> str:
+    """speech_lanes lane for a request: text is interactive, long audio and batches are bulk."""
+    if args.batch_file:
+        return "bulk"
+    if not args.audio_file:
+        return "interactive"
+    if args.long_audio is not None:
+        return "bulk" if args.long_audio else "short_audio"
+    if not os.path.exists(args.audio_file):
+        return "short_audio"   # handle_request reports the missing file
+    seconds = audio_seconds(args.audio_file, timeout=LANE_PROBE_TIMEOUT_S)
+    if seconds is None:
+        return "bulk" if os.path.getsize(args.audio_file) > LANE_LONG_AUDIO_BYTES else "short_audio"
+    return "bulk" if seconds > LONG_AUDIO_THRESHOLD_S else "short_audio"
+
+
+@contextmanager
+def admitted(args: argparse.Namespace):
+    """
+    Hold a run slot in the request's lane for the block (see speech_lanes).
+    Queueing counts against --deadline-ms and may use at most half of it.
+
+    Raises:
+        speech_lanes.LaneBusy when the lane is saturated.
+    """
+    deadline = speech_deadline.current()
+    with speech_metrics.stage("queue"):
+        lane = speech_lanes.lane(request_lane(args))
+        speech_metrics.flag("lane", lane.name)
+        slot = lane.acquire(max_wait=deadline.remaining() / 2 if deadline is not None else None)
+    try:
+        yield
+    finally:
+        slot.release()
+
+
+def main(argv) -> int:
+    args = build_parser().parse_args(argv)
+
+    if args.serve:
+        return serve(args.socket, workers=args.workers)
+    if args.converse:
+        return _run_conversation(args)
+
+    try:
+        with speech_metrics.recording(mode=_request_mode(args)) as metrics, \
+                speech_deadline.within(args.deadline_ms) as deadline:
+            result = None
+            try:
+                with admitted(args):
+                    result = handle_request(args)
+            finally:
+                _emit_reports(args, metrics, deadline, succeeded=result is not None)
+
+        if "audio" in result:
+            print(f"AUDIO:{result['audio']}", file=sys.stderr)
+
+        # With --stream-output - stdout is the audio; the text already went out as TEXT:
+        if args.stream_output != "-":
+            print(result["output"])   # ← Laravel reads this via $result->output()
+        return 2 if result.get("failed") else 0
+
+    except speech_lanes.LaneBusy as e:
+        import json
+
+        print(str(e), file=sys.stderr)
+        print(f"{speech_lanes.BUSY_PREFIX}{json.dumps(e.to_dict())}", file=sys.stderr)
+        return speech_lanes.BUSY_EXIT_CODE
 
     except Exception as e:
         print(str(e), file=sys.stderr)
         return 2
 
+    finally:
+        _report_cache_stats()
+
+
+def _run_conversation(args: argparse.Namespace) -> int:
+    """--converse: print one JSON line per turn on stdout as soon as its reply is ready."""
+    import json
+
+    if not args.source or not args.target:
+        print("--source and --target are required.", file=sys.stderr)
+        return 2
+    if args.text or args.audio_file or args.batch_file or args.stream_output:
+        print("--converse can't be combined with --text, --file, --batch-file or --stream-output.", file=sys.stderr)
+        return 2
+
+    try:
+        with speech_metrics.recording(mode="converse") as metrics:
+            turns = converse(
+                source_lang=args.source,
+                target_langs=args.target,
+                engine=args.engine,
+                save_output=args.save_output,
+                do_tts=args.tts,
+                play=args.play,
+                vad=args.vad,
+                tts_concurrency=args.tts_concurrency,
+                mic_file=args.mic_file,
+                mic_speed=args.mic_speed,
+                max_turns=args.turns,
+                recalibrate=args.recalibrate,
+                on_turn=lambda turn: print(json.dumps(turn, ensure_ascii=False), flush=True),
+            )
+            metrics.emit(args.metrics_file)
+        return 2 if turns is None else 0
+    finally:
+        _report_cache_stats()
+
+
+def _emit_reports(args, metrics, deadline, succeeded: bool) -> Tuple[dict, Optional[dict]]:
+    """
+    Print the METRICS: line, plus a PARTIAL: line when a --deadline-ms request
+    had to skip a stage or failed, so callers see what did get done.
+    """
+    partial = deadline is not None and (deadline.degraded or not succeeded)
+    if deadline is not None:
+        metrics.flag("deadline_degraded", partial)
+    metrics_data = metrics.emit(args.metrics_file)
+    return metrics_data, (deadline.emit() if partial else None)
+
+
+def _report_cache_stats():
+    # speech_cache (sqlite3, hashlib) is only imported once a cache is used;
+    # requests that never touched it have nothing to report.
+    cache_module = sys.modules.get("speech_cache")
+    if cache_module is not None:
+        cache_module.report_cache_stats()
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 8. WORKER MODE  (long-lived process on a Unix socket — see speech_client.py)
+#    Protocol: one JSON object per line in, one JSON object per line out.
+#      request : {"argv": [...same flags as the CLI...]}
+#                or {"source", "target", "text" | "file" | "batch", "tts",
+#                    "save_output", "engine", "play"} — "target" may be a list
+#                "batch_input" carries --batch-file contents read by the client.
+#      response: {"ok": true, "output": "...", "audio": "...", "metrics": {...}}
+#                {"ok": false, "error": "...", "code": 2}
+#                {"ok": false, "error": "...", "code": 75, "busy": {"lane", "reason", "retry_after"}}
+# ─────────────────────────────────────────────────────────────────────────────
+
+DEFAULT_SOCKET = os.environ.get(
+    "SPEECH_SOCKET",
+    os.path.join(tempfile.gettempdir(), "defcomm-speech.sock"),
+)
+
+
+def _argv_from_payload(payload: dict) -> list:
+    """Turn a worker request into CLI argv so it goes through the same parser."""
+    if "argv" in payload:
+        return [str(a) for a in payload["argv"]]
+
+    argv = []
+    for key, flag in (
+        ("source", "--source"),
+        ("target", "--target"),
+        ("text", "--text"),
+        ("file", "--file"),
+        ("engine", "--engine"),
+        ("save_output", "--save-output"),
+    ):
+        values = payload.get(key)
+        if values is None:
+            continue
+        for value in values if isinstance(values, list) else [values]:
+            argv += [flag, str(value)]
+    for key in ("tts", "play"):
+        if payload.get(key):
+            argv.append(f"--{key}")
+    if payload.get("batch") is not None:
+        argv += ["--batch-file", "-"]
+    return argv
+
+
+def handle_payload(payload: dict) -> dict:
+    """Run one worker request and return its JSON-serialisable response."""
+    partial = None
+    try:
+        import json
+
+        args = build_parser(_RequestParser).parse_args(_argv_from_payload(payload))
+        if args.serve:
+            raise ValueError("--serve is not allowed inside a worker request.")
+        if args.stream_output == "-":
+            raise ValueError("--stream-output - needs the caller's stdout; run speech.py directly.")
+
+        batch_input = payload.get("batch_input")
+        if payload.get("batch") is not None:
+            batch_input = json.dumps(payload["batch"])
+        if args.batch_file == "-" and batch_input is None:
+            raise ValueError("Send batch items inline as \"batch\" or \"batch_input\".")
+
+        with speech_metrics.recording(mode=_request_mode(args)) as metrics, \
+                speech_deadline.within(args.deadline_ms) as deadline:
+            result = None
+            try:
+                with admitted(args):
+                    result = handle_request(args, batch_input=batch_input)
+            finally:
+                result_metrics, partial = _emit_reports(args, metrics, deadline, succeeded=result is not None)
+        response = {"ok": True, **result, "metrics": result_metrics}
+        if partial is not None:
+            response["partial"] = partial
+        return response
+    except Exception as e:
+        print(f"Worker request failed: {e}", file=sys.stderr)
+        response = {"ok": False, "error": str(e), "code": 2}
+        if isinstance(e, speech_lanes.LaneBusy):
+            response.update(code=speech_lanes.BUSY_EXIT_CODE, busy=e.to_dict())
+        if partial is not None:
+            response["partial"] = partial
+        return response
+
+
+def _warm_up():
+    """Import the heavy backends once so requests don't pay for it."""
+    for module in ("deep_translator", "gtts", "speech_recognition"):
+        try:
+            __import__(module)
+        except ImportError:
+            print(f"Worker warm-up: {module} not installed.", file=sys.stderr)
+
+
+def _socket_in_use(socket_path: str) -> bool:
+    """True when something accepts connections on `socket_path`."""
+    import socket
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        probe.settimeout(1.0)
+        try:
+            probe.connect(socket_path)
+        except OSError:
+            return False
+    return True
+
+
+def serve(socket_path: str = DEFAULT_SOCKET, workers: int = 8) -> int:
+    """
+    Serve translation requests on a Unix socket until interrupted.
+
+    Each connection gets its own thread. Requests are admitted through the
+    speech_lanes lanes, sized for `workers`: text requests never wait behind
+    long recordings, and a saturated lane answers "busy" (code 75) at once.
+    The socket is created mode 0600; a stale one is replaced, but a live
+    worker's is left alone and this one exits instead.
+
+    Args:
+        socket_path: Filesystem path of the Unix socket to listen on.
+        workers:     Concurrent text requests; audio lanes get a share of it.
+
+    Returns:
+        Process exit code.
+    """
+    import json
+    import socketserver
+
+    lanes = speech_lanes.configure(workers)
+
+    class _Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            for line in self.rfile:
+                if not line.strip():
+                    continue
+                try:
+                    payload = json.loads(line)
+                except ValueError as e:
+                    response = {"ok": False, "error": f"Invalid JSON request: {e}", "code": 2}
+                else:
+                    response = handle_payload(payload)
+                    _report_cache_stats()
+                self.wfile.write((json.dumps(response) + "\n").encode("utf-8"))
+                self.wfile.flush()
+
+    class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+    if os.path.exists(socket_path):
+        if _socket_in_use(socket_path):
+            print(f"Another worker is already listening on {socket_path}.", file=sys.stderr)
+            return 1
+        # Left behind by a crashed worker — it would make bind() fail
+        os.unlink(socket_path)
+
+    _warm_up()
+
+    # Requests name arbitrary files to read and write: only this user may connect
+    previous_umask = os.umask(0o177)
+    try:
+        server = _Server(socket_path, _Handler)
+    finally:
+        os.umask(previous_umask)
+    os.chmod(socket_path, 0o600)
+
+    with server:
+        limits = ", ".join(f"{lane.name} {lane.concurrency}+{lane.depth}" for lane in lanes.values())
+        print(f"Worker listening on {socket_path} (lanes: {limits})", file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if os.path.exists(socket_path):
+                os.unlink(socket_path)
+
+    return 0
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 9. BATCH TRANSLATION  (many segments, one invocation)
+#    Input : JSON array or JSONL; each item is a string or {"text": "..."}.
+#    Output: one JSON line per input item, in input order:
+#            {"index": 0, "text": "...", "output": "..."}  or  {..., "error": "..."}
+# ─────────────────────────────────────────────────────────────────────────────
+
+MAX_TRANSLATE_CHARS = 5000   # GoogleTranslator rejects longer payloads
+BATCH_SEPARATOR = "\n"       # Google Translate keeps line breaks, so one line = one segment
+
+
+def _load_batch(path: Optional[str], content: Optional[str] = None) -> List[str]:
+    """Read batch segments from `content`, or from `path` ('-' means stdin)."""
+    import json
+
+    if content is None:
+        if path == "-":
+            content = sys.stdin.read()
+        else:
+            with open(path, encoding="utf-8") as fh:
+                content = fh.read()
+
+    content = content.strip()
+    if not content:
+        return []
+
+    if content.startswith("["):
+        items = json.loads(content)
+    else:
+        items = [json.loads(line) for line in content.splitlines() if line.strip()]
+
+    segments = []
+    for i, item in enumerate(items):
+        if isinstance(item, dict):
+            item = item.get("text")
+        if not isinstance(item, str):
+            raise ValueError(f"Batch item {i} has no text.")
+        segments.append(item)
+    return segments
+
+
+def _pack_segments(segments: List[str], limit: int = MAX_TRANSLATE_CHARS) -> List[List[str]]:
+    """Group segments into as few payloads as fit under `limit` characters."""
+    packs, current, size = [], [], 0
+    for seg in segments:
+        # Segments with their own line breaks can't be split back apart
+        if BATCH_SEPARATOR in seg or len(seg) >= limit:
+            packs.append([seg])
+            continue
+        extra = len(seg) + (len(BATCH_SEPARATOR) if current else 0)
+        if current and size + extra > limit:
+            packs.append(current)
+            current, size = [], 0
+            extra = len(seg)
+        current.append(seg)
+        size += extra
+    if current:
+        packs.append(current)
+    return packs
+
+
+def _translate_pack(source_code: str, target_code: str, pack: List[str]) -> List[str]:
+    if len(pack) == 1:
+        return [_translate_codes(source_code, target_code, pack[0])]
+
+    joined = _translate_codes(source_code, target_code, BATCH_SEPARATOR.join(pack))
+    parts = joined.split(BATCH_SEPARATOR)
+    if len(parts) == len(pack):
+        return [p.strip() for p in parts]
+
+    # The backend merged or split lines — fall back to one call per segment
+    print(
+        f"Batch pack of {len(pack)} came back as {len(parts)} lines; retrying individually.",
+        file=sys.stderr,
+    )
+    return [_translate_codes(source_code, target_code, seg) for seg in pack]
+
+
+def translate_batch(
+    source_lang: str,
+    target_lang: str,
+    segments: List[str],
+    concurrency: int = 4,
+) -> List[dict]:
+    """
+    Translate many segments with as few backend calls as possible.
+
+    Identical segments are translated once, cache hits skip the backend, the
+    rest are packed into payloads under MAX_TRANSLATE_CHARS and sent with at
+    most `concurrency` calls in flight.
+
+    Returns:
+        One result dict per input segment, in input order.
+    """
+    import contextvars
+    from concurrent.futures import ThreadPoolExecutor
+    from speech_cache import get_translation_cache
+
+    source_code, target_code = _resolve_translate_codes(source_lang, target_lang)
+    cache = get_translation_cache()
+
+    translated = {}   # segment → translation
+    errors = {}       # segment → error message
+    pending = []
+
+    for seg in dict.fromkeys(segments):   # dedupe, keep first-seen order
+        if not seg.strip() or source_code == target_code:
+            translated[seg] = seg
+            continue
+        hit = cache.get(source_code, target_code, seg) if cache is not None else None
+        if hit is not None:
+            translated[seg] = hit
+        else:
+            pending.append(seg)
+
+    speech_metrics.flag("translate_cache_hits", len(translated))
+    packs = _pack_segments(pending)
+    print(
+        f"Batch: {len(segments)} segments, {len(pending)} to translate in {len(packs)} calls.",
+        file=sys.stderr,
+    )
+
+    with speech_metrics.stage("translate", calls=len(packs), segments=len(pending)), \
+            ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        # Each call runs in a copy of the request context, so its deadline applies
+        futures = {
+            pool.submit(contextvars.copy_context().run, _translate_pack, source_code, target_code, pack): pack
+            for pack in packs
+        }
+        for future, pack in futures.items():
+            try:
+                results = future.result()
+            except Exception as e:
+                for seg in pack:
+                    errors[seg] = str(e)
+                continue
+            for seg, out in zip(pack, results):
+                translated[seg] = out
+                if cache is not None:
+                    cache.put(source_code, target_code, seg, out)
+
+    results = []
+    for i, seg in enumerate(segments):
+        if seg in translated:
+            results.append({"index": i, "text": seg, "output": translated[seg]})
+        else:
+            results.append({"index": i, "text": seg, "error": errors.get(seg, "Translation failed.")})
+    return results
+
 
 if __name__ == "__main__":
     raise SystemExit(main(sys.argv[1:]))
@@ -0,0 +1,635 @@
+"""
+asyncio-native clients for the Google backends speech.py calls, so one
+process can keep hundreds of requests in flight without an OS thread each.
+
+    results = asyncio.run(speech_async.run_requests(requests, concurrency=256))
+    python3 speech_async.py --batch-file requests.jsonl --concurrency 256
+
+- AsyncHTTPClient wraps an aiohttp.ClientSession (pinned in
+  requirements.txt): keep-alive connections pooled per origin and bounded
+  per host, redirects followed, TLS, compression and proxies handled by
+  aiohttp. client() returns the running loop's shared instance.
+- translate_async / speech_to_text_async / text_to_speech_async mirror
+  _translate_nigerian_text / speech_to_text(source="file") /
+  text_to_speech_advanced (gTTS): same validation, caches, metrics stages
+  and — for translation and STT — the same speech_resilience policy, via
+  call_async(). They speak the same wire protocol as deep_translator,
+  recognize_google and gTTS, so speech_fakes serves them unchanged.
+- Only the network waits are async. ffmpeg, the WAV → FLAC encode, VAD and
+  cache file I/O still block, so they run on the default executor
+  (asyncio.to_thread) for the moment they take.
+- run_requests() is the event-loop driver: a semaphore bounds how many
+  requests are in flight, results come back in input order.
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+import urllib.parse
+import weakref
+from typing import Callable, Dict, List, Optional
+
+import speech
+import speech_deadline
+import speech_metrics
+
+
+REQUEST_TIMEOUT_S = 60.0          # per request when there is no --deadline-ms budget
+MAX_CONNECTIONS_PER_HOST = 256
+IDLE_TIMEOUT_S = 30.0             # pooled connections idle longer than this are not reused
+MAX_REDIRECTS = 5
+USER_AGENT = "Mozilla/5.0 (compatible; defcomm-speech)"
+
+TRANSLATE_URL = "https://translate.google.com/m"
+_TTS_AUDIO = re.compile(r'jQ1olc","\[\\"(.*)\\"]')
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# HTTP CLIENT  (aiohttp.ClientSession, one connection pool per event loop)
+# ─────────────────────────────────────────────────────────────────────────────
+
+class HTTPResponse:
+    def __init__(self, status: int, headers: Dict[str, str], body: bytes):
+        self.status = status
+        self.headers = headers     # lower-cased names
+        self.body = body
+
+    def text(self) -> str:
+        return self.body.decode("utf-8", errors="replace")
+
+
+_url_rewriter: Optional[Callable[[str], str]] = None
+
+
+def set_url_rewriter(rewriter: Optional[Callable[[str], str]]) -> Optional[Callable[[str], str]]:
+    """
+    Route every request URL through `rewriter` (speech_fakes uses this to
+    point the clients at local stand-ins). Returns the previous rewriter.
+    """
+    global _url_rewriter
+    previous, _url_rewriter = _url_rewriter, rewriter
+    return previous
+
+
+async def _check_redirect(request, handler):
+    """
+    aiohttp middleware, run for every hop: a redirect to a URL the rewriter
+    would have sent elsewhere (a real Google endpoint in a fake run) is refused.
+    """
+    if _url_rewriter is not None and _url_rewriter(str(request.url)) != str(request.url):
+        raise RuntimeError(f"Refusing a redirect past the URL rewriter: {request.url}")
+    return await handler(request)
+
+
+class AsyncHTTPClient:
+    """
+    An aiohttp.ClientSession with the settings every backend call shares —
+    keep-alive connections, at most `max_per_host` per origin (the rest
+    wait), redirects followed, proxy settings from the environment — plus
+    request/connection counts for stats(). Not safe to share between event
+    loops — see client().
+    """
+
+    def __init__(self, max_per_host: int = MAX_CONNECTIONS_PER_HOST, idle_timeout: float = IDLE_TIMEOUT_S):
+        self.max_per_host = max_per_host
+        self.idle_timeout = idle_timeout
+        self.requests = 0
+        self.opened = 0
+        self._session = None
+
+    def _client(self):
+        """The aiohttp session, (re)opened on first use and after aclose()."""
+        if self._session is not None:
+            return self._session
+        import aiohttp
+
+        async def _opened(session, context, params):
+            self.opened += 1
+
+        tracing = aiohttp.TraceConfig()
+        tracing.on_connection_create_end.append(_opened)
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=0, limit_per_host=self.max_per_host, keepalive_timeout=self.idle_timeout,
+            ),
+            headers={"User-Agent": USER_AGENT},
+            # Rewritten (fake) traffic goes to 127.0.0.1 — never through a proxy
+            trust_env=_url_rewriter is None,
+            trace_configs=[tracing],
+            middlewares=(_check_redirect,),
+        )
+        return self._session
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        body: bytes = b"",
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+    ) -> HTTPResponse:
+        """
+        Send one request, following redirects, and read the whole response.
+
+        Raises:
+            One of transport_errors() on network failures, TimeoutError after
+            `timeout` (default REQUEST_TIMEOUT_S). Any HTTP status is
+            returned, not raised.
+        """
+        import aiohttp
+
+        if _url_rewriter is not None:
+            url = _url_rewriter(url)
+        self.requests += 1
+        async with self._client().request(
+            method, url, data=body or None, headers=headers, max_redirects=MAX_REDIRECTS,
+            timeout=aiohttp.ClientTimeout(total=timeout or REQUEST_TIMEOUT_S),
+        ) as response:
+            payload = await response.read()
+            return HTTPResponse(
+                response.status, {name.lower(): value for name, value in response.headers.items()}, payload,
+            )
+
+    async def aclose(self):
+        """Close every pooled connection (the next request opens a new pool)."""
+        if self._session is not None:
+            session, self._session = self._session, None
+            await session.close()
+
+    def stats(self) -> dict:
+        return {"opened": self.opened, "reused": max(0, self.requests - self.opened)}
+
+
+_clients = weakref.WeakKeyDictionary()
+
+
+def client() -> AsyncHTTPClient:
+    """The running event loop's shared AsyncHTTPClient."""
+    loop = asyncio.get_running_loop()
+    shared = _clients.get(loop)
+    if shared is None:
+        shared = _clients[loop] = AsyncHTTPClient()
+    return shared
+
+
+def transport_errors() -> tuple:
+    """Network failures worth a retry, for speech_resilience's `retryable`."""
+    import aiohttp
+
+    return (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# TRANSLATION  (deep_translator's GoogleTranslator request, on the loop)
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _parse_translation(page: str, text: str) -> str:
+    """Pull the translation out of translate.google.com/m the way GoogleTranslator does."""
+    from bs4 import BeautifulSoup
+    from deep_translator.exceptions import TranslationNotFound
+
+    soup = BeautifulSoup(page, "html.parser")
+    element = soup.find("div", {"class": "t0"}) or soup.find("div", {"class": "result-container"})
+    if not element:
+        raise TranslationNotFound(text)
+    return element.get_text(strip=True)
+
+
+async def _translate_codes_async(source_code: str, target_code: str, text: str) -> str:
+    """_translate_codes() on the event loop — one backend request, no validation or cache."""
+    from deep_translator.exceptions import NotValidLength, RequestError, TooManyRequests, TranslationNotFound
+    import speech_resilience
+
+    if len(text) > speech.MAX_TRANSLATE_CHARS:
+        raise NotValidLength(text, 0, speech.MAX_TRANSLATE_CHARS)
+    url = f"{TRANSLATE_URL}?{urllib.parse.urlencode({'tl': target_code, 'sl': source_code, 'q': text.strip()})}"
+
+    async def _once():
+        response = await client().request("GET", url, timeout=speech_deadline.timeout())
+        if response.status == 429:
+            raise TooManyRequests()
+        if not 200 <= response.status < 300:
+            raise RequestError()
+        return _parse_translation(response.text(), text)
+
+    translated = await speech_resilience.call_async(
+        "translate", _once, permanent=(NotValidLength, TranslationNotFound),
+        retryable=(RequestError, TooManyRequests) + transport_errors(),
+    )
+    if not translated:
+        raise RuntimeError("Translation returned empty result.")
+    return translated
+
+
+async def translate_async(source_lang: str, target_lang: str, text: str) -> str:
+    """
+    _translate_nigerian_text() for coroutines: same language validation,
+    translation cache and "translate" metrics stage.
+
+    Raises:
+        ValueError on unsupported languages, or the backend's error.
+    """
+    source_code, target_code = speech._resolve_translate_codes(source_lang, target_lang)
+    if source_code == target_code or not text.strip():
+        return text
+
+    from speech_cache import get_translation_cache
+
+    cache = get_translation_cache()
+    if cache is not None:
+        cached = cache.get(source_code, target_code, text)
+        speech_metrics.flag("translate_cache_hit", cached is not None)
+        if cached is not None:
+            return cached
+
+    with speech_metrics.stage("translate", chars=len(text)):
+        translated = await _translate_codes_async(source_code, target_code, text)
+
+    if cache is not None:
+        cache.put(source_code, target_code, text, translated)
+    return translated
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# SPEECH-TO-TEXT  (recognize_google's request, on the loop)
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _decode(audio_file: str):
+    """Blocking: an upload → sr.AudioData through convert_to_wav (runs on the executor)."""
+    import speech_recognition as sr
+
+    wav_file = speech.convert_to_wav(audio_file)
+    if wav_file is None:
+        return None
+    try:
+        with sr.AudioFile(wav_file) as source:
+            return sr.Recognizer().record(source)
+    finally:
+        if wav_file != audio_file:
+            speech.release_converted(wav_file)
+
+
+async def recognize_async(audio, language: str) -> str:
+    """
+    recognize_google() for an sr.AudioData: the FLAC encode runs on the
+    executor, the request on the loop, through speech_resilience.
+
+    Raises:
+        sr.UnknownValueError when nothing was recognised, sr.RequestError
+        (or the network error) when the backend failed.
+    """
+    import speech_recognition as sr
+    import speech_resilience
+
+    if not speech._flac_upload_available():
+        # Older SpeechRecognition: no request helpers to reuse — block a worker thread instead
+        return await asyncio.to_thread(speech._recognize, sr.Recognizer(), audio, language)
+
+    from speech_recognition.recognizers.google import ENDPOINT, OutputParser, create_request_builder
+
+    builder = create_request_builder(endpoint=ENDPOINT, language=language)
+    flac = await asyncio.to_thread(builder.build_data, audio)
+    headers = builder.build_headers(audio)
+    url = builder.build_url()
+    parser = OutputParser(show_all=False, with_confidence=False)
+
+    async def _once():
+        response = await client().request(
+            "POST", url, body=flac, headers=headers,
+            timeout=speech_deadline.timeout(reserve=speech.DEADLINE_TRANSLATE_RESERVE_S),
+        )
+        if not 200 <= response.status < 300:
+            raise sr.RequestError(f"recognition request failed: HTTP {response.status}")
+        return parser.parse(response.text())
+
+    return await speech_resilience.call_async(
+        "stt", _once, permanent=(sr.UnknownValueError,), retryable=(sr.RequestError,) + transport_errors(),
+    )
+
+
+async def _recognize_long_async(audio, language: str, concurrency: int) -> Optional[str]:
+    """
+    recognize_long_audio() on the loop: silence-split segments recognised
+    concurrently, and a failed segment handled the same way.
+    """
+    import speech_recognition as sr
+    from speech_audio import DEFAULT_RATE, SAMPLE_WIDTH, split_on_silence
+
+    pcm = audio.get_raw_data(convert_rate=DEFAULT_RATE, convert_width=SAMPLE_WIDTH)
+    bounds = await asyncio.to_thread(split_on_silence, pcm, DEFAULT_RATE, max_segment_s=speech.LONG_AUDIO_SEGMENT_S)
+    print(f"Long audio: {len(pcm) / float(DEFAULT_RATE * SAMPLE_WIDTH):.1f}s in {len(bounds)} segments.",
+          file=sys.stderr)
+    slots = asyncio.Semaphore(max(1, concurrency))
+
+    async def _segment(index: int, start: int, end: int):
+        async with slots:
+            try:
+                return await recognize_async(sr.AudioData(pcm[start:end], DEFAULT_RATE, SAMPLE_WIDTH), language)
+            except sr.UnknownValueError:
+                return ""
+            except Exception as e:
+                print(f"STT segment {index + 1}/{len(bounds)} failed: {e}", file=sys.stderr)
+                return e
+
+    parts = await asyncio.gather(*(_segment(i, start, end) for i, (start, end) in enumerate(bounds)))
+    bytes_per_s = DEFAULT_RATE * SAMPLE_WIDTH
+    return speech._stitch_segments(parts, [(start / bytes_per_s, end / bytes_per_s) for start, end in bounds])
+
+
+async def speech_to_text_async(
+    audio_file: str,
+    language: str = "en-US",
+    vad: bool = speech.VAD_ENABLED,
+    stt_concurrency: int = 4,
+) -> Optional[str]:
+    """
+    speech_to_text(source="file") for coroutines: files over
+    LONG_AUDIO_THRESHOLD_S are split on silence and their segments
+    recognised concurrently.
+
+    Returns:
+        Recognised text, or None on failure (the reason goes to stderr).
+    """
+    try:
+        import speech_recognition as sr
+    except ImportError:
+        print("SpeechRecognition not installed. Run: pip install SpeechRecognition", file=sys.stderr)
+        return None
+
+    if not os.path.exists(audio_file):
+        print(f"Audio file not found: {audio_file}", file=sys.stderr)
+        return None
+
+    with speech_metrics.stage("decode", bytes_in=os.path.getsize(audio_file)) as m:
+        audio = await asyncio.to_thread(_decode, audio_file)
+        if audio is None:
+            print("Could not convert audio to WAV. Aborting STT.", file=sys.stderr)
+            return None
+        m["bytes_out"] = len(audio.frame_data)
+    speech_deadline.complete("decode")
+
+    try:
+        if vad:
+            audio = await asyncio.to_thread(speech.trim_audio, audio)
+
+        duration = len(audio.frame_data) / float(audio.sample_rate * audio.sample_width)
+        with speech_metrics.stage("stt", bytes=len(audio.frame_data), audio_s=round(duration, 2)):
+            if duration > speech.LONG_AUDIO_THRESHOLD_S:
+                text = await _recognize_long_async(audio, language, stt_concurrency)
+            else:
+                text = await recognize_async(audio, language)
+    except speech_deadline.DeadlineExceeded:
+        print("Speech recognition skipped: the request deadline ran out.", file=sys.stderr)
+        speech_deadline.skip("stt", "deadline")
+        return None
+    except sr.UnknownValueError:
+        print("Could not understand audio.", file=sys.stderr)
+        return None
+    except Exception as e:
+        print(f"Google API error: {e}", file=sys.stderr)
+        speech_deadline.skip("stt", speech_deadline.reason_for(e))
+        return None
+
+    if not text:
+        print("Could not understand audio.", file=sys.stderr)
+        return None
+    print(f"Recognised: \"{text}\"", file=sys.stderr)
+    speech_deadline.complete("stt")
+    return text
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# TEXT-TO-SPEECH  (gTTS's batchexecute requests, on the loop)
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _tts_audio(tts, response: HTTPResponse) -> bytes:
+    """The mp3 bytes in a batchexecute response, decoded as gTTS.stream() does."""
+    from gtts.tts import gTTSError
+
+    audio = []
+    for line in response.text().splitlines():
+        if "jQ1olc" in line:
+            found = _TTS_AUDIO.search(line)
+            if not found:
+                raise gTTSError(tts=tts)
+            audio.append(base64.b64decode(found.group(1).encode("ascii")))
+    if not audio:
+        raise gTTSError(tts=tts)
+    return b"".join(audio)
+
+
+async def synthesize_async(text: str, language: str = "en", slow: bool = False) -> bytes:
+    """
+    gTTS `text` and return the mp3 bytes. gTTS splits text into ~100
+    character parts and requests them one after another; here they all go
+    out at once and are joined in order.
+    """
+    from gtts import gTTS
+    from gtts.tts import gTTSError
+
+    tts = gTTS(text=text, lang=language, slow=slow)
+
+    async def _part(prepared) -> bytes:
+        body = prepared.body.encode("utf-8") if isinstance(prepared.body, str) else (prepared.body or b"")
+        response = await client().request(
+            "POST", prepared.url, body=body, headers=dict(prepared.headers), timeout=speech_deadline.timeout(),
+        )
+        if not 200 <= response.status < 300:
+            raise gTTSError(f"TTS request failed: HTTP {response.status}")
+        return _tts_audio(tts, response)
+
+    # _prepare_requests() is what gTTS.stream() sends: same tokenizing, RPC and headers
+    return b"".join(await asyncio.gather(*(_part(p) for p in tts._prepare_requests())))
+
+
+async def text_to_speech_async(
+    text: str,
+    language: str = "en",
+    engine: str = "gtts",
+    speed: float = 1.0,
+    save_path: Optional[str] = None,
+) -> Optional[str]:
+    """
+    text_to_speech_advanced(play=False) for coroutines, sharing its audio
+    store. pyttsx3 is local and synchronous, so it runs on the executor.
+
+    Returns:
+        Path to the audio file, or None on failure.
+    """
+    if engine.lower() != "gtts":
+        return await asyncio.to_thread(
+            speech.text_to_speech_advanced, text, language, engine, "female", speed, save_path, False,
+        )
+
+    from speech_cache import AudioStore, get_audio_store
+
+    fmt = (os.path.splitext(save_path)[1].lstrip(".").lower() if save_path else "") or "mp3"
+    cache_key = AudioStore.make_key(text, language, "gtts", "female", speed, fmt)
+    store = get_audio_store()
+    audio_file = save_path or os.path.join(tempfile.gettempdir(), f"tts_{cache_key}.mp3")
+
+    try:
+        cached = store.lookup(cache_key, fmt) if store else None
+        speech_metrics.flag("tts_cache_hit", cached is not None)
+
+        if cached is None:
+            with speech_metrics.stage("tts", chars=len(text)) as m:
+                audio = await synthesize_async(text, language, slow=0.5 <= speed < 1.0)
+                m["bytes"] = len(audio)
+
+            def _write(path):
+                os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+                with open(path, "wb") as fh:
+                    fh.write(audio)
+
+            if store:
+                cached = await asyncio.to_thread(store.write, cache_key, fmt, _write)
+            if not cached:
+                await asyncio.to_thread(_write, audio_file)
+                return audio_file
+        else:
+            print(f"TTS cache hit: {cached}", file=sys.stderr)
+
+        with speech_metrics.stage("write"):
+            await asyncio.to_thread(store.materialize, cached, audio_file)
+        return audio_file
+
+    except ImportError:
+        print("gTTS not installed. Run: pip install gtts", file=sys.stderr)
+        return None
+    except Exception as e:
+        print(f"gTTS error: {e}", file=sys.stderr)
+        return None
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# EVENT-LOOP DRIVER
+# ─────────────────────────────────────────────────────────────────────────────
+
+async def handle_async(request: dict) -> dict:
+    """
+    One request — {"source", "target", "text" | "file", "tts", "save_output",
+    "deadline_ms"} — through the text or file branch of handle_request().
+
+    Returns:
+        {"output": ..., "audio": ...} ("audio" only with "tts"), or {"error": ...}.
+    """
+    try:
+        source = (request.get("source") or "").lower().strip()
+        target = (request.get("target") or "").lower().strip()
+        if not source or not target:
+            raise ValueError("source and target are required.")
+        if bool(request.get("text")) == bool(request.get("file")):
+            raise ValueError("Provide exactly one of text or file.")
+
+        with speech_deadline.within(request.get("deadline_ms")):
+            text = request.get("text")
+            if text is None:
+                if not speech._check_pipeline_languages(source, [target]):
+                    raise ValueError(f"Unsupported language pair {source} → {target}.")
+                text = await speech_to_text_async(request["file"], speech.NIGERIAN_LANGUAGE_MAP["stt"][source])
+                if not text:
+                    raise RuntimeError("Speech pipeline failed.")
+
+            result = {"output": await translate_async(source, target, text)}
+            if request.get("file"):
+                result["transcript"] = text
+
+            if request.get("tts"):
+                tts_lang = speech.resolve_tts_language(speech.NIGERIAN_LANGUAGE_MAP["tts"].get(target, "en"))
+                result["audio"] = await text_to_speech_async(
+                    result["output"], tts_lang, save_path=request.get("save_output"),
+                )
+            return result
+
+    except Exception as e:
+        return {"error": str(e) or type(e).__name__}
+
+
+async def run_requests(
+    requests: List[dict],
+    concurrency: int = MAX_CONNECTIONS_PER_HOST,
+    on_result: Optional[Callable[[int, dict], None]] = None,
+) -> List[dict]:
+    """
+    Run every request on this event loop with at most `concurrency` in
+    flight, and close the loop's connection pool when done.
+
+    Returns:
+        Results in input order (see handle_async); on_result(index, result)
+        is called as each one finishes.
+    """
+    slots = asyncio.Semaphore(max(1, concurrency))
+
+    async def _one(index: int, request: dict) -> dict:
+        async with slots:
+            result = await handle_async(request)
+        if on_result is not None:
+            on_result(index, result)
+        return result
+
+    try:
+        return list(await asyncio.gather(*(_one(i, r) for i, r in enumerate(requests))))
+    finally:
+        await client().aclose()
+
+
+def _load_requests(path: str, defaults: dict) -> List[dict]:
+    """JSON array or JSONL of request objects (bare strings are texts), with CLI defaults filled in."""
+    content = sys.stdin.read() if path == "-" else open(path, encoding="utf-8").read()
+    stripped = content.strip()
+    if stripped.startswith("["):
+        items = json.loads(stripped)
+    else:
+        items = [json.loads(line) for line in stripped.splitlines() if line.strip()]
+    return [{**defaults, **(item if isinstance(item, dict) else {"text": item})} for item in items]
+
+
+def main(argv) -> int:
+    parser = argparse.ArgumentParser(description="Run many speech.py requests concurrently on one event loop")
+    parser.add_argument("--batch-file",  dest="batch_file", required=True,
+                        help="JSON array / JSONL of requests ({\"text\"|\"file\", \"source\", \"target\", \"tts\"}; "
+                             "'-' = stdin)")
+    parser.add_argument("--source",      help="Default source language for requests without one")
+    parser.add_argument("--target",      help="Default target language for requests without one")
+    parser.add_argument("--tts",         action="store_true", help="Synthesize every reply")
+    parser.add_argument("--concurrency", type=int, default=MAX_CONNECTIONS_PER_HOST, help="Max requests in flight")
+    args = parser.parse_args(argv)
+
+    defaults = {key: value for key, value in (("source", args.source), ("target", args.target)) if value}
+    if args.tts:
+        defaults["tts"] = True
+    requests = _load_requests(args.batch_file, defaults)
+
+    def _emit(index: int, result: dict):
+        print(json.dumps({"index": index, **result}, ensure_ascii=False), flush=True)
+
+    async def _run():
+        results = await run_requests(requests, concurrency=args.concurrency, on_result=_emit)
+        return results, client().stats()
+
+    started = time.perf_counter()
+    with speech_metrics.recording(mode="async", requests=len(requests)) as metrics:
+        results, connections = asyncio.run(_run())
+        wall = time.perf_counter() - started
+        failed = sum(1 for r in results if "error" in r)
+        metrics.flag("failed", failed)
+        metrics.flag("connections_opened", connections["opened"])
+        metrics.flag("connections_reused", connections["reused"])
+        metrics.emit()
+
+    print(f"{len(results)} requests in {wall:.2f}s ({len(results) / wall if wall else 0:.1f}/s), "
+          f"{failed} failed, {connections['opened']} connections opened, {connections['reused']} reused.",
+          file=sys.stderr)
+    speech._report_cache_stats()
+    return 2 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
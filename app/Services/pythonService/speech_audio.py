@@ -0,0 +1,279 @@
+"""
+PCM helpers used by speech.py — framing, energy, voice activity detection,
+silence trimming and silence-based splitting.
+
+All functions take raw signed 16-bit little-endian mono PCM (what
+convert_to_wav / ffmpeg produce at 16 kHz). numpy is used when installed;
+otherwise a pure-Python fallback gives the same results, just slower.
+webrtcvad, when installed, replaces the energy/zero-crossing detector.
+"""
+
+import array
+import math
+import sys
+from typing import List, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # optional — only speeds things up
+    np = None
+
+try:
+    import webrtcvad
+except ImportError:  # optional — the energy/zero-crossing detector is used instead
+    webrtcvad = None
+
+
+SAMPLE_WIDTH = 2        # bytes per sample (s16le)
+DEFAULT_RATE = 16000    # Hz
+
+
+def _samples(pcm: bytes):
+    if np is not None:
+        return np.frombuffer(pcm[: len(pcm) - len(pcm) % SAMPLE_WIDTH], dtype="<i2")
+    samples = array.array("h")
+    samples.frombytes(pcm[: len(pcm) - len(pcm) % SAMPLE_WIDTH])
+    if sys.byteorder == "big":
+        samples.byteswap()
+    return samples
+
+
+def duration_seconds(pcm: bytes, rate: int = DEFAULT_RATE) -> float:
+    return len(pcm) / float(SAMPLE_WIDTH * rate)
+
+
+def rms(pcm: bytes) -> float:
+    """RMS energy of the whole buffer (audioop.rms for s16le, without audioop)."""
+    samples = _samples(pcm)
+    if len(samples) == 0:
+        return 0.0
+    if np is not None:
+        values = samples.astype(np.float64)
+        return float(np.sqrt((values * values).mean()))
+    return math.sqrt(sum(s * s for s in samples) / len(samples))
+
+
+def frame_energies(pcm: bytes, rate: int = DEFAULT_RATE, frame_ms: int = 30) -> List[float]:
+    """RMS energy of consecutive `frame_ms` frames (the last partial frame is dropped)."""
+    frame_len = max(1, rate * frame_ms // 1000)
+    samples = _samples(pcm)
+    n_frames = len(samples) // frame_len
+    if n_frames == 0:
+        return []
+
+    if np is not None:
+        frames = samples[: n_frames * frame_len].astype(np.float64).reshape(n_frames, frame_len)
+        return np.sqrt((frames * frames).mean(axis=1)).tolist()
+
+    energies = []
+    for i in range(n_frames):
+        chunk = samples[i * frame_len:(i + 1) * frame_len]
+        energies.append(math.sqrt(sum(s * s for s in chunk) / frame_len))
+    return energies
+
+
+def frame_zero_crossings(pcm: bytes, rate: int = DEFAULT_RATE, frame_ms: int = 30) -> List[float]:
+    """Zero-crossing rate (crossings per sample) of consecutive `frame_ms` frames."""
+    frame_len = max(2, rate * frame_ms // 1000)
+    samples = _samples(pcm)
+    n_frames = len(samples) // frame_len
+    if n_frames == 0:
+        return []
+
+    if np is not None:
+        signs = np.signbit(samples[: n_frames * frame_len].reshape(n_frames, frame_len))
+        return (signs[:, 1:] != signs[:, :-1]).mean(axis=1).tolist()
+
+    rates = []
+    for i in range(n_frames):
+        chunk = samples[i * frame_len:(i + 1) * frame_len]
+        crossings = sum(1 for a, b in zip(chunk, chunk[1:]) if (a < 0) != (b < 0))
+        rates.append(crossings / (frame_len - 1))
+    return rates
+
+
+def silence_threshold(energies: List[float], floor: float = 100.0) -> float:
+    """
+    Adaptive silence level: a few times the noise floor (quietest 5% of frames),
+    capped at half the median so mostly-silent recordings still split.
+    """
+    if not energies:
+        return floor
+    ordered = sorted(energies)
+    noise = ordered[len(ordered) // 20]
+    median = ordered[len(ordered) // 2]
+    return max(floor, min(noise * 3.0, median * 0.5))
+
+
+def split_on_silence(
+    pcm: bytes,
+    rate: int = DEFAULT_RATE,
+    max_segment_s: float = 30.0,
+    min_segment_s: float = 5.0,
+    frame_ms: int = 30,
+) -> List[Tuple[int, int]]:
+    """
+    Split PCM into segments no longer than `max_segment_s`, cutting at the
+    quietest point available so words are not chopped in half.
+
+    Within each window the cut goes at the last silent frame after
+    `min_segment_s`; if there is none, at the lowest-energy frame in the
+    second half of the window.
+
+    Returns:
+        List of (start_byte, end_byte) offsets covering the whole input.
+    """
+    energies = frame_energies(pcm, rate, frame_ms)
+    frame_bytes = max(1, rate * frame_ms // 1000) * SAMPLE_WIDTH
+    if not energies:
+        return [(0, len(pcm))] if pcm else []
+
+    threshold = silence_threshold(energies)
+    max_frames = max(2, int(max_segment_s * 1000 / frame_ms))
+    min_frames = min(max_frames - 1, int(min_segment_s * 1000 / frame_ms))
+
+    segments = []
+    start = 0
+    n = len(energies)
+    while start < n:
+        end = start + max_frames
+        # Don't leave a sliver of a segment behind — stretch the last one instead
+        if end >= n - max(1, min_frames // 5):
+            segments.append((start * frame_bytes, len(pcm)))
+            break
+
+        window = range(start + max(min_frames, 1), end)
+        silent = [i for i in window if energies[i] < threshold]
+        if silent:
+            cut = silent[-1]
+        else:
+            second_half = range(start + max_frames // 2, end)
+            cut = min(second_half, key=lambda i: energies[i])
+
+        segments.append((start * frame_bytes, cut * frame_bytes))
+        start = cut
+
+    return segments
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# VOICE ACTIVITY DETECTION / SILENCE TRIMMING
+# ─────────────────────────────────────────────────────────────────────────────
+
+VAD_FRAME_MS = 30          # webrtcvad accepts 10, 20 or 30 ms frames
+VAD_PAD_MS = 200           # kept around speech so word onsets and tails survive
+VAD_MAX_PAUSE_MS = 600     # longer pauses are shortened to this
+ZCR_FRICATIVE = 0.25       # quiet frames crossing zero this often are likely s/f/sh sounds
+WEBRTC_RATES = (8000, 16000, 32000, 48000)
+
+
+def speech_frames(
+    pcm: bytes,
+    rate: int = DEFAULT_RATE,
+    frame_ms: int = VAD_FRAME_MS,
+    aggressiveness: int = 2,
+) -> List[bool]:
+    """
+    Per-frame speech / non-speech decision.
+
+    Uses webrtcvad when installed (and the rate is one it supports). Otherwise
+    a frame is speech when its energy clears the adaptive silence threshold,
+    or — for quiet unvoiced consonants — clears half of it with a high
+    zero-crossing rate.
+    """
+    frame_len = rate * frame_ms // 1000
+    if webrtcvad is not None and rate in WEBRTC_RATES and frame_ms in (10, 20, 30):
+        vad = webrtcvad.Vad(aggressiveness)
+        frame_bytes = frame_len * SAMPLE_WIDTH
+        return [
+            vad.is_speech(pcm[i:i + frame_bytes], rate)
+            for i in range(0, len(pcm) - frame_bytes + 1, frame_bytes)
+        ]
+
+    energies = frame_energies(pcm, rate, frame_ms)
+    if not energies:
+        return []
+    threshold = silence_threshold(energies)
+
+    if np is not None:
+        energy = np.asarray(energies)
+        zcr = np.asarray(frame_zero_crossings(pcm, rate, frame_ms))
+        return ((energy >= threshold) | ((energy >= threshold / 2) & (zcr >= ZCR_FRICATIVE))).tolist()
+
+    # Only the borderline frames need a zero-crossing count
+    frame_bytes = frame_len * SAMPLE_WIDTH
+    decisions = []
+    for i, energy in enumerate(energies):
+        if energy >= threshold:
+            decisions.append(True)
+        elif energy >= threshold / 2:
+            zcr = frame_zero_crossings(pcm[i * frame_bytes:(i + 1) * frame_bytes], rate, frame_ms)
+            decisions.append(bool(zcr) and zcr[0] >= ZCR_FRICATIVE)
+        else:
+            decisions.append(False)
+    return decisions
+
+
+def trim_silence(
+    pcm: bytes,
+    rate: int = DEFAULT_RATE,
+    frame_ms: int = VAD_FRAME_MS,
+    pad_ms: int = VAD_PAD_MS,
+    max_pause_ms: int = VAD_MAX_PAUSE_MS,
+) -> Tuple[bytes, float]:
+    """
+    Drop leading/trailing silence and shorten long pauses.
+
+    Speech frames are widened by `pad_ms` on both sides; any remaining gap
+    longer than `max_pause_ms` keeps only `max_pause_ms` of it (half from
+    each side), so the recogniser still hears a pause between phrases.
+    Audio with no detected speech is returned unchanged — a false negative
+    there would throw away the whole recording.
+
+    Returns:
+        (trimmed PCM, seconds removed)
+    """
+    decisions = speech_frames(pcm, rate, frame_ms)
+    if not any(decisions):
+        return pcm, 0.0
+
+    frame_bytes = max(1, rate * frame_ms // 1000) * SAMPLE_WIDTH
+    pad = max(0, pad_ms // frame_ms)
+    n = len(decisions)
+
+    keep = [False] * n
+    for i, is_speech in enumerate(decisions):
+        if is_speech:
+            for j in range(max(0, i - pad), min(n, i + pad + 1)):
+                keep[j] = True
+
+    # Runs of frames to keep, as [start, end) frame indices
+    runs = []
+    for i, kept in enumerate(keep):
+        if kept and (not runs or runs[-1][1] != i):
+            runs.append([i, i + 1])
+        elif kept:
+            runs[-1][1] = i + 1
+
+    # Re-admit part of every inner pause, up to max_pause_ms of it
+    max_pause = max(0, max_pause_ms // frame_ms)
+    pieces = []
+    for k, (start, end) in enumerate(runs):
+        if k > 0:
+            gap_start = runs[k - 1][1]
+            gap = start - gap_start
+            if gap <= max_pause:
+                pieces[-1] = (pieces[-1][0], end)
+                continue
+            half = max_pause // 2
+            pieces[-1] = (pieces[-1][0], gap_start + half)
+            start -= max_pause - half
+        pieces.append((start, end))
+
+    # A trailing partial frame belongs to the last frame's decision
+    out = []
+    for start, end in pieces:
+        stop = len(pcm) if end == n else end * frame_bytes
+        out.append(pcm[start * frame_bytes:stop])
+    trimmed = b"".join(out)
+    return trimmed, duration_seconds(pcm, rate) - duration_seconds(trimmed, rate)
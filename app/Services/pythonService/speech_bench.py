@@ -0,0 +1,562 @@
+"""
+Benchmark suite for speech.py — runs against the local fakes in speech_fakes.py,
+never against Google.
+
+    python3 speech_bench.py                         # run, compare with the stored baseline
+    python3 speech_bench.py --save-baseline         # run and store as the new baseline
+    python3 speech_bench.py --only tts --latency-ms 80 --error-rate 0.05
+    python3 speech_bench.py --startup               # cold-start budget of the speech.py CLI
+    python3 speech_bench.py --only main.text --error-rate 0.2 --slow-rate 0.05 --slow-ms 800
+    python3 speech_bench.py --only video --large-video 120 --iterations 5
+    python3 speech_bench.py --only inflight --in-flight 200 --iterations 600
+
+Reports p50/p95/p99 latency and throughput per scenario. When a baseline
+exists, any scenario whose p95 grew by more than --tolerance fails the run
+(exit code 1), so this can gate changes in CI.
+
+--in-flight N adds the same text → translate → TTS request run N at a time
+on a thread pool through speech.py ("inflight.threads") and on one event
+loop through speech_async ("inflight.async"), reporting peak client threads
+and backend connections opened next to the latencies.
+
+--startup instead launches speech.py in fresh interpreters for the cheap
+paths (the `run` ping and a cached text translation) and fails if any of them
+imports a backend library or exceeds --startup-budget-ms at p50.
+"""
+
+import argparse
+import io
+import json
+import math
+import os
+import shutil
+import struct
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stderr, redirect_stdout
+from typing import Callable, Dict, List, Optional
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(HERE, "speech_bench_baseline.json")
+DEFAULT_FIXTURES = os.path.join(tempfile.gettempdir(), "defcomm-speech-bench")
+
+FIXTURE_SECONDS = (5, 30, 90)
+FIXTURE_FORMATS = ("wav", "mp3", "ogg", "mp4")
+LARGE_VIDEO_SECONDS = 120   # --large-video: a phone-sized upload, bitrate picked to hit the size
+
+SHORT_TEXT = "Good morning, how are you today?"
+LONG_TEXT = (
+    "Thank you for calling. Your request has been received and a member of our team "
+    "will reach out shortly. Please keep your phone nearby and make sure your details "
+    "are up to date. "
+) * 4
+# A ~2,000-character reply — long enough for segmented (sentence-parallel) TTS to matter
+REPLY_TEXT = LONG_TEXT * 3
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# FIXTURES
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _write_speechlike_wav(path: str, seconds: int, rate: int = 16000):
+    """Tone bursts with short pauses — enough structure for silence splitting."""
+    frames = bytearray()
+    for n in range(seconds * rate):
+        t = n / rate
+        in_pause = (t % 4.0) > 3.4
+        amp = 0 if in_pause else 6000 * (0.6 + 0.4 * math.sin(2 * math.pi * 3 * t))
+        frames += struct.pack("<h", int(amp * math.sin(2 * math.pi * 180 * t)))
+    with wave.open(path, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(bytes(frames))
+
+
+def build_fixtures(directory: str = DEFAULT_FIXTURES, large_video_mb: int = 0) -> Dict[str, str]:
+    """
+    Generate audio fixtures (reused across runs). Non-WAV formats need ffmpeg
+    and are skipped without it.
+
+    With `large_video_mb`, also a LARGE_VIDEO_SECONDS 720p mp4 of about that
+    size — noise video, so x264 can't compress it below the target bitrate.
+
+    Returns:
+        {"<seconds>s.<format>": path}, plus {"video_<mb>mb.mp4": path}
+    """
+    os.makedirs(directory, exist_ok=True)
+    have_ffmpeg = shutil.which("ffmpeg") is not None
+    fixtures = {}
+
+    for seconds in FIXTURE_SECONDS:
+        wav_path = os.path.join(directory, f"{seconds}s.wav")
+        if not os.path.exists(wav_path):
+            _write_speechlike_wav(wav_path, seconds)
+        fixtures[f"{seconds}s.wav"] = wav_path
+
+        for fmt in FIXTURE_FORMATS[1:]:
+            if not have_ffmpeg:
+                continue
+            path = os.path.join(directory, f"{seconds}s.{fmt}")
+            if not os.path.exists(path):
+                command = ["ffmpeg", "-y", "-loglevel", "error", "-i", wav_path]
+                if fmt == "mp4":
+                    # A real phone upload carries video too
+                    command = [
+                        "ffmpeg", "-y", "-loglevel", "error",
+                        "-f", "lavfi", "-i", f"testsrc=size=640x360:rate=25:duration={seconds}",
+                        "-i", wav_path, "-shortest", "-c:v", "libx264", "-preset", "ultrafast",
+                        "-c:a", "aac",
+                    ]
+                subprocess.run(command + [path], check=True)
+            fixtures[f"{seconds}s.{fmt}"] = path
+
+    if large_video_mb and have_ffmpeg:
+        path = os.path.join(directory, f"video_{large_video_mb}mb.mp4")
+        if not os.path.exists(path):
+            kbps = int(large_video_mb * 8 * 1024 / LARGE_VIDEO_SECONDS)
+            subprocess.run(
+                [
+                    "ffmpeg", "-y", "-loglevel", "error",
+                    "-f", "lavfi", "-i", "nullsrc=size=1280x720:rate=30,geq=lum='random(1)*255':cb=128:cr=128",
+                    "-stream_loop", "-1", "-i", fixtures[f"{FIXTURE_SECONDS[-1]}s.wav"],
+                    "-t", str(LARGE_VIDEO_SECONDS),
+                    "-c:v", "libx264", "-preset", "ultrafast",
+                    "-b:v", f"{kbps}k", "-maxrate", f"{kbps}k", "-bufsize", f"{kbps * 2}k",
+                    "-c:a", "aac",
+                    path,
+                ],
+                check=True,
+            )
+        fixtures[f"video_{large_video_mb}mb.mp4"] = path
+
+    if not have_ffmpeg:
+        print("ffmpeg not found — only WAV fixtures are available.", file=sys.stderr)
+    return fixtures
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# MEASUREMENT
+# ─────────────────────────────────────────────────────────────────────────────
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def run_scenario(fn: Callable[[int], object], iterations: int, concurrency: int, warmup: int = 1) -> dict:
+    """Call fn(i) `iterations` times across `concurrency` threads and summarise latencies."""
+    for i in range(warmup):
+        fn(-1 - i)
+
+    latencies, errors = [], 0
+
+    def _timed(i):
+        t0 = time.perf_counter()
+        ok = True
+        try:
+            ok = fn(i) is not None
+        except Exception:
+            ok = False
+        return (time.perf_counter() - t0) * 1000.0, ok
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        for ms, ok in pool.map(_timed, range(iterations)):
+            latencies.append(ms)
+            errors += 0 if ok else 1
+    wall = time.perf_counter() - started
+    return summarise(latencies, errors, concurrency, wall)
+
+
+def summarise(latencies: List[float], errors: int, concurrency: int, wall: float) -> dict:
+    iterations = len(latencies)
+    latencies = sorted(latencies)
+    return {
+        "iterations": iterations,
+        "concurrency": concurrency,
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "mean_ms": round(sum(latencies) / len(latencies), 2) if latencies else 0.0,
+        "throughput_per_s": round(iterations / wall, 2) if wall else 0.0,
+    }
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# IN-FLIGHT  (thread per request vs. one event loop)
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _client_threads() -> int:
+    """Live threads, not counting the fakes' per-connection handler threads."""
+    return sum(1 for t in threading.enumerate() if "process_request_thread" not in t.name)
+
+
+class _PeakThreads:
+    """Samples _client_threads() in the background while the block runs."""
+
+    def __enter__(self):
+        self.peak = _client_threads()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def _sample(self):
+        while not self._stop.wait(0.01):
+            self.peak = max(self.peak, _client_threads())
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak -= 1   # the sampler itself
+
+
+def run_in_flight(speech, fakes: dict, in_flight: int, iterations: int, out_dir: str) -> Dict[str, dict]:
+    """
+    The same text → translate → TTS request `iterations` times with
+    `in_flight` at once: on a thread pool through speech.py, then on one
+    event loop through speech_async. Each result also carries the peak
+    number of client threads and the backend connections it opened.
+    """
+    import asyncio
+    import speech_async
+
+    def _connections() -> int:
+        return sum(backend.stats()["connections"] for backend in fakes.values())
+
+    def _threaded(i):
+        output = speech._translate_nigerian_text("english", "hausa", f"{SHORT_TEXT} #{i}")
+        return speech.text_to_speech_advanced(
+            output, language="ha", play=False, save_path=os.path.join(out_dir, f"inflight_threads_{i}.mp3"),
+        )
+
+    def _request(i) -> dict:
+        return {
+            "source": "english", "target": "hausa", "text": f"{SHORT_TEXT} #{i}", "tts": True,
+            "save_output": os.path.join(out_dir, f"inflight_async_{i}.mp3"),
+        }
+
+    async def _evented():
+        slots = asyncio.Semaphore(in_flight)
+
+        async def _timed(i):
+            async with slots:
+                t0 = time.perf_counter()
+                result = await speech_async.handle_async(_request(i))
+                return (time.perf_counter() - t0) * 1000.0, "error" not in result
+
+        await speech_async.handle_async(_request(-1))   # warm-up, like run_scenario's
+        started = time.perf_counter()
+        try:
+            timed = await asyncio.gather(*(_timed(i) for i in range(iterations)))
+        finally:
+            await speech_async.client().aclose()
+        return timed, time.perf_counter() - started
+
+    results = {}
+
+    opened = _connections()
+    with _PeakThreads() as peak:
+        results["inflight.threads"] = run_scenario(_threaded, iterations, in_flight)
+    results["inflight.threads"].update(peak_threads=peak.peak, connections=_connections() - opened)
+
+    opened = _connections()
+    with _PeakThreads() as peak:
+        timed, wall = asyncio.run(_evented())
+    results["inflight.async"] = summarise([ms for ms, _ in timed], sum(1 for _, ok in timed if not ok), in_flight, wall)
+    results["inflight.async"].update(peak_threads=peak.peak, connections=_connections() - opened)
+    return results
+
+
+def build_scenarios(speech, fixtures: Dict[str, str], out_dir: str) -> Dict[str, Callable[[int], object]]:
+    """Map scenario name → fn(i). Each fn returns None on failure."""
+    scenarios = {}
+
+    def _main_text(i):
+        code = speech.main(["--source", "english", "--target", "hausa", "--text", f"{SHORT_TEXT} #{i}"])
+        return True if code == 0 else None
+
+    scenarios["main.text"] = _main_text
+
+    for label, text in (("short", SHORT_TEXT), ("long", LONG_TEXT), ("reply_2k", REPLY_TEXT)):
+        def _tts(i, text=text, label=label):
+            return speech.text_to_speech_advanced(
+                f"{text} #{i}", language="en", play=False,
+                save_path=os.path.join(out_dir, f"tts_{label}_{i}.mp3"),
+            )
+        scenarios[f"tts.{label}"] = _tts
+
+    for name, path in fixtures.items():
+        if not name.endswith(".wav"):
+            def _convert(i, path=path):
+                wav = speech.convert_to_wav(path)
+                if wav and wav != path:
+                    speech.release_converted(wav)
+                return wav
+            scenarios[f"convert.{name}"] = _convert
+
+            if name.endswith(speech.VIDEO_EXTENSIONS):
+                # The same conversion reading the whole video, without the audio-track fast path
+                def _convert_direct(i, convert=_convert):
+                    return convert(i)
+                _convert_direct.speech_overrides = {"VIDEO_EXTRACT": False}
+                scenarios[f"convert.{name}.direct"] = _convert_direct
+
+        def _s2s(i, path=path, name=name):
+            return speech.speech_to_speech(
+                source_lang="english", target_lang="hausa", source="file", audio_file=path,
+                save_output=os.path.join(out_dir, f"s2s_{name}_{i}.mp3"), play=False, do_tts=True,
+            )
+        scenarios[f"speech_to_speech.{name}"] = _s2s
+
+    return scenarios
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Return a description of every scenario whose p95 regressed beyond tolerance."""
+    regressions = []
+    for name, now in results.items():
+        before = baseline.get("scenarios", {}).get(name)
+        if not before or not before.get("p95_ms"):
+            continue
+        ratio = now["p95_ms"] / before["p95_ms"]
+        if ratio > 1.0 + tolerance:
+            regressions.append(f"{name}: p95 {before['p95_ms']}ms → {now['p95_ms']}ms (×{ratio:.2f})")
+    return regressions
+
+
+def _print_table(results: dict, baseline: Optional[dict]):
+    header = f"{'scenario':<34} {'p50':>9} {'p95':>9} {'p99':>9} {'ops/s':>8} {'err':>4} {'Δp95':>7}"
+    print(header)
+    print("─" * len(header))
+    for name, r in results.items():
+        delta = ""
+        before = (baseline or {}).get("scenarios", {}).get(name)
+        if before and before.get("p95_ms"):
+            delta = f"{(r['p95_ms'] / before['p95_ms'] - 1) * 100:+.0f}%"
+        print(
+            f"{name:<34} {r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} {r['p99_ms']:>9.1f} "
+            f"{r['throughput_per_s']:>8.1f} {r['errors']:>4} {delta:>7}"
+        )
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# STARTUP BUDGET
+# ─────────────────────────────────────────────────────────────────────────────
+
+# Backend libraries the cheap CLI paths must never pay for
+HEAVY_MODULES = ("deep_translator", "gtts", "speech_recognition", "pyttsx3", "requests", "urllib3", "numpy")
+
+STARTUP_CASES = {
+    "ping": ["--source", "english", "--target", "english", "--text", "run"],
+    "text.cached": ["--source", "english", "--target", "hausa", "--text", SHORT_TEXT],
+}
+
+
+def parse_importtime(stderr: str) -> Dict[str, float]:
+    """Top-level package → cumulative import time (ms) from `python -X importtime` output."""
+    packages = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = [p.strip() for p in line[len("import time:"):].split("|")]
+        if len(parts) != 3 or not parts[1].isdigit():
+            continue
+        name = parts[2].split(".")[0]
+        packages[name] = max(packages.get(name, 0.0), int(parts[1]) / 1000.0)
+    return packages
+
+
+def run_startup(runs: int, budget_ms: float) -> int:
+    """
+    Time fresh `python3 speech.py …` processes for STARTUP_CASES.
+
+    text.cached runs against a throwaway cache directory pre-seeded with its
+    translation, so it needs no network and measures only start-up cost.
+    """
+    sys.path.insert(0, HERE)
+    from speech_cache import TranslationCache
+
+    cache_dir = tempfile.mkdtemp(prefix="speech-bench-startup-")
+    seeded = TranslationCache(db_path=os.path.join(cache_dir, "translations.sqlite3"))
+    seeded.put("english", "hausa", SHORT_TEXT, f"[hausa] {SHORT_TEXT}")
+
+    env = dict(os.environ, SPEECH_CACHE_DIR=cache_dir)
+    env.pop("SPEECH_CACHE_DISABLED", None)
+    script = os.path.join(HERE, "speech.py")
+    failures = []
+
+    try:
+        print(f"{'case':<14} {'p50':>9} {'max':>9}  slowest imports")
+        for name, argv in STARTUP_CASES.items():
+            walls, imported = [], {}
+            for _ in range(runs):
+                t0 = time.perf_counter()
+                proc = subprocess.run(
+                    [sys.executable, "-X", "importtime", script] + argv,
+                    capture_output=True, text=True, env=env,
+                )
+                walls.append((time.perf_counter() - t0) * 1000.0)
+                imported = parse_importtime(proc.stderr)
+                if proc.returncode != 0:
+                    failures.append(f"{name}: exit code {proc.returncode}")
+                    break
+
+            walls.sort()
+            p50 = percentile(walls, 50)
+            slowest = sorted(imported.items(), key=lambda kv: -kv[1])[:4]
+            print(
+                f"{name:<14} {p50:>9.1f} {walls[-1]:>9.1f}  "
+                + ", ".join(f"{mod} {ms:.1f}ms" for mod, ms in slowest)
+            )
+
+            heavy = sorted(m for m in HEAVY_MODULES if m in imported)
+            if heavy:
+                failures.append(f"{name}: imports {', '.join(heavy)}")
+            if p50 > budget_ms:
+                failures.append(f"{name}: p50 {p50:.1f}ms over the {budget_ms:.0f}ms budget")
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    if failures:
+        print("\nStartup budget exceeded:\n  " + "\n  ".join(failures))
+        return 1
+    print("\nStartup within budget.")
+    return 0
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# CLI
+# ─────────────────────────────────────────────────────────────────────────────
+
+def main(argv) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark speech.py against local fake backends")
+    parser.add_argument("--iterations",   type=int, default=20)
+    parser.add_argument("--concurrency",  type=int, default=1)
+    parser.add_argument("--latency-ms",   dest="latency_ms", type=float, default=50.0, help="Fake backend base latency")
+    parser.add_argument("--jitter-ms",    dest="jitter_ms", type=float, default=20.0, help="Fake backend random extra latency")
+    parser.add_argument("--error-rate",   dest="error_rate", type=float, default=0.0, help="Fraction of fake responses that fail")
+    parser.add_argument("--slow-rate",    dest="slow_rate", type=float, default=0.0, help="Fraction of fake responses delayed by --slow-ms")
+    parser.add_argument("--slow-ms",      dest="slow_ms", type=float, default=0.0, help="Extra latency of the slow responses")
+    parser.add_argument("--only",         help="Run only scenarios whose name contains this")
+    parser.add_argument("--with-cache",   dest="with_cache", action="store_true", help="Leave speech.py's caches enabled")
+    parser.add_argument("--fixtures-dir", dest="fixtures_dir", default=DEFAULT_FIXTURES)
+    parser.add_argument("--in-flight",    dest="in_flight", type=int, default=0, metavar="N",
+                        help="Also compare thread-per-request with speech_async at N requests in flight")
+    parser.add_argument("--large-video",  dest="large_video", type=int, default=0, metavar="MB",
+                        help="Also benchmark a phone-sized mp4 upload of about this many MB (needs ffmpeg)")
+    parser.add_argument("--baseline",     default=DEFAULT_BASELINE, help="Baseline JSON to compare with / save to")
+    parser.add_argument("--save-baseline", dest="save_baseline", action="store_true")
+    parser.add_argument("--tolerance",    type=float, default=0.25, help="Allowed p95 growth before failing (0.25 = 25%%)")
+    parser.add_argument("--json",         dest="json_out", help="Also write the results to this path")
+    parser.add_argument("--startup",      action="store_true", help="Check speech.py cold-start time and imports instead")
+    parser.add_argument("--startup-runs", dest="startup_runs", type=int, default=10)
+    parser.add_argument("--startup-budget-ms", dest="startup_budget_ms", type=float, default=250.0,
+                        help="Allowed p50 wall time of a fresh speech.py process")
+    args = parser.parse_args(argv)
+
+    if args.startup:
+        return run_startup(args.startup_runs, args.startup_budget_ms)
+
+    # Must be decided before speech.py (and speech_cache) are imported
+    if not args.with_cache:
+        os.environ["SPEECH_CACHE_DISABLED"] = "1"
+    sys.path.insert(0, HERE)
+    import speech
+    import speech_fakes
+    import speech_resilience
+
+    fixtures = build_fixtures(args.fixtures_dir, large_video_mb=args.large_video)
+    out_dir = tempfile.mkdtemp(prefix="speech-bench-out-")
+    results = {}
+
+    try:
+        with speech_fakes.fake_backends(
+            args.latency_ms, args.jitter_ms, args.error_rate, slow_rate=args.slow_rate, slow_ms=args.slow_ms,
+        ) as fakes:
+            scenarios = build_scenarios(speech, fixtures, out_dir)
+            for name, fn in scenarios.items():
+                if args.only and args.only not in name:
+                    continue
+                print(f"running {name} …", file=sys.stderr)
+                # Module settings a scenario variant runs with, restored afterwards
+                overrides = getattr(fn, "speech_overrides", {})
+                saved = {key: getattr(speech, key) for key in overrides}
+                for key, value in overrides.items():
+                    setattr(speech, key, value)
+                try:
+                    # The pipeline is chatty on stdout/stderr — keep the report readable
+                    with redirect_stdout(io.StringIO()), redirect_stderr(io.StringIO()):
+                        results[name] = run_scenario(fn, args.iterations, args.concurrency)
+                finally:
+                    for key, value in saved.items():
+                        setattr(speech, key, value)
+            if args.in_flight and (not args.only or args.only in "inflight"):
+                print(f"running inflight.* ({args.in_flight} in flight) …", file=sys.stderr)
+                with redirect_stdout(io.StringIO()), redirect_stderr(io.StringIO()):
+                    results.update(run_in_flight(speech, fakes, args.in_flight, args.iterations, out_dir))
+            backend_stats = {k: v.stats() for k, v in fakes.items()}
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
+
+    baseline = None
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, encoding="utf-8") as fh:
+            baseline = json.load(fh)
+
+    _print_table(results, baseline)
+    for name, r in results.items():
+        if "peak_threads" in r:
+            print(f"{name:<34} peak threads {r['peak_threads']:>5}   connections opened {r['connections']:>5}")
+    print(f"\nfake backends: {json.dumps(backend_stats)}")
+    print(f"resilience:    {json.dumps(speech_resilience.stats())}")
+
+    report = {
+        "settings": {
+            "iterations": args.iterations,
+            "concurrency": args.concurrency,
+            "latency_ms": args.latency_ms,
+            "jitter_ms": args.jitter_ms,
+            "error_rate": args.error_rate,
+            "slow_rate": args.slow_rate,
+            "slow_ms": args.slow_ms,
+            "with_cache": args.with_cache,
+            "in_flight": args.in_flight,
+        },
+        "scenarios": results,
+    }
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+            fh.write("\n")
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if baseline is not None:
+        if baseline.get("settings") != report["settings"]:
+            print("Note: baseline was recorded with different settings.", file=sys.stderr)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print("\nRegressions:\n  " + "\n  ".join(regressions))
+            return 1
+        print("\nNo regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
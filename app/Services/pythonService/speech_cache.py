@@ -0,0 +1,781 @@
+"""
+Caches used by speech.py.
+
+Everything lives under SPEECH_CACHE_DIR (default: <tmp>/defcomm-speech-cache)
+so the CLI, the worker and concurrent Laravel requests all share it.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Callable, Optional
+
+try:
+    import fcntl
+except ImportError:   # Windows — conversions are then only deduplicated within a process
+    fcntl = None
+
+
+CACHE_DIR = os.environ.get(
+    "SPEECH_CACHE_DIR",
+    os.path.join(tempfile.gettempdir(), "defcomm-speech-cache"),
+)
+
+CACHE_DISABLED = os.environ.get("SPEECH_CACHE_DISABLED", "").lower() in ("1", "true", "yes")
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        print(f"Ignoring invalid {name}={os.environ[name]!r}, using {default}.", file=sys.stderr)
+        return default
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# TRANSLATION CACHE  (in-process LRU  →  SQLite on disk  →  backend)
+# ─────────────────────────────────────────────────────────────────────────────
+
+def normalize_text(text: str) -> str:
+    """NFC-normalise and collapse whitespace so trivially different inputs share a key."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+class TranslationCache:
+    """
+    Two-tier translation cache keyed by (source code, target code, normalized text).
+
+    Tier 1 is an in-process LRU bounded by entry count and TTL. Tier 2 is a
+    SQLite file (WAL mode) that survives restarts and is safe to share between
+    concurrent processes. A tier-2 hit is promoted into tier 1.
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        max_entries: int = 2048,
+        ttl: int = 7 * 24 * 3600,
+        max_disk_entries: int = 200_000,
+    ):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_disk_entries = max_disk_entries
+
+        self._memory = OrderedDict()   # key → (translated, stored_at)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._writes = 0
+
+        self.hits_memory = 0
+        self.hits_disk = 0
+        self.misses = 0
+
+        if db_path:
+            try:
+                os.makedirs(os.path.dirname(db_path), exist_ok=True)
+                self._connect().execute(
+                    "CREATE TABLE IF NOT EXISTS translations ("
+                    " key TEXT PRIMARY KEY,"
+                    " source TEXT NOT NULL,"
+                    " target TEXT NOT NULL,"
+                    " translated TEXT NOT NULL,"
+                    " stored_at REAL NOT NULL)"
+                )
+            except (OSError, sqlite3.Error) as e:
+                print(f"Translation cache: disk tier disabled ({e}).", file=sys.stderr)
+                self.db_path = None
+
+    # sqlite3 connections can't be shared between threads — one per thread
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def make_key(source: str, target: str, text: str) -> str:
+        raw = "\x1f".join((source, target, normalize_text(text)))
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, source: str, target: str, text: str) -> Optional[str]:
+        key = self.make_key(source, target, text)
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if now - entry[1] <= self.ttl:
+                    self._memory.move_to_end(key)
+                    self.hits_memory += 1
+                    return entry[0]
+                del self._memory[key]
+
+        if self.db_path:
+            try:
+                row = self._connect().execute(
+                    "SELECT translated, stored_at FROM translations WHERE key = ?", (key,)
+                ).fetchone()
+            except sqlite3.Error as e:
+                print(f"Translation cache read error: {e}", file=sys.stderr)
+                row = None
+
+            if row is not None and now - row[1] <= self.ttl:
+                self._remember(key, row[0], row[1])
+                with self._lock:
+                    self.hits_disk += 1
+                return row[0]
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, source: str, target: str, text: str, translated: str):
+        key = self.make_key(source, target, text)
+        now = time.time()
+        self._remember(key, translated, now)
+
+        if not self.db_path:
+            return
+        try:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO translations (key, source, target, translated, stored_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, source, target, translated, now),
+            )
+            with self._lock:
+                self._writes += 1
+                prune = self._writes % 256 == 0
+            if prune:
+                self._prune(conn, now)
+        except sqlite3.Error as e:
+            print(f"Translation cache write error: {e}", file=sys.stderr)
+
+    def _remember(self, key: str, translated: str, stored_at: float):
+        with self._lock:
+            self._memory[key] = (translated, stored_at)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _prune(self, conn: sqlite3.Connection, now: float):
+        conn.execute("DELETE FROM translations WHERE stored_at < ?", (now - self.ttl,))
+        conn.execute(
+            "DELETE FROM translations WHERE key IN ("
+            " SELECT key FROM translations ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_disk_entries,),
+        )
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits_memory": self.hits_memory,
+                "hits_disk": self.hits_disk,
+                "misses": self.misses,
+                "entries_memory": len(self._memory),
+            }
+
+
+_translation_cache = None
+_translation_cache_lock = threading.Lock()
+
+
+def get_translation_cache() -> Optional[TranslationCache]:
+    """Process-wide TranslationCache, or None when SPEECH_CACHE_DISABLED is set."""
+    global _translation_cache
+    if CACHE_DISABLED:
+        return None
+    with _translation_cache_lock:
+        if _translation_cache is None:
+            _translation_cache = TranslationCache(
+                db_path=os.path.join(CACHE_DIR, "translations.sqlite3"),
+                max_entries=_env_int("SPEECH_TRANSLATION_CACHE_SIZE", 2048),
+                ttl=_env_int("SPEECH_TRANSLATION_CACHE_TTL", 7 * 24 * 3600),
+            )
+        return _translation_cache
+
+
+def report_cache_stats():
+    """Print cache hit/miss counters on stderr (Laravel keeps stderr in its logs)."""
+    if _translation_cache is not None:
+        s = _translation_cache.stats()
+        print(
+            f"CACHE:translation hits={s['hits_memory'] + s['hits_disk']}"
+            f" (memory={s['hits_memory']} disk={s['hits_disk']}) misses={s['misses']}",
+            file=sys.stderr,
+        )
+    if _pipeline_cache is not None:
+        print(
+            f"CACHE:pipeline hits={_pipeline_cache.hits} misses={_pipeline_cache.misses}",
+            file=sys.stderr,
+        )
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# TTS AUDIO STORE  (content-addressed files, LRU eviction by total bytes)
+# ─────────────────────────────────────────────────────────────────────────────
+
+class AudioStore:
+    """
+    Content-addressed store for synthesized audio.
+
+    Files are named by a stable digest of everything that affects the audio,
+    written atomically (temp file + os.replace) and handed out by hard link,
+    or by copy when the destination is on another filesystem. A hit refreshes
+    the file's mtime, and eviction removes the oldest files until the store is
+    back under max_bytes.
+
+    Writes keep a running estimate of the store's size, so the store is only
+    walked when that estimate crosses max_bytes, on the first write, and every
+    `rescan_writes` writes — other processes write to the same store, and the
+    rescan picks up what they added.
+    """
+
+    def __init__(self, root: str, max_bytes: int = 512 * 1024 * 1024, rescan_writes: int = 256):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.rescan_writes = rescan_writes
+        self._lock = threading.Lock()
+        self._size = None        # bytes in the store as of the last walk, plus our writes since
+        self._writes = 0         # writes since the last walk
+        os.makedirs(root, exist_ok=True)
+
+    @staticmethod
+    def make_key(text: str, language: str, engine: str, voice: str, speed: float, fmt: str) -> str:
+        raw = "\x1f".join((text, language, engine, voice, repr(float(speed)), fmt))
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def path_for(self, key: str, fmt: str) -> str:
+        return os.path.join(self.root, key[:2], f"{key}.{fmt}")
+
+    def lookup(self, key: str, fmt: str) -> Optional[str]:
+        path = self.path_for(key, fmt)
+        try:
+            os.utime(path)  # mark as recently used
+        except OSError:
+            return None
+        return path
+
+    def write(self, key: str, fmt: str, writer) -> Optional[str]:
+        """
+        Produce an entry by calling writer(tmp_path), then publish it atomically.
+
+        Returns the store path, or None if the writer produced nothing.
+        """
+        path = self.path_for(key, fmt)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=f".{fmt}.tmp")
+        os.close(fd)
+        try:
+            writer(tmp_path)
+            if os.path.getsize(tmp_path) == 0:
+                return None
+            os.chmod(tmp_path, 0o644)   # mkstemp is 0600; the web server must read links to it
+            added = os.path.getsize(tmp_path)
+            try:
+                added -= os.path.getsize(path)   # replacing an entry another writer published
+            except OSError:
+                pass
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+
+        with self._lock:
+            self._writes += 1
+            if self._size is not None:
+                self._size += added
+            due = self._size is None or self._size > self.max_bytes or self._writes >= self.rescan_writes
+        if due:
+            self.evict()
+        return path
+
+    def materialize(self, store_path: str, dest: str) -> str:
+        """Place a stored file at dest — hard link when possible, copy otherwise."""
+        os.makedirs(os.path.dirname(dest) or ".", exist_ok=True)
+        if os.path.exists(dest) and os.path.samefile(store_path, dest):
+            return dest   # already linked — rename() onto the same inode would leave the temp name behind
+        tmp_dest = f"{dest}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.link(store_path, tmp_dest)
+        except OSError:
+            shutil.copyfile(store_path, tmp_dest)
+        os.replace(tmp_dest, dest)
+        return dest
+
+    def evict(self):
+        """Walk the store and remove the least recently used files until it fits max_bytes."""
+        with self._lock:
+            entries = []
+            total = 0
+            for dirpath, _, filenames in os.walk(self.root):
+                for name in filenames:
+                    if name.endswith(".tmp"):
+                        continue
+                    path = os.path.join(dirpath, name)
+                    try:
+                        st = os.stat(path)
+                    except OSError:
+                        continue
+                    entries.append((st.st_mtime, st.st_size, path))
+                    total += st.st_size
+
+            if total > self.max_bytes:
+                for _, size, path in sorted(entries):
+                    try:
+                        os.unlink(path)
+                    except OSError:
+                        continue
+                    total -= size
+                    if total <= self.max_bytes:
+                        break
+
+            self._size = total
+            self._writes = 0
+
+
+_audio_store = None
+_audio_store_lock = threading.Lock()
+
+
+def get_audio_store() -> Optional[AudioStore]:
+    """Process-wide AudioStore, or None when caching is disabled or unavailable."""
+    global _audio_store
+    if CACHE_DISABLED:
+        return None
+    with _audio_store_lock:
+        if _audio_store is None:
+            try:
+                _audio_store = AudioStore(
+                    os.path.join(CACHE_DIR, "tts"),
+                    max_bytes=_env_int("SPEECH_AUDIO_CACHE_MAX_BYTES", 512 * 1024 * 1024),
+                    rescan_writes=_env_int("SPEECH_AUDIO_CACHE_RESCAN_WRITES", 256),
+                )
+            except OSError as e:
+                print(f"TTS audio store disabled ({e}).", file=sys.stderr)
+                return None
+        return _audio_store
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# PIPELINE CACHE  (audio fingerprint → transcript, translation)
+# ─────────────────────────────────────────────────────────────────────────────
+
+FINGERPRINT_CHUNK = 1024 * 1024
+
+
+def fingerprint_file(path: str) -> str:
+    """
+    sha256 of a file's bytes, read in 1 MB chunks.
+
+    Remembered per (path, inode, size, mtime), so the pipeline cache and the
+    WAV conversion of the same upload only read it once.
+    """
+    st = os.stat(path)
+    return _fingerprint(os.path.abspath(path), st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+@lru_cache(maxsize=256)
+def _fingerprint(path: str, inode: int, size: int, mtime_ns: int) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(FINGERPRINT_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class PipelineCache:
+    """
+    speech_to_speech results keyed by an audio fingerprint and language pair:
+    the transcript and its translation.
+
+    The reply audio is not duplicated here — it already sits in the
+    AudioStore under a key derived from the translation, so a hit is served
+    from there and only a reply whose audio was evicted gets re-synthesized.
+    SQLite, bounded by entry count (least recently used first) and TTL.
+    """
+
+    def __init__(self, db_path: str, max_entries: int = 20_000, ttl: int = 7 * 24 * 3600):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._connect().execute(
+            "CREATE TABLE IF NOT EXISTS pipeline ("
+            " key TEXT PRIMARY KEY,"
+            " transcript TEXT NOT NULL,"
+            " translated TEXT NOT NULL,"
+            " stored_at REAL NOT NULL,"
+            " used_at REAL NOT NULL)"
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def make_key(fingerprint: str, source: str, target: str) -> str:
+        raw = "\x1f".join((fingerprint, source, target))
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[dict]:
+        now = time.time()
+        try:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT transcript, translated, stored_at FROM pipeline WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is not None and now - row[2] <= self.ttl:
+                conn.execute("UPDATE pipeline SET used_at = ? WHERE key = ?", (now, key))
+        except sqlite3.Error as e:
+            print(f"Pipeline cache read error: {e}", file=sys.stderr)
+            row = None
+
+        with self._lock:
+            if row is None or now - row[2] > self.ttl:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return {"transcript": row[0], "translated": row[1]}
+
+    def put(self, key: str, transcript: str, translated: str):
+        now = time.time()
+        try:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO pipeline (key, transcript, translated, stored_at, used_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, transcript, translated, now, now),
+            )
+            with self._lock:
+                self._writes += 1
+                prune = self._writes % 64 == 0
+            if prune:
+                conn.execute("DELETE FROM pipeline WHERE stored_at < ?", (now - self.ttl,))
+                conn.execute(
+                    "DELETE FROM pipeline WHERE key IN ("
+                    " SELECT key FROM pipeline ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+        except sqlite3.Error as e:
+            print(f"Pipeline cache write error: {e}", file=sys.stderr)
+
+
+_pipeline_cache = None
+_pipeline_cache_lock = threading.Lock()
+
+
+def get_pipeline_cache() -> Optional[PipelineCache]:
+    """Process-wide PipelineCache, or None when caching is disabled or unavailable."""
+    global _pipeline_cache
+    if CACHE_DISABLED:
+        return None
+    with _pipeline_cache_lock:
+        if _pipeline_cache is None:
+            try:
+                _pipeline_cache = PipelineCache(
+                    os.path.join(CACHE_DIR, "pipeline.sqlite3"),
+                    max_entries=_env_int("SPEECH_PIPELINE_CACHE_SIZE", 20_000),
+                    ttl=_env_int("SPEECH_PIPELINE_CACHE_TTL", 7 * 24 * 3600),
+                )
+            except (OSError, sqlite3.Error) as e:
+                print(f"Pipeline cache disabled ({e}).", file=sys.stderr)
+                return None
+        return _pipeline_cache
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# CONVERSION STORE  (ffmpeg output shared by concurrent requests, refcounted)
+# ─────────────────────────────────────────────────────────────────────────────
+
+CONVERSION_STALE_S = 6 * 3600   # entries a crashed process never released expire after this
+
+
+class ConversionStore:
+    """
+    Converted audio keyed by a digest of the input's content and the
+    conversion settings.
+
+    acquire() runs a conversion at most once per key at a time — other
+    threads wait on an in-process lock, other processes on an fcntl lock
+    file — publishes the result atomically and takes a reference to it;
+    release() drops the reference and the last one removes the file.
+    Entries are shared only while in use, so the store needs no size bound.
+
+    Each key has its own lock, so conversions of different inputs never
+    wait on each other.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self._locks = {}   # key → [thread lock, threads using it]
+        self._locks_guard = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    @staticmethod
+    def make_key(fingerprint: str, *settings) -> str:
+        raw = "\x1f".join((fingerprint,) + tuple(str(s) for s in settings))
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def path_for(self, key: str, fmt: str) -> str:
+        return os.path.join(self.root, f"{key}.{fmt}")
+
+    def owns(self, path: str) -> bool:
+        return os.path.dirname(os.path.abspath(path)) == os.path.abspath(self.root)
+
+    @contextmanager
+    def _thread_lock(self, key: str):
+        """The key's in-process lock, created on first use and dropped with its last user."""
+        with self._locks_guard:
+            entry = self._locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._locks_guard:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._locks[key]
+
+    @contextmanager
+    def _locked(self, key: str):
+        """Hold the key's thread lock and, where fcntl exists, its lock file."""
+        with self._thread_lock(key):
+            if fcntl is None:
+                yield
+                return
+
+            lock_path = os.path.join(self.root, f"{key}.lock")
+            while True:
+                fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                try:
+                    # The last release() unlinks the lock file; if that happened
+                    # while we waited, this lock is one nobody else will see.
+                    if os.fstat(fd).st_ino == os.stat(lock_path).st_ino:
+                        break
+                except FileNotFoundError:
+                    pass
+                os.close(fd)
+            try:
+                yield
+            finally:
+                os.close(fd)
+
+    def _refs_path(self, key: str) -> str:
+        return os.path.join(self.root, f"{key}.refs")
+
+    def _refs(self, key: str) -> int:
+        try:
+            with open(self._refs_path(key)) as fh:
+                return int(fh.read().strip() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    def _set_refs(self, key: str, refs: int):
+        tmp_path = f"{self._refs_path(key)}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as fh:
+            fh.write(str(refs))
+        os.replace(tmp_path, self._refs_path(key))
+
+    def _remove(self, key: str, path: str):
+        for leftover in (path, self._refs_path(key), os.path.join(self.root, f"{key}.lock")):
+            try:
+                os.unlink(leftover)
+            except FileNotFoundError:
+                pass
+
+    def acquire(self, key: str, fmt: str, writer: Optional[Callable[[str], bool]]) -> Optional[str]:
+        """
+        Take a reference to the entry for `key`, producing it first with
+        writer(tmp_path) if no other request has. With writer=None an
+        existing entry is shared, but none is produced.
+
+        The writer runs under the key's lock, so it must not call into the
+        store itself — prepare its inputs before acquire().
+
+        Returns the store path, or None if the writer failed or wrote nothing.
+        """
+        path = self.path_for(key, fmt)
+        with self._locked(key):
+            if os.path.exists(path):
+                print(f"Sharing converted audio: {path}", file=sys.stderr)
+                refs = self._refs(key)
+            elif writer is None:
+                self._remove(key, path)   # just the lock file
+                return None
+            else:
+                fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=f".{fmt}.tmp")
+                os.close(fd)
+                try:
+                    if not writer(tmp_path) or os.path.getsize(tmp_path) == 0:
+                        self._remove(key, path)
+                        return None
+                    os.replace(tmp_path, path)
+                finally:
+                    if os.path.exists(tmp_path):
+                        os.unlink(tmp_path)
+                refs = 0
+            self._set_refs(key, refs + 1)
+        return path
+
+    def release(self, path: str):
+        """Drop one reference to `path`; the last one removes it."""
+        key = os.path.basename(path).split(".", 1)[0]
+        with self._locked(key):
+            refs = self._refs(key) - 1
+            if refs > 0:
+                self._set_refs(key, refs)
+            else:
+                self._remove(key, path)
+
+    def sweep(self, max_age: float = CONVERSION_STALE_S):
+        """Remove entries and temp files older than max_age — references a crashed process never released."""
+        cutoff = time.time() - max_age
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            try:
+                if os.stat(path).st_mtime >= cutoff:
+                    continue
+                key, _, ext = name.partition(".")
+                if name.endswith(".tmp"):
+                    os.unlink(path)
+                elif ext not in ("refs", "lock"):
+                    with self._locked(key):
+                        self._remove(key, path)
+            except OSError:
+                continue
+
+
+_conversion_store = None
+_conversion_store_lock = threading.Lock()
+
+
+def get_conversion_store() -> Optional[ConversionStore]:
+    """
+    Process-wide ConversionStore, or None when its directory is unusable.
+
+    Used even with SPEECH_CACHE_DISABLED: it only shares conversions that
+    are in flight and keeps nothing once the last request is done with them.
+    """
+    global _conversion_store
+    with _conversion_store_lock:
+        if _conversion_store is None:
+            try:
+                _conversion_store = ConversionStore(os.path.join(CACHE_DIR, "wav"))
+                _conversion_store.sweep()
+            except OSError as e:
+                print(f"Conversion store disabled ({e}).", file=sys.stderr)
+                return None
+        return _conversion_store
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# MIC CALIBRATION  (ambient-noise energy state per input device)
+# ─────────────────────────────────────────────────────────────────────────────
+
+CALIBRATION_MAX_AGE_S = 24 * 3600   # older calibrations are redone in full
+
+
+class CalibrationStore:
+    """
+    Saved speech_recognition energy settings per input device, in one small
+    JSON file, so a session can start listening without the one-second
+    adjust_for_ambient_noise() warm-up.
+
+    Writes are read-modify-write under an fcntl lock file (where available)
+    and published with os.replace, so concurrent processes never see a torn
+    file or lose each other's devices.
+    """
+
+    def __init__(self, path: str, max_age: float = CALIBRATION_MAX_AGE_S):
+        self.path = path
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    @contextmanager
+    def _locked(self):
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            fd = os.open(f"{self.path}.lock", os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                yield
+            finally:
+                os.close(fd)
+
+    def _load(self) -> dict:
+        try:
+            with open(self.path, encoding="utf-8") as fh:
+                data = json.load(fh)
+        except (OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def get(self, device: str) -> Optional[dict]:
+        """The saved state for `device`, or None if there is none or it is older than max_age."""
+        state = self._load().get(device)
+        if not isinstance(state, dict) or time.time() - state.get("updated_at", 0) > self.max_age:
+            return None
+        return state
+
+    def put(self, device: str, state: dict):
+        with self._locked():
+            data = self._load()
+            data[device] = {**state, "updated_at": time.time()}
+            tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as fh:
+                json.dump(data, fh, indent=1)
+            os.replace(tmp_path, self.path)
+
+
+_calibration_store = None
+_calibration_store_lock = threading.Lock()
+
+
+def get_calibration_store() -> Optional[CalibrationStore]:
+    """Process-wide CalibrationStore, or None when caching is disabled or unavailable."""
+    global _calibration_store
+    if CACHE_DISABLED:
+        return None
+    with _calibration_store_lock:
+        if _calibration_store is None:
+            try:
+                _calibration_store = CalibrationStore(
+                    os.path.join(CACHE_DIR, "mic_calibration.json"),
+                    max_age=_env_int("SPEECH_CALIBRATION_MAX_AGE", CALIBRATION_MAX_AGE_S),
+                )
+            except OSError as e:
+                print(f"Mic calibration store disabled ({e}).", file=sys.stderr)
+                return None
+        return _calibration_store
@@ -0,0 +1,164 @@
+"""
+Thin client for the speech.py worker (python3 speech.py --serve).
+
+Accepts exactly the same flags as speech.py and produces the same output:
+the translated text on stdout, diagnostics (including AUDIO:<path>,
+PARTIAL:<json> and BUSY:<json>) on stderr, exit code 0 on success, 2 on
+failure and 75 when the request's lane is saturated. When no worker is
+listening it falls back to running speech.py directly, so callers never
+have to care whether the worker is up. `--stream-output -` and
+`--converse` always run locally, since their output has to go to this
+process's stdout as it is produced.
+
+Only a worker that can't be reached is replaced by a local run. Once the
+request has been sent, the worker may already have run it (or part of it),
+so a worker that fails or stops answering is reported as a failure instead
+of running the request a second time.
+"""
+
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+
+
+SPEECH_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "speech.py")
+
+DEFAULT_SOCKET = os.environ.get(
+    "SPEECH_SOCKET",
+    os.path.join(tempfile.gettempdir(), "defcomm-speech.sock"),
+)
+
+CONNECT_TIMEOUT_S = 2.0
+# How long to wait for a response: a request's --deadline-ms plus this grace,
+# or SPEECH_CLIENT_TIMEOUT seconds for requests without a deadline
+RESPONSE_GRACE_S = 3.0
+RESPONSE_TIMEOUT_S = float(os.environ.get("SPEECH_CLIENT_TIMEOUT", 300))
+
+
+def _connect(socket_path: str) -> socket.socket:
+    """A connection to the worker. Raises OSError when none is listening (or it doesn't accept)."""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(CONNECT_TIMEOUT_S)
+        sock.connect(socket_path)
+    except BaseException:
+        sock.close()
+        raise
+    return sock
+
+
+def _response_timeout(argv) -> float:
+    argv = list(argv)
+    for i, arg in enumerate(argv):
+        value = None
+        if arg == "--deadline-ms" and i + 1 < len(argv):
+            value = argv[i + 1]
+        elif arg.startswith("--deadline-ms="):
+            value = arg.split("=", 1)[1]
+        if value is not None:
+            try:
+                return float(value) / 1000.0 + RESPONSE_GRACE_S
+            except ValueError:
+                break   # the worker's parser reports it
+    return RESPONSE_TIMEOUT_S
+
+
+def _request(sock: socket.socket, payload: dict, timeout: float) -> dict:
+    """Send one request on a connected socket and wait up to `timeout` s for the response."""
+    with sock:
+        sock.settimeout(timeout)
+        sock.sendall((json.dumps(payload) + "\n").encode("utf-8"))
+
+        with sock.makefile("rb") as reader:
+            line = reader.readline()
+
+    if not line:
+        raise ConnectionError("Worker closed the connection without a response.")
+    return json.loads(line)
+
+
+def _run_locally(argv, stdin_data: str = None) -> int:
+    """Run speech.py directly (same CLI contract), replacing this process when possible."""
+    command = [sys.executable, SPEECH_SCRIPT] + list(argv)
+    if stdin_data is None:
+        os.execv(sys.executable, command)
+
+    # We already consumed stdin for a batch — hand it over explicitly
+    return subprocess.run(command, input=stdin_data.encode("utf-8")).returncode
+
+
+def _batch_payload(argv) -> dict:
+    """
+    Read --batch-file here and send its contents inline — the worker can't
+    see this process's stdin and may not share its filesystem view.
+    """
+    argv = list(argv)
+    if "--batch-file" not in argv:
+        return {"argv": argv}
+
+    i = argv.index("--batch-file")
+    path = argv[i + 1] if i + 1 < len(argv) else None
+    if path is None:
+        return {"argv": argv}   # let the worker's parser report the error
+
+    if path == "-":
+        content = sys.stdin.read()
+    else:
+        with open(path, encoding="utf-8") as fh:
+            content = fh.read()
+
+    argv[i + 1] = "-"
+    return {"argv": argv, "batch_input": content}
+
+
+def _streams_to_stdout(argv) -> bool:
+    argv = list(argv)
+    return "--stream-output" in argv and argv[argv.index("--stream-output") + 1:][:1] == ["-"]
+
+
+def main(argv) -> int:
+    if _streams_to_stdout(argv) or "--converse" in argv:
+        return _run_locally(argv)
+
+    payload = _batch_payload(argv)
+    try:
+        sock = _connect(DEFAULT_SOCKET)
+    except OSError:
+        # No worker — keep working, just slower
+        if "batch_input" in payload:
+            return _run_locally(payload["argv"], stdin_data=payload["batch_input"])
+        return _run_locally(argv)
+
+    try:
+        response = _request(sock, payload, _response_timeout(argv))
+    except socket.timeout:
+        print("Speech worker did not answer in time.", file=sys.stderr)
+        return 2
+    except (OSError, ValueError) as e:
+        print(f"Speech worker failed mid-request: {e}", file=sys.stderr)
+        return 2
+
+    if "partial" in response:
+        print(f"PARTIAL:{json.dumps(response['partial'], ensure_ascii=False)}", file=sys.stderr)
+
+    if not response.get("ok"):
+        print(response.get("error", "Worker request failed."), file=sys.stderr)
+        if "busy" in response:
+            print(f"BUSY:{json.dumps(response['busy'])}", file=sys.stderr)
+        return int(response.get("code", 2))
+
+    if "metrics" in response:
+        print(f"METRICS:{json.dumps(response['metrics'], ensure_ascii=False)}", file=sys.stderr)
+
+    if "audio" in response:
+        print(f"AUDIO:{response['audio']}", file=sys.stderr)
+
+    print(response["output"])   # ← Laravel reads this via $result->output()
+    return 2 if response.get("failed") else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
@@ -0,0 +1,161 @@
+"""
+Request deadlines for speech.py (--deadline-ms).
+
+A Deadline is bound to the current request with `within()`; each stage then
+asks `timeout()` for the time it may spend on its next blocking call (ffmpeg,
+recognize_google, a translation request, a gTTS request) instead of waiting
+on library defaults that know nothing about the caller's own timeout.
+Outside a request with a deadline the helpers return their fallbacks.
+
+The Deadline also records which stages finished and which were skipped, so
+a request that runs short can still report what it got done:
+
+    PARTIAL:{"completed": ["decode", "stt", "translate"], "skipped": {"tts": "deadline"}, ...}
+"""
+
+import contextvars
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+
+PARTIAL_PREFIX = "PARTIAL:"
+
+# Never hand a blocking call less than this — it would fail anyway
+MIN_CALL_TIMEOUT_S = 0.25
+
+
+class DeadlineExceeded(TimeoutError):
+    """The request's --deadline-ms budget ran out before a stage could start."""
+
+
+class Deadline:
+    """Wall-clock budget for one request, plus a log of completed/skipped stages."""
+
+    def __init__(self, budget_ms: float):
+        self.budget_ms = budget_ms
+        self.expires = time.monotonic() + budget_ms / 1000.0
+        self.completed = []
+        self.skipped = {}
+        self.details = {}
+        self._lock = threading.Lock()
+
+    def remaining(self) -> float:
+        """Seconds left (never negative)."""
+        return max(0.0, self.expires - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0.0
+
+    def timeout(self, cap: Optional[float] = None, reserve: float = 0.0) -> float:
+        """
+        Seconds the next blocking call may take: what's left minus `reserve`
+        (time kept back for later stages), bounded by `cap`.
+
+        Raises:
+            DeadlineExceeded if less than MIN_CALL_TIMEOUT_S would be left.
+        """
+        left = self.remaining() - reserve
+        if left < MIN_CALL_TIMEOUT_S:
+            raise DeadlineExceeded(f"Deadline of {self.budget_ms:.0f}ms exceeded.")
+        return min(left, cap) if cap is not None else left
+
+    def complete(self, stage: str):
+        with self._lock:
+            if stage not in self.completed:
+                self.completed.append(stage)
+
+    def skip(self, stage: str, reason: str):
+        with self._lock:
+            self.skipped[stage] = reason
+
+    def note(self, key: str, value):
+        with self._lock:
+            self.details[key] = value
+
+    @property
+    def degraded(self) -> bool:
+        return bool(self.skipped)
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                "deadline_ms": self.budget_ms,
+                "remaining_ms": round(self.remaining() * 1000.0, 2),
+                "completed": list(self.completed),
+                "skipped": dict(self.skipped),
+                **self.details,
+            }
+
+    def emit(self) -> dict:
+        """Print the PARTIAL: line on stderr."""
+        data = self.to_dict()
+        print(f"{PARTIAL_PREFIX}{json.dumps(data, ensure_ascii=False)}", file=sys.stderr)
+        return data
+
+
+_current = contextvars.ContextVar("speech_deadline", default=None)
+
+
+def current() -> Optional[Deadline]:
+    return _current.get()
+
+
+@contextmanager
+def within(budget_ms: Optional[float]):
+    """Bind a Deadline of `budget_ms` to the block (no deadline when None)."""
+    deadline = Deadline(budget_ms) if budget_ms else None
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
+
+
+def timeout(fallback: Optional[float] = None, reserve: float = 0.0) -> Optional[float]:
+    """Per-call timeout from the current deadline, or `fallback` when there is none."""
+    deadline = _current.get()
+    if deadline is None:
+        return fallback
+    return deadline.timeout(cap=fallback, reserve=reserve)
+
+
+def remaining(fallback: Optional[float] = None) -> Optional[float]:
+    deadline = _current.get()
+    return fallback if deadline is None else deadline.remaining()
+
+
+def reason_for(exc: BaseException) -> str:
+    """'deadline' when `exc` looks like the budget running out, else 'error'."""
+    if isinstance(exc, (DeadlineExceeded, TimeoutError)) or "timed out" in str(exc).lower():
+        return "deadline"
+    deadline = _current.get()
+    if deadline is not None and deadline.remaining() < MIN_CALL_TIMEOUT_S:
+        return "deadline"
+    return "error"
+
+
+def complete(stage: str):
+    deadline = _current.get()
+    if deadline is not None:
+        deadline.complete(stage)
+
+
+def skip(stage: str, reason: str):
+    deadline = _current.get()
+    if deadline is not None:
+        deadline.skip(stage, reason)
+
+
+def skipped(stage: str) -> bool:
+    deadline = _current.get()
+    return deadline is not None and stage in deadline.skipped
+
+
+def note(key: str, value):
+    deadline = _current.get()
+    if deadline is not None:
+        deadline.note(key, value)
@@ -0,0 +1,325 @@
+"""
+Local stand-ins for the Google backends used by speech.py.
+
+Each fake is a small threaded HTTP server on 127.0.0.1 that speaks just
+enough of the real protocol for deep_translator, gTTS and
+speech_recognition to work unmodified, with configurable latency and error
+injection:
+
+    FakeTranslate  – GET  translate.google.com/m                     (deep_translator)
+    FakeSpeech     – POST www.google.com/speech-api/v2/recognize     (recognize_google)
+    FakeTTS        – POST translate.google.com/_/TranslateWebserverUi/data/batchexecute (gTTS)
+
+route_to_fakes() redirects those URLs to the fakes in-process, for
+`requests` (deep_translator, gTTS), `urllib` (speech_recognition) and
+speech_async's client, and refuses any other request to a Google host so a
+benchmark can never hit the real network by accident.
+"""
+
+import base64
+import html
+import json
+import random
+import re
+import threading
+import time
+import urllib.parse
+import urllib.request
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+
+# A silent MPEG-1 Layer III frame (128 kbps, 44.1 kHz) — concatenations of it are valid mp3
+SILENT_MP3_FRAME = b"\xff\xfb\x90\x64" + b"\x00" * 413
+
+
+class _Server(ThreadingHTTPServer):
+    request_queue_size = 1024   # hundreds of clients may connect at once (default: 5)
+    connections = 0
+
+    def process_request(self, request, client_address):
+        self.connections += 1   # one per accepted connection — keep-alive reuse doesn't count
+        super().process_request(request, client_address)
+
+
+class FakeBackend:
+    """
+    Base class: runs a ThreadingHTTPServer in a daemon thread.
+
+    Args:
+        latency_ms: Base delay added to every response.
+        jitter_ms:  Extra uniformly random delay on top of latency_ms.
+        error_rate: Fraction (0–1) of requests answered with error_status.
+        error_status: HTTP status used for injected errors.
+        seed:       RNG seed so runs are reproducible.
+        slow_rate:  Fraction (0–1) of requests that are additionally delayed
+                    by slow_ms — a latency tail, for exercising hedging.
+        slow_ms:    Extra delay for those slow requests.
+    """
+
+    name = "fake"
+
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        seed: Optional[int] = 1234,
+        slow_rate: float = 0.0,
+        slow_ms: float = 0.0,
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.slow_rate = slow_rate
+        self.slow_ms = slow_ms
+        self.requests = 0
+        self.errors = 0
+        self.slow = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    # ── lifecycle ────────────────────────────────────────────────────────────
+    def start(self) -> "FakeBackend":
+        backend = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                backend._dispatch(self, b"")
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                backend._dispatch(self, self.rfile.read(length))
+
+            def log_message(self, *args):
+                pass
+
+        self._server = _Server(("127.0.0.1", 0), _Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    # ── request handling ─────────────────────────────────────────────────────
+    def _dispatch(self, handler: BaseHTTPRequestHandler, body: bytes):
+        with self._lock:
+            self.requests += 1
+            delay = self.latency_ms + self._rng.uniform(0, self.jitter_ms)
+            fail = self._rng.random() < self.error_rate
+            if fail:
+                self.errors += 1
+            if self._rng.random() < self.slow_rate:
+                self.slow += 1
+                delay += self.slow_ms
+
+        if delay:
+            time.sleep(delay / 1000.0)
+
+        if fail:
+            status, content_type, payload = self.error_status, "text/plain", b"injected failure"
+        else:
+            status, content_type, payload = self.respond(handler.path, body)
+
+        try:
+            handler.send_response(status)
+            handler.send_header("Content-Type", content_type)
+            handler.send_header("Content-Length", str(len(payload)))
+            handler.end_headers()
+            handler.wfile.write(payload)
+        except (BrokenPipeError, ConnectionResetError):
+            pass   # the client gave up first (e.g. a --deadline-ms timeout)
+
+    def respond(self, path: str, body: bytes):
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        connections = self._server.connections if self._server is not None else 0
+        with self._lock:
+            return {"requests": self.requests, "errors": self.errors, "slow": self.slow, "connections": connections}
+
+
+class FakeTranslate(FakeBackend):
+    """Answers like translate.google.com/m: the translation in <div class="result-container">."""
+
+    name = "translate"
+
+    @staticmethod
+    def translate(text: str, target: str) -> str:
+        # Deterministic and line-preserving, so batch packing round-trips
+        return "\n".join(f"[{target}] {line}" if line.strip() else line for line in text.split("\n"))
+
+    def respond(self, path: str, body: bytes):
+        query = urllib.parse.parse_qs(urllib.parse.urlsplit(path).query)
+        text = query.get("q", [""])[0]
+        target = query.get("tl", ["en"])[0]
+        page = (
+            "<html><body>"
+            f'<div class="result-container">{html.escape(self.translate(text, target))}</div>'
+            "</body></html>"
+        )
+        return 200, "text/html; charset=utf-8", page.encode("utf-8")
+
+
+class FakeSpeech(FakeBackend):
+    """Answers like the speech-api v2 endpoint: newline-delimited JSON results."""
+
+    name = "speech"
+
+    def respond(self, path: str, body: bytes):
+        transcript = f"fake transcript of {len(body)} bytes"
+        lines = [
+            {"result": []},
+            {
+                "result": [{"alternative": [{"transcript": transcript, "confidence": 0.9}], "final": True}],
+                "result_index": 0,
+            },
+        ]
+        payload = "\n".join(json.dumps(line) for line in lines) + "\n"
+        return 200, "application/json; charset=utf-8", payload.encode("utf-8")
+
+
+class FakeTTS(FakeBackend):
+    """Answers like gTTS's batchexecute RPC: base64 mp3 inside a jQ1olc envelope."""
+
+    name = "tts"
+
+    def respond(self, path: str, body: bytes):
+        form = urllib.parse.parse_qs(body.decode("utf-8"))
+        try:
+            rpc = json.loads(form["f.req"][0])
+            text = json.loads(rpc[0][0][1])[0]
+        except (KeyError, IndexError, ValueError):
+            return 400, "text/plain", b"bad f.req"
+
+        # Roughly one frame per character — long text yields proportionally longer audio
+        audio = SILENT_MP3_FRAME * max(1, len(text))
+        encoded = base64.b64encode(audio).decode("ascii")
+        envelope = json.dumps(
+            [["wrb.fr", "jQ1olc", json.dumps([encoded]), None, None, None, "generic"]],
+            separators=(",", ":"),   # gTTS matches the compact form byte for byte
+        )
+        payload = ")]}'\n\n" + str(len(envelope)) + "\n" + envelope + "\n"
+        return 200, "application/json; charset=utf-8", payload.encode("utf-8")
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# ROUTING  (send the real client libraries to the fakes, in-process)
+# ─────────────────────────────────────────────────────────────────────────────
+
+_GOOGLE_HOST = re.compile(r"^https?://([a-z0-9-]+\.)*google\.[a-z.]+(/|$)")
+
+
+def _routes_for(translate=None, speech=None, tts=None) -> Dict[str, str]:
+    routes = {}
+    if tts is not None:
+        routes["https://translate.google.com/_/TranslateWebserverUi/"] = tts.url + "/_/TranslateWebserverUi/"
+    if translate is not None:
+        routes["https://translate.google.com/m"] = translate.url + "/m"
+    if speech is not None:
+        routes["http://www.google.com/speech-api/"] = speech.url + "/speech-api/"
+    return routes
+
+
+def _rewrite(url: str, routes: Dict[str, str]) -> str:
+    for prefix, target in routes.items():
+        if url.startswith(prefix):
+            return target + url[len(prefix):]
+    if _GOOGLE_HOST.match(url):
+        raise RuntimeError(f"Unrouted request to a real Google endpoint in a fake run: {url}")
+    return url
+
+
+@contextmanager
+def route_to_fakes(translate=None, speech=None, tts=None):
+    """
+    Redirect Google backend URLs to the given fakes for the duration of the block.
+
+    Patches requests' HTTPAdapter.send (deep_translator, gTTS), installs a
+    global urllib opener (speech_recognition) and sets speech_async's URL
+    rewriter. Not re-entrant.
+    """
+    routes = _routes_for(translate, speech, tts)
+
+    class _RewriteHandler(urllib.request.BaseHandler):
+        handler_order = 100   # before the default handlers
+
+        def http_request(self, req):
+            req.full_url = _rewrite(req.full_url, routes)
+            return req
+
+        https_request = http_request
+
+    previous_opener = urllib.request._opener
+    # An empty ProxyHandler keeps HTTP(S)_PROXY from swallowing 127.0.0.1 traffic
+    urllib.request.install_opener(
+        urllib.request.build_opener(urllib.request.ProxyHandler({}), _RewriteHandler)
+    )
+
+    original_send = None
+    try:
+        from requests.adapters import HTTPAdapter
+    except ImportError:
+        HTTPAdapter = None
+
+    if HTTPAdapter is not None:
+        original_send = HTTPAdapter.send
+
+        def _send(adapter, request, *args, **kwargs):
+            request.url = _rewrite(request.url, routes)
+            kwargs["proxies"] = {}       # never send fake traffic through a proxy
+            return original_send(adapter, request, *args, **kwargs)
+
+        HTTPAdapter.send = _send
+
+    import speech_async
+    previous_rewriter = speech_async.set_url_rewriter(lambda url: _rewrite(url, routes))
+
+    try:
+        yield routes
+    finally:
+        urllib.request.install_opener(previous_opener)
+        if original_send is not None:
+            HTTPAdapter.send = original_send
+        speech_async.set_url_rewriter(previous_rewriter)
+
+
+@contextmanager
+def fake_backends(
+    latency_ms: float = 0.0,
+    jitter_ms: float = 0.0,
+    error_rate: float = 0.0,
+    seed: int = 1234,
+    slow_rate: float = 0.0,
+    slow_ms: float = 0.0,
+):
+    """Start all three fakes with the same settings and route traffic to them."""
+    tail = {"slow_rate": slow_rate, "slow_ms": slow_ms}
+    with FakeTranslate(latency_ms, jitter_ms, error_rate, seed=seed, **tail) as translate, \
+            FakeSpeech(latency_ms, jitter_ms, error_rate, seed=seed + 1, **tail) as speech, \
+            FakeTTS(latency_ms, jitter_ms, error_rate, seed=seed + 2, **tail) as tts, \
+            route_to_fakes(translate=translate, speech=speech, tts=tts):
+        yield {"translate": translate, "speech": speech, "tts": tts}
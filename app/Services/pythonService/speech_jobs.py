@@ -0,0 +1,578 @@
+"""
+Durable job queue for long audio translations.
+
+translateAudio holds an HTTP worker for the whole speech_to_speech run and
+long recordings run into its timeout. A job is submitted instead and comes
+back at once; a pool of worker processes takes jobs from a SQLite queue,
+records how far each one got and keeps the result for polling:
+
+    python3 speech_jobs.py submit --source english --target hausa --file in.mp3 --tts --save-output out.mp3
+        {"job": "3f2c…", "status": "queued", "position": 0, …}
+    python3 speech_jobs.py status 3f2c…
+        {"job": "3f2c…", "status": "running", "progress": "recognized", …}
+    python3 speech_jobs.py result 3f2c…
+        {"job": "3f2c…", "status": "done", "transcript": "…", "output": "…", "audio": "…", …}
+    python3 speech_jobs.py work --processes 2      # run the pool in the foreground
+
+- status goes queued → running → done | failed; progress follows
+  speech_to_speech's on_progress: decoded, recognized, translated,
+  synthesized. The transcript is stored as soon as it is recognized, so a
+  job that fails later still reports it.
+- submit starts a pool in the background when none is running for the
+  queue (the pool holds a lock file), and that pool exits after
+  SPEECH_JOBS_IDLE_S without work — nothing else has to be deployed. Run
+  `work` under a supervisor instead to keep one up permanently.
+- Workers run jobs in speech_lanes' bulk lane, so jobs share the long-audio
+  run slots with direct speech.py requests. A worker claims a job only once
+  it holds a free slot and never takes one of the lane's waiting slots.
+- A running job's worker records a heartbeat every HEARTBEAT_S. A job whose
+  worker died, or whose heartbeat is older than SPEECH_JOBS_STALE_S, is
+  queued again once and then failed. The heartbeat is needed because a PID
+  alone can be reused. Results from a worker that lost its job are dropped.
+- Finished jobs are kept for SPEECH_JOBS_TTL seconds (default: 7 days).
+
+Exit codes: 0 on success; 2 for invalid input, an unknown job ("status":
+"unknown") or — for `result` — a failed job. `result` of an unfinished job
+prints its status. Like speech_client.py, `result` replays the job's
+METRICS: line on stderr.
+"""
+
+import argparse
+import json
+import multiprocessing
+import multiprocessing.connection
+import os
+import signal
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from typing import Optional, Tuple
+
+import speech_lanes
+
+try:
+    import fcntl
+except ImportError:   # Windows — submit then never starts a pool by itself
+    fcntl = None
+
+
+JOBS_DIR = os.environ.get("SPEECH_JOBS_DIR", os.path.join(tempfile.gettempdir(), "defcomm-speech-jobs"))
+DEFAULT_DB = os.path.join(JOBS_DIR, "jobs.sqlite3")
+
+JOB_PROCESSES = int(os.environ.get("SPEECH_JOB_PROCESSES", 2))
+POOL_IDLE_S = float(os.environ.get("SPEECH_JOBS_IDLE_S", 60))       # background pools exit after this
+JOB_TTL_S = float(os.environ.get("SPEECH_JOBS_TTL", 7 * 24 * 3600))
+STALE_S = float(os.environ.get("SPEECH_JOBS_STALE_S", 120))       # running jobs without a heartbeat this long are recovered
+MAX_ATTEMPTS = 2        # a job whose worker died is retried once
+HEARTBEAT_S = 10.0      # how often a worker marks its running job as alive
+POLL_S = 0.5            # how often an idle worker looks for a job
+SUPERVISE_S = 5.0       # how often the pool checks its workers and the queue
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# QUEUE  (SQLite, shared by submitters, pollers and the pool)
+# ─────────────────────────────────────────────────────────────────────────────
+
+class JobStore:
+    """
+    The jobs table. Every call is its own short transaction, so any number
+    of processes can submit, poll and work on the same database.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_DB):
+        self.db_path = db_path
+        self._local = threading.local()
+
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        conn = self._connect()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY,"
+            " status TEXT NOT NULL,"
+            " progress TEXT,"
+            " request TEXT NOT NULL,"
+            " transcript TEXT,"
+            " output TEXT,"
+            " audio TEXT,"
+            " error TEXT,"
+            " metrics TEXT,"
+            " worker INTEGER,"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " submitted_at REAL NOT NULL,"
+            " started_at REAL,"
+            " heartbeat_at REAL,"
+            " finished_at REAL)"
+        )
+        if "heartbeat_at" not in {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}:
+            try:
+                conn.execute("ALTER TABLE jobs ADD COLUMN heartbeat_at REAL")
+            except sqlite3.OperationalError:
+                pass   # another process added it first
+        conn.execute("CREATE INDEX IF NOT EXISTS jobs_queue ON jobs (status, submitted_at)")
+
+    # sqlite3 connections can't cross threads or a fork — one per thread, per process
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.db_path, timeout=30.0, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def submit(self, request: dict) -> str:
+        job_id = uuid.uuid4().hex
+        self._connect().execute(
+            "INSERT INTO jobs (id, status, request, submitted_at) VALUES (?, 'queued', ?, ?)",
+            (job_id, json.dumps(request, ensure_ascii=False), time.time()),
+        )
+        return job_id
+
+    def get(self, job_id: str, with_result: bool = False) -> Optional[dict]:
+        """
+        The job's public record (see describe), or None for an unknown ID.
+        `with_result` adds the results once the job has finished.
+        """
+        conn = self._connect()
+        row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = describe(row, with_result=with_result and row["status"] in ("done", "failed"))
+        if row["status"] == "queued":
+            job["position"] = conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = 'queued' AND submitted_at < ?",
+                (row["submitted_at"],),
+            ).fetchone()[0]
+        return job
+
+    def queued(self) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM jobs WHERE status = 'queued'").fetchone()[0]
+
+    def claim(self, worker: int) -> Optional[Tuple[str, dict]]:
+        """Take the oldest queued job for `worker` (a pid): (job ID, request), or None."""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")   # one claimer at a time, so no job is taken twice
+        try:
+            row = conn.execute(
+                "SELECT id, request FROM jobs WHERE status = 'queued' ORDER BY submitted_at LIMIT 1"
+            ).fetchone()
+            if row is not None:
+                now = time.time()
+                conn.execute(
+                    "UPDATE jobs SET status = 'running', worker = ?, attempts = attempts + 1, started_at = ?,"
+                    " heartbeat_at = ? WHERE id = ?",
+                    (worker, now, now, row["id"]),
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return (row["id"], json.loads(row["request"])) if row is not None else None
+
+    def heartbeat(self, job_id: str, worker: int) -> bool:
+        """Mark `worker`'s running job as alive. False once the job is no longer its own."""
+        return self._connect().execute(
+            "UPDATE jobs SET heartbeat_at = ? WHERE id = ? AND status = 'running' AND worker = ?",
+            (time.time(), job_id, worker),
+        ).rowcount == 1
+
+    def progress(self, job_id: str, worker: int, stage: str, fields: dict):
+        """Record a speech_to_speech on_progress event and whatever it carries."""
+        self._connect().execute(
+            "UPDATE jobs SET progress = ?, transcript = COALESCE(?, transcript),"
+            " output = COALESCE(?, output), audio = COALESCE(?, audio), heartbeat_at = ?"
+            " WHERE id = ? AND status = 'running' AND worker = ?",
+            (
+                stage, fields.get("transcript"), fields.get("translation"), fields.get("audio"), time.time(),
+                job_id, worker,
+            ),
+        )
+
+    def finish(
+        self, job_id: str, worker: int, output: Optional[str], error: Optional[str], metrics: Optional[dict],
+    ) -> bool:
+        """
+        Mark the job done (with its final translation) or failed (with
+        `error`) — unless it was recovered from `worker` meanwhile.
+
+        Returns:
+            False when the job was no longer `worker`'s.
+        """
+        return self._connect().execute(
+            "UPDATE jobs SET status = ?, output = COALESCE(?, output), error = ?, metrics = ?, finished_at = ?"
+            " WHERE id = ? AND status = 'running' AND worker = ?",
+            (
+                "failed" if error else "done",
+                output,
+                error,
+                json.dumps(metrics, ensure_ascii=False) if metrics is not None else None,
+                time.time(),
+                job_id,
+                worker,
+            ),
+        ).rowcount == 1
+
+    def recover(self, stale_after: float = STALE_S) -> int:
+        """
+        Queue again (or fail, after MAX_ATTEMPTS) the running jobs whose
+        worker has died or sent no heartbeat for `stale_after` seconds.
+        """
+        conn = self._connect()
+        stale = time.time() - stale_after
+        orphans = [
+            row for row in conn.execute(
+                "SELECT id, worker, attempts, started_at, heartbeat_at FROM jobs WHERE status = 'running'"
+            )
+            if not _alive(row["worker"]) or (row["heartbeat_at"] or row["started_at"] or 0) < stale
+        ]
+        for row in orphans:
+            if row["attempts"] < MAX_ATTEMPTS:
+                conn.execute(
+                    "UPDATE jobs SET status = 'queued', progress = NULL, transcript = NULL, output = NULL,"
+                    " audio = NULL, worker = NULL, heartbeat_at = NULL WHERE id = ? AND status = 'running'",
+                    (row["id"],),
+                )
+            else:
+                conn.execute(
+                    "UPDATE jobs SET status = 'failed', error = 'Worker died or stopped responding while running"
+                    " the job.', finished_at = ? WHERE id = ? AND status = 'running'",
+                    (time.time(), row["id"]),
+                )
+        return len(orphans)
+
+    def prune(self, ttl: float = JOB_TTL_S):
+        self._connect().execute(
+            "DELETE FROM jobs WHERE status IN ('done', 'failed') AND finished_at < ?",
+            (time.time() - ttl,),
+        )
+
+
+def describe(row, with_result: bool = False) -> dict:
+    """A job row as the JSON the CLI prints; `with_result` adds transcript, output, audio and metrics."""
+    job = {
+        "job": row["id"],
+        "status": row["status"],
+        "progress": row["progress"],
+        "submitted_at": row["submitted_at"],
+        "started_at": row["started_at"],
+        "finished_at": row["finished_at"],
+    }
+    if row["error"]:
+        job["error"] = row["error"]
+    if with_result:
+        job["transcript"] = row["transcript"]
+        job["output"] = row["output"]
+        job["audio"] = row["audio"]
+        job["metrics"] = json.loads(row["metrics"]) if row["metrics"] else None
+    return job
+
+
+def _alive(pid: Optional[int]) -> bool:
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True   # exists, just not ours
+    return True
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# WORKERS
+# ─────────────────────────────────────────────────────────────────────────────
+
+def run_job(store: JobStore, job_id: str, request: dict):
+    """Run one job's speech_to_speech to completion and store the outcome."""
+    import speech
+    import speech_metrics
+
+    print(f"Job {job_id}: {request['source']} → {request['target']}, {request['file']}", file=sys.stderr)
+    worker = os.getpid()
+    output, error, metrics_data = None, None, None
+    finished = False
+    stop = threading.Event()
+
+    def _beat():
+        while not stop.wait(HEARTBEAT_S) and store.heartbeat(job_id, worker):
+            pass
+
+    threading.Thread(target=_beat, name="speech-job-heartbeat", daemon=True).start()
+    try:
+        with speech_metrics.recording(mode="job", job=job_id) as metrics:
+            try:
+                output = speech.speech_to_speech(
+                    source_lang=request["source"],
+                    target_lang=request["target"],
+                    source="file",
+                    audio_file=request["file"],
+                    engine=request.get("engine", "gtts"),
+                    save_output=request.get("save_output"),
+                    play=False,
+                    do_tts=bool(request.get("tts")),
+                    long_audio=request.get("long_audio"),
+                    stt_concurrency=request.get("stt_concurrency", 4),
+                    decode=request.get("decode", "file"),
+                    vad=request.get("vad", speech.VAD_ENABLED),
+                    tts_concurrency=request.get("tts_concurrency", 4),
+                    fingerprint=request.get("fingerprint", speech.PIPELINE_FINGERPRINT),
+                    on_progress=lambda stage, fields: store.progress(job_id, worker, stage, fields),
+                )
+                if not output:
+                    error = "Speech pipeline failed."
+            except Exception as e:
+                error = str(e) or type(e).__name__
+            metrics_data = metrics.emit()
+        finished = store.finish(job_id, worker, output, error, metrics_data)
+    finally:
+        stop.set()
+        # A recovered job's next attempt still needs the input
+        if finished and request.get("delete_input"):
+            try:
+                os.unlink(request["file"])
+            except OSError:
+                pass
+        speech._report_cache_stats()
+
+
+def work(db_path: str = DEFAULT_DB, idle_exit: Optional[float] = None):
+    """
+    One worker process: run queued jobs one after another, each holding a
+    bulk lane run slot; return after `idle_exit` s without a queued job.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)   # the pool decides when workers stop
+    store = JobStore(db_path)
+    lane = speech_lanes.lane("bulk")
+    idle_since = time.monotonic()
+    while True:
+        queued = store.queued()
+        slot = lane.try_acquire() if queued else None
+        claimed = store.claim(os.getpid()) if slot is not None else None
+        if claimed is None:
+            if slot is not None:
+                slot.release()
+            if queued:
+                idle_since = time.monotonic()   # waiting for a bulk slot isn't idle
+            elif idle_exit is not None and time.monotonic() - idle_since >= idle_exit:
+                return
+            time.sleep(POLL_S)
+            continue
+        try:
+            run_job(store, *claimed)
+        finally:
+            slot.release()
+        idle_since = time.monotonic()
+
+
+def _pool_lock_path(db_path: str) -> str:
+    return db_path + ".pool.lock"
+
+
+def _acquire_pool_lock(db_path: str):
+    """The open lock file if no other pool serves `db_path`, else None."""
+    handle = open(_pool_lock_path(db_path), "a")
+    if fcntl is None:
+        return handle
+    try:
+        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        handle.close()
+        return None
+    return handle
+
+
+def run_pool(db_path: str = DEFAULT_DB, processes: int = JOB_PROCESSES, idle_exit: Optional[float] = None) -> int:
+    """
+    Keep up to `processes` workers running jobs from `db_path`.
+
+    Workers that crash are replaced and their job recovered (see
+    JobStore.recover). With `idle_exit`, idle workers exit after that many
+    seconds and are only started again for queued jobs; the pool returns
+    once none is left. Without it, the pool runs until interrupted.
+
+    Returns:
+        Process exit code.
+    """
+    lock = _acquire_pool_lock(db_path)
+    if lock is None:
+        print(f"A job pool is already running for {db_path}.", file=sys.stderr)
+        return 0
+
+    processes = max(1, processes)
+    store = JobStore(db_path)
+    store.recover()
+    store.prune()
+    workers = []
+
+    def _start():
+        worker = multiprocessing.Process(target=work, args=(db_path, idle_exit), name="speech-job-worker")
+        worker.start()
+        workers.append(worker)
+
+    for _ in range(processes):
+        _start()
+    print(f"Job pool running for {db_path} ({processes} processes)", file=sys.stderr)
+
+    try:
+        while workers:
+            multiprocessing.connection.wait([w.sentinel for w in workers], timeout=SUPERVISE_S)
+            for worker in [w for w in workers if not w.is_alive()]:
+                workers.remove(worker)
+                if worker.exitcode != 0:
+                    print(f"Job worker {worker.pid} died (exit code {worker.exitcode}).", file=sys.stderr)
+            store.recover()
+            store.prune()
+            if idle_exit is None:
+                missing = processes - len(workers)
+            else:
+                missing = min(processes - len(workers), store.queued())
+            for _ in range(missing):
+                _start()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for worker in workers:
+            worker.terminate()
+        for worker in workers:
+            worker.join()
+        lock.close()
+    return 0
+
+
+def ensure_pool(db_path: str = DEFAULT_DB) -> bool:
+    """
+    Start a background pool for `db_path` unless one is already running.
+
+    Returns:
+        True if a pool was started.
+    """
+    if fcntl is None:
+        return False
+    lock = _acquire_pool_lock(db_path)
+    if lock is None:
+        return False
+    lock.close()   # the new pool takes it; if two submitters race, the second pool just exits
+
+    # Fully detached, with no pipe back to us — Laravel's Process::run
+    # otherwise waits for the pool to close stdout before submit returns
+    with open(os.path.join(os.path.dirname(os.path.abspath(db_path)), "pool.log"), "ab") as log:
+        subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "--db", db_path, "work", "--idle-exit", str(POOL_IDLE_S)],
+            stdin=subprocess.DEVNULL,
+            stdout=log,
+            stderr=log,
+            start_new_session=True,
+            close_fds=True,
+        )
+    return True
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# CLI  (called by Laravel via Process::run)
+# ─────────────────────────────────────────────────────────────────────────────
+
+def submit(args: argparse.Namespace) -> dict:
+    """Validate and queue a `submit` request. Raises ValueError on invalid input."""
+    import speech
+
+    source, target = args.source.lower().strip(), args.target.lower().strip()
+    if not speech._check_pipeline_languages(source, [target]):
+        raise ValueError(f"Unsupported language pair {source} → {target}.")
+    if not os.path.isfile(args.audio_file):
+        raise ValueError(f"Audio file not found: {args.audio_file}")
+
+    # The pool runs elsewhere — every path it gets must be absolute
+    request = {
+        "source": source,
+        "target": target,
+        "file": os.path.abspath(args.audio_file),
+        "engine": args.engine,
+        "tts": args.tts,
+        "save_output": os.path.abspath(args.save_output) if args.save_output else None,
+        "long_audio": args.long_audio,
+        "stt_concurrency": args.stt_concurrency,
+        "decode": args.decode,
+        "vad": args.vad,
+        "tts_concurrency": args.tts_concurrency,
+        "fingerprint": args.fingerprint,
+        "delete_input": args.delete_input,
+    }
+    store = JobStore(args.db)
+    job = store.get(store.submit(request))
+    if args.start_pool:
+        ensure_pool(args.db)
+    return job
+
+
+def build_parser() -> argparse.ArgumentParser:
+    import speech
+
+    parser = argparse.ArgumentParser(description="Queue long audio translations and poll for their results")
+    parser.add_argument("--db", default=DEFAULT_DB, help="Job queue database (SPEECH_JOBS_DIR/jobs.sqlite3)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    sub = commands.add_parser("submit", help="Queue a speech_to_speech job and print its ID")
+    sub.add_argument("--source",      required=True, help="Source language (english|hausa|yoruba|igbo|pidgin)")
+    sub.add_argument("--target",      required=True, help="Target language (english|hausa|yoruba|igbo|pidgin)")
+    sub.add_argument("--file",        dest="audio_file", required=True, help="Audio file path — mp3/mp4/ogg/wav")
+    sub.add_argument("--engine",      default="gtts", choices=["gtts", "pyttsx3"])
+    sub.add_argument("--tts",         action="store_true", help="Synthesize the translation")
+    sub.add_argument("--save-output", dest="save_output", help="Path to save output audio file")
+    sub.add_argument("--long-audio",  dest="long_audio", action=argparse.BooleanOptionalAction, default=None,
+                     help="Force/disable chunked recognition (default: auto for long files)")
+    sub.add_argument("--stt-concurrency", dest="stt_concurrency", type=int, default=4)
+    sub.add_argument("--decode",      default="file", choices=["file", "pipe", "flac"])
+    sub.add_argument("--vad",         action=argparse.BooleanOptionalAction, default=speech.VAD_ENABLED)
+    sub.add_argument("--tts-concurrency", dest="tts_concurrency", type=int, default=4)
+    sub.add_argument("--fingerprint", default=speech.PIPELINE_FINGERPRINT, choices=["bytes", "pcm-prefix"])
+    sub.add_argument("--delete-input", dest="delete_input", action="store_true",
+                     help="Remove --file once the job has finished (the job owns the upload)")
+    sub.add_argument("--no-pool",     dest="start_pool", action="store_false",
+                     help="Don't start a background pool; one is run separately with `work`")
+
+    sub = commands.add_parser("status", help="Print a job's status and progress")
+    sub.add_argument("job")
+
+    sub = commands.add_parser("result", help="Print a finished job's transcript, translation and audio path")
+    sub.add_argument("job")
+
+    sub = commands.add_parser("work", help="Run the worker pool in the foreground")
+    sub.add_argument("--processes",   type=int, default=JOB_PROCESSES, help="Worker processes (SPEECH_JOB_PROCESSES)")
+    sub.add_argument("--idle-exit",   dest="idle_exit", type=float,
+                     help="Exit after this many seconds without queued jobs (default: run until interrupted)")
+    return parser
+
+
+def main(argv) -> int:
+    args = build_parser().parse_args(argv)
+
+    if args.command == "work":
+        return run_pool(args.db, processes=args.processes, idle_exit=args.idle_exit)
+
+    try:
+        if args.command == "submit":
+            job = submit(args)
+        else:
+            job = JobStore(args.db).get(args.job, with_result=args.command == "result")
+            if job is None:
+                print(json.dumps({"job": args.job, "status": "unknown"}))
+                print(f"Unknown job: {args.job}", file=sys.stderr)
+                return 2
+            if job.get("metrics"):
+                print(f"METRICS:{json.dumps(job['metrics'], ensure_ascii=False)}", file=sys.stderr)
+    except (ValueError, OSError, sqlite3.Error) as e:
+        print(str(e), file=sys.stderr)
+        return 2
+
+    print(json.dumps(job, ensure_ascii=False))   # ← Laravel reads this via $result->output()
+    return 2 if args.command == "result" and job["status"] == "failed" else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
@@ -0,0 +1,207 @@
+"""
+Priority lanes and admission control for speech.py requests.
+
+Every request is assigned a lane by how long it is likely to run, so a
+10-minute recording can't hold up a five-word translation:
+
+    interactive  – --text requests (translation, TTS, streaming)
+    short_audio  – audio files up to LONG_AUDIO_THRESHOLD_S
+    bulk         – longer audio and --batch-file runs
+
+Each lane has its own run slots (concurrency) and waiting slots (queue
+depth). A request that finds no free run slot takes a waiting slot and
+polls for a run slot for at most the lane's max wait. If no waiting slot is
+free, or the wait runs out, it fails fast with LaneBusy — "busy, retry
+after N s" — instead of queueing until the caller's timeout kills it.
+
+Slots are flock()ed files under SPEECH_LANES_DIR, so the limits are shared
+by the --serve worker and every speech.py process running directly (the
+client's fallback) on the machine, and a crashed process frees its slots.
+Waiters are not served strictly in arrival order (see POLL_S).
+
+SPEECH_LANES overrides the limits, e.g. "interactive=8:16,bulk=1:2"
+(concurrency:queue depth).
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, Optional
+
+try:
+    import fcntl
+except ImportError:   # Windows — no admission control, every request runs
+    fcntl = None
+
+
+LANES_DIR = os.environ.get("SPEECH_LANES_DIR", os.path.join(tempfile.gettempdir(), "defcomm-speech-lanes"))
+# How often a waiting request looks for a free run slot. Waiters poll
+# independently, so a freed slot goes to whichever request looks first — a
+# waiter, or a new arrival that hasn't queued at all. Nobody waits longer
+# than the lane's max wait, but the order is not first come, first served.
+POLL_S = 0.025
+
+BUSY_PREFIX = "BUSY:"
+BUSY_EXIT_CODE = 75       # EX_TEMPFAIL — PythonController answers 503 with Retry-After
+
+
+class LaneBusy(RuntimeError):
+    """A lane had no run slot free within its max wait, or no room to wait."""
+
+    def __init__(self, lane: "Lane", reason: str):
+        super().__init__(f"Busy: the {lane.name} lane is {reason}, retry after {lane.retry_after_s:.0f}s.")
+        self.lane = lane.name
+        self.reason = reason
+        self.retry_after = lane.retry_after_s
+
+    def to_dict(self) -> dict:
+        return {"lane": self.lane, "reason": self.reason, "retry_after": self.retry_after}
+
+
+class Lane:
+    """
+    Args:
+        name:          Lane name, also the prefix of its slot files.
+        concurrency:   Requests that may run at once.
+        depth:         Requests that may wait for a run slot at once.
+        max_wait_s:    Longest a request waits before it is turned away.
+        retry_after_s: What a turned-away caller is told to wait.
+    """
+
+    def __init__(self, name: str, concurrency: int, depth: int, max_wait_s: float, retry_after_s: float):
+        self.name = name
+        self.concurrency = max(1, concurrency)
+        self.depth = max(0, depth)
+        self.max_wait_s = max_wait_s
+        self.retry_after_s = retry_after_s
+        # Slot files stay open between polls. flock() is per open file, so
+        # slots held by this process's other threads are skipped by name
+        self._handles = {}
+        self._held = set()
+        self._guard = threading.Lock()
+        self._pid = os.getpid()
+
+    def _take(self, kind: str, count: int) -> Optional["Slot"]:
+        """Lock the first free `kind` slot file of this lane, or return None."""
+        with self._guard:
+            if self._pid != os.getpid():
+                # A forked child shares its parent's open files, and so its locks
+                for handle in self._handles.values():
+                    handle.close()
+                self._handles, self._held, self._pid = {}, set(), os.getpid()
+            for i in range(count):
+                name = f"{self.name}.{kind}{i}"
+                if name in self._held:
+                    continue
+                handle = self._handles.get(name)
+                if handle is None:
+                    handle = self._handles[name] = open(os.path.join(LANES_DIR, name + ".lock"), "a")
+                try:
+                    fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    continue
+                self._held.add(name)
+                return Slot(self, name)
+        return None
+
+    def _release(self, name: str):
+        with self._guard:
+            if name in self._held and self._pid == os.getpid():
+                self._held.discard(name)
+                fcntl.flock(self._handles[name], fcntl.LOCK_UN)
+
+    def try_acquire(self) -> Optional["Slot"]:
+        """A free run slot, or None — never waits and never takes a waiting slot."""
+        if fcntl is None:
+            return Slot(None)
+        os.makedirs(LANES_DIR, exist_ok=True)
+        return self._take("run", self.concurrency)
+
+    def acquire(self, max_wait: Optional[float] = None) -> "Slot":
+        """
+        Take a run slot, waiting up to max_wait_s (or `max_wait`, if shorter).
+
+        Raises:
+            LaneBusy when the lane stays full or its queue is full.
+        """
+        if fcntl is None:
+            return Slot(None)
+        os.makedirs(LANES_DIR, exist_ok=True)
+
+        slot = self._take("run", self.concurrency)
+        if slot is not None:
+            return slot
+
+        waiting = self._take("wait", self.depth)
+        if waiting is None:
+            raise LaneBusy(self, "full")
+        try:
+            wait = self.max_wait_s if max_wait is None else min(max_wait, self.max_wait_s)
+            give_up = time.monotonic() + wait
+            while slot is None:
+                if time.monotonic() >= give_up:
+                    raise LaneBusy(self, "still full")
+                time.sleep(POLL_S)
+                slot = self._take("run", self.concurrency)
+        finally:
+            waiting.release()
+        return slot
+
+
+class Slot:
+    """A held run slot; release() (or process exit) frees it."""
+
+    def __init__(self, lane: Optional[Lane], name: Optional[str] = None):
+        self._lane = lane
+        self._name = name
+
+    def release(self):
+        if self._lane is not None:
+            self._lane._release(self._name)
+            self._lane = None
+
+
+def default_lanes(workers: int = 8) -> Dict[str, Lane]:
+    """
+    The lanes for a machine running `workers` requests at once (speech.py
+    --workers): text gets all of them, short audio half, bulk a quarter.
+    Max waits stay well under PythonController's 60 s / 120 s timeouts.
+    """
+    return {
+        "interactive": Lane("interactive", workers, 2 * workers, max_wait_s=5.0, retry_after_s=1.0),
+        "short_audio": Lane("short_audio", max(1, workers // 2), workers, max_wait_s=20.0, retry_after_s=5.0),
+        "bulk": Lane("bulk", max(1, workers // 4), max(1, workers // 4), max_wait_s=30.0, retry_after_s=30.0),
+    }
+
+
+def _apply_overrides(lanes: Dict[str, Lane], spec: str):
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        try:
+            name, limits = item.split("=", 1)
+            concurrency, _, depth = limits.partition(":")
+            lane = lanes[name.strip()]
+            lane.concurrency = max(1, int(concurrency))
+            if depth:
+                lane.depth = max(0, int(depth))
+        except (KeyError, ValueError):
+            print(f"Ignoring invalid SPEECH_LANES entry {item!r}.", file=sys.stderr)
+
+
+_lanes = None
+
+
+def configure(workers: int = 8) -> Dict[str, Lane]:
+    """(Re)build the process's lanes for `workers`, with SPEECH_LANES applied."""
+    global _lanes
+    lanes = default_lanes(workers)
+    _apply_overrides(lanes, os.environ.get("SPEECH_LANES", ""))
+    _lanes = lanes
+    return lanes
+
+
+def lane(name: str) -> Lane:
+    if _lanes is None:
+        configure()
+    return _lanes[name]
@@ -0,0 +1,118 @@
+"""
+Per-request stage timings for speech.py.
+
+A Metrics recorder is bound to the current request with `recording()`; code
+anywhere in the pipeline then wraps its work in `stage("stt")` etc. without
+having to thread the recorder through every call. Outside a request the
+helpers are no-ops.
+
+Output is a single line on stderr that PythonController picks up:
+
+    METRICS:{"total_ms": 812.4, "stages": {"translate": {"ms": 301.2, ...}}, "flags": {...}}
+"""
+
+import contextvars
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+
+METRICS_PREFIX = "METRICS:"
+
+
+class Metrics:
+    """Accumulates stage durations, byte counts and flags for one request."""
+
+    def __init__(self, **labels):
+        self.labels = labels
+        self.started = time.perf_counter()
+        self.stages = {}
+        self.flags = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str, **fields):
+        """Time a block. Yields a dict the block can add fields to (bytes, chars …)."""
+        extra = dict(fields)
+        t0 = time.perf_counter()
+        try:
+            yield extra
+        finally:
+            self.record(name, (time.perf_counter() - t0) * 1000.0, **extra)
+
+    def record(self, name: str, ms: float, **fields):
+        """Add a timing for `name`; repeated stages are summed and counted."""
+        with self._lock:
+            entry = self.stages.setdefault(name, {"ms": 0.0, "count": 0})
+            entry["ms"] = round(entry["ms"] + ms, 2)
+            entry["count"] += 1
+            for key, value in fields.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    entry[key] = entry.get(key, 0) + value
+                else:
+                    entry[key] = value
+
+    def flag(self, name: str, value=True):
+        with self._lock:
+            self.flags[name] = value
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                **self.labels,
+                "total_ms": round((time.perf_counter() - self.started) * 1000.0, 2),
+                "stages": {k: dict(v) for k, v in self.stages.items()},
+                "flags": dict(self.flags),
+            }
+
+    def emit(self, metrics_file: Optional[str] = None) -> dict:
+        """Print the METRICS: line on stderr and optionally append it to a JSONL file."""
+        data = self.to_dict()
+        line = json.dumps(data, ensure_ascii=False)
+        print(f"{METRICS_PREFIX}{line}", file=sys.stderr)
+        if metrics_file:
+            try:
+                with open(metrics_file, "a", encoding="utf-8") as fh:
+                    fh.write(line + "\n")
+            except OSError as e:
+                print(f"Could not write metrics file: {e}", file=sys.stderr)
+        return data
+
+
+_current = contextvars.ContextVar("speech_metrics", default=None)
+
+
+def current() -> Optional[Metrics]:
+    return _current.get()
+
+
+@contextmanager
+def recording(**labels):
+    """Bind a fresh Metrics recorder to the current request for the block."""
+    metrics = Metrics(**labels)
+    token = _current.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def stage(name: str, **fields):
+    """Time a pipeline stage on the current recorder (no-op outside a request)."""
+    metrics = _current.get()
+    if metrics is None:
+        yield dict(fields)
+        return
+    with metrics.stage(name, **fields) as extra:
+        yield extra
+
+
+def flag(name: str, value=True):
+    """Set a flag (e.g. a cache hit) on the current recorder, if any."""
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.flag(name, value)
@@ -0,0 +1,448 @@
+"""
+Retry, hedging and circuit breaking for the remote backends speech.py calls
+(Google Translate via deep_translator, Google STT via recognize_google).
+
+    speech_resilience.call("translate", lambda: translator.translate(text))
+    await speech_resilience.call_async("translate", lambda: translate_async(text))
+
+- Transient failures — network errors and the backend's own "request
+  failed" / "too many requests" errors, see TRANSIENT_ERRORS and the
+  `retryable` argument — are retried with full-jitter exponential backoff.
+  Anything else is raised at once.
+- Once a backend has enough successful calls on record, each attempt runs
+  on a shared pool, and one still running after that backend's p95 latency
+  gets a duplicate (hedged) request. Whichever succeeds first answers; the
+  other can't be cut short and finishes in the background. At most
+  SPEECH_HEDGED_ATTEMPTS_MAX attempts and SPEECH_HEDGE_MAX hedges are on the
+  pool at once — past that, attempts run on the caller's thread unhedged,
+  so a stalled backend can't pile up threads. A short-lived CLI process
+  rarely collects enough samples, so hedging mostly pays off in --serve mode.
+- A per-backend circuit breaker opens after consecutive failures and fails
+  fast (CircuitOpenError) until a cool-down has passed; then a single trial
+  call decides whether it closes again.
+- call_async() applies the same policy to coroutines (speech_async.py) and
+  shares the breaker and latency window with call(); there the losing
+  hedged request is cancelled instead of left to finish.
+
+Tuning via environment:
+
+    SPEECH_RETRY_ATTEMPTS        attempts per call (default 3)
+    SPEECH_HEDGE                 0 disables hedging (default on)
+    SPEECH_HEDGE_MAX             hedged requests in flight at once, all backends (default 8)
+    SPEECH_HEDGED_ATTEMPTS_MAX   attempts on the hedging pool at once, all backends (default 64)
+    SPEECH_BREAKER_FAILURES      consecutive failures that open the breaker (default 5)
+    SPEECH_BREAKER_COOLDOWN_S    seconds before a trial call is let through (default 30)
+"""
+
+import contextvars
+import os
+import random
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Optional, Tuple, Type
+
+import speech_deadline
+import speech_metrics
+
+
+def _env_number(name: str, default, cast=int):
+    try:
+        return cast(os.environ.get(name, default))
+    except ValueError:
+        print(f"Ignoring invalid {name}={os.environ[name]!r}, using {default}.", file=sys.stderr)
+        return default
+
+
+RETRY_ATTEMPTS = _env_number("SPEECH_RETRY_ATTEMPTS", 3)
+HEDGE_ENABLED = os.environ.get("SPEECH_HEDGE", "1").lower() not in ("0", "false", "no")
+HEDGE_MAX = _env_number("SPEECH_HEDGE_MAX", 8)
+HEDGED_ATTEMPTS_MAX = _env_number("SPEECH_HEDGED_ATTEMPTS_MAX", 64)
+BREAKER_FAILURES = _env_number("SPEECH_BREAKER_FAILURES", 5)
+BREAKER_COOLDOWN_S = _env_number("SPEECH_BREAKER_COOLDOWN_S", 30.0, float)
+
+BACKOFF_BASE_S = 0.2
+BACKOFF_MAX_S = 2.0
+HEDGE_MIN_SAMPLES = 20     # successful calls needed before the p95 is trusted
+LATENCY_WINDOW = 200       # most recent successful call latencies kept per backend
+
+# Worth another attempt: timeouts, refused/reset connections, DNS failures.
+# requests' and urllib's errors are OSErrors too. Callers add their backend's
+# own transient errors (sr.RequestError, deep_translator's RequestError, …).
+TRANSIENT_ERRORS: Tuple[Type[BaseException], ...] = (OSError,)
+
+
+class CircuitOpenError(RuntimeError):
+    """The backend's circuit breaker is open — the call was not attempted."""
+
+
+class CircuitBreaker:
+    """Closed → open after `failure_threshold` consecutive failures → half-open after `cooldown_s`."""
+
+    def __init__(self, failure_threshold: int = BREAKER_FAILURES, cooldown_s: float = BREAKER_COOLDOWN_S):
+        self.failure_threshold = failure_threshold
+        self.cooldown_s = cooldown_s
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.cooldown_s:
+                self.state = "half_open"
+                self._trial_running = False
+            if self.state == "half_open" and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def retry_in(self) -> float:
+        with self._lock:
+            return max(0.0, self.cooldown_s - (time.monotonic() - self.opened_at))
+
+    def success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._trial_running = False
+
+    def abandon(self):
+        """The call ended without telling us anything about the backend."""
+        with self._lock:
+            self._trial_running = False
+
+    def failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    print(f"Circuit breaker opened after {self.failures} failures.", file=sys.stderr)
+                self.state = "open"
+                self.opened_at = time.monotonic()
+            self._trial_running = False
+
+
+_hedge_slots = threading.BoundedSemaphore(max(1, HEDGE_MAX))
+_attempt_slots = threading.BoundedSemaphore(max(1, HEDGED_ATTEMPTS_MAX))
+_attempt_pool = None
+_attempt_pool_pid = None
+_attempt_pool_lock = threading.Lock()
+
+
+def _pool() -> ThreadPoolExecutor:
+    global _attempt_pool, _attempt_pool_pid
+    with _attempt_pool_lock:
+        if _attempt_pool is None or _attempt_pool_pid != os.getpid():
+            # One thread per attempt and hedge slot, so a submitted call never queues
+            _attempt_pool = ThreadPoolExecutor(
+                max_workers=max(1, HEDGED_ATTEMPTS_MAX) + max(1, HEDGE_MAX), thread_name_prefix="speech-attempt",
+            )
+            _attempt_pool_pid = os.getpid()
+        return _attempt_pool
+
+
+class Backend:
+    """Retry/hedge/breaker state and counters for one remote backend."""
+
+    def __init__(
+        self,
+        name: str,
+        attempts: int = RETRY_ATTEMPTS,
+        hedge: bool = HEDGE_ENABLED,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        self.name = name
+        self.attempts = max(1, attempts)
+        self.hedge = hedge
+        self.breaker = breaker or CircuitBreaker()
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.counters = {
+            "calls": 0, "attempts": 0, "retries": 0, "hedges": 0, "hedges_skipped": 0, "failures": 0, "rejected": 0,
+        }
+        self._lock = threading.Lock()
+
+    def _count(self, key: str, n: int = 1):
+        with self._lock:
+            self.counters[key] += n
+
+    def hedge_delay(self) -> Optional[float]:
+        """p95 of recent successful calls (seconds), or None when hedging is off or untrained."""
+        if not self.hedge:
+            return None
+        with self._lock:
+            if len(self.latencies) < HEDGE_MIN_SAMPLES:
+                return None
+            ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    def _attempt(self, fn: Callable, deadline):
+        """
+        One attempt. Once the backend is trained, it runs on the attempt pool
+        and, if still running after hedge_delay(), gets a duplicate (when a
+        hedge slot is free); the first of the two to succeed answers and the
+        other is left to finish on its own. With no attempt slot free it runs
+        on the caller's thread, unhedged.
+        """
+        delay = self.hedge_delay()
+        t0 = time.perf_counter()
+        if delay is None or not _attempt_slots.acquire(blocking=False):
+            result = fn()
+            with self._lock:
+                self.latencies.append(time.perf_counter() - t0)
+            return result
+
+        def _run(context, slots):
+            try:
+                return context.run(fn)   # sees the request's deadline and metrics
+            finally:
+                slots.release()
+
+        try:
+            attempts = [_pool().submit(_run, contextvars.copy_context(), _attempt_slots)]
+        except RuntimeError:   # interpreter shutting down
+            _attempt_slots.release()
+            raise
+        done, pending = wait(attempts, timeout=delay)
+        if not done:
+            if _hedge_slots.acquire(blocking=False):
+                try:
+                    attempts.append(_pool().submit(_run, contextvars.copy_context(), _hedge_slots))
+                    pending.add(attempts[-1])
+                    self._count("hedges")
+                except RuntimeError:
+                    _hedge_slots.release()
+            else:
+                self._count("hedges_skipped")
+
+        while True:
+            for future in sorted(done, key=attempts.index):
+                if future.exception() is None:
+                    with self._lock:
+                        self.latencies.append(time.perf_counter() - t0)
+                    return future.result()
+            if not pending:
+                raise next(future.exception() for future in attempts)
+            done, pending = wait(
+                pending, timeout=deadline.remaining() if deadline is not None else None, return_when=FIRST_COMPLETED,
+            )
+            if not done:
+                raise speech_deadline.DeadlineExceeded(f"Deadline of {deadline.budget_ms:.0f}ms exceeded.")
+
+    def call(
+        self,
+        fn: Callable,
+        permanent: Tuple[Type[BaseException], ...] = (),
+        deadline: Optional[speech_deadline.Deadline] = None,
+        retryable: Tuple[Type[BaseException], ...] = (),
+    ):
+        """
+        Run fn() with retries, hedging and the circuit breaker.
+
+        Args:
+            fn:        Zero-argument callable doing one backend request. A
+                       hedged duplicate runs on a pool thread, so it must be
+                       thread-safe.
+            permanent: Exception types that are a real answer, not an outage
+                       (e.g. "could not understand audio") — raised at once and
+                       not counted against the breaker.
+            deadline:  Request deadline; defaults to the current one. Pass it
+                       explicitly from pool threads.
+            retryable: The backend's transient errors, retried and counted
+                       against the breaker along with TRANSIENT_ERRORS. Any
+                       other error is raised at once.
+
+        Raises:
+            CircuitOpenError while the breaker is open, otherwise the last error.
+        """
+        deadline = deadline if deadline is not None else speech_deadline.current()
+        permanent = tuple(permanent) + (speech_deadline.DeadlineExceeded,)
+        retryable = tuple(retryable) + TRANSIENT_ERRORS
+        metrics = speech_metrics.current()
+        self._count("calls")
+
+        for attempt in range(1, self.attempts + 1):
+            if not self.breaker.allow():
+                self._count("rejected")
+                raise CircuitOpenError(
+                    f"{self.name} backend unavailable (circuit open, retry in {self.breaker.retry_in():.0f}s)."
+                )
+
+            self._count("attempts")
+            try:
+                result = self._attempt(fn, deadline)
+            except speech_deadline.DeadlineExceeded:
+                self.breaker.abandon()
+                raise
+            except permanent:
+                self.breaker.success()   # the backend answered
+                raise
+            except retryable as e:
+                self.breaker.failure()
+                self._count("failures")
+                if attempt == self.attempts:
+                    raise
+
+                # Full jitter: uniform(0, min(cap, base · 2^n))
+                backoff = random.uniform(0, min(BACKOFF_MAX_S, BACKOFF_BASE_S * 2 ** (attempt - 1)))
+                if deadline is not None and deadline.remaining() < backoff + speech_deadline.MIN_CALL_TIMEOUT_S:
+                    raise
+                print(f"{self.name} attempt {attempt} failed ({e}); retrying in {backoff:.2f}s.", file=sys.stderr)
+                self._count("retries")
+                if metrics is not None:
+                    metrics.record(f"{self.name}_retry", backoff * 1000.0)
+                time.sleep(backoff)
+                continue
+            except Exception:
+                self.breaker.abandon()   # a bug or a bad answer, not an outage — retrying won't help
+                raise
+
+            self.breaker.success()
+            return result
+
+    async def _attempt_async(self, fn: Callable):
+        """_attempt() for a coroutine function; the hedge loser is cancelled."""
+        import asyncio
+
+        delay = self.hedge_delay()
+        t0 = time.perf_counter()
+        if delay is None:
+            result = await fn()
+        else:
+            tasks = [asyncio.ensure_future(fn())]
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                self._count("hedges")
+                tasks.append(asyncio.ensure_future(fn()))
+
+            error = None
+            pending = set(tasks)
+            result, won = None, False
+            try:
+                while pending and not won:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        if task.exception() is None:
+                            result, error, won = task.result(), None, True
+                            break
+                        error = error or task.exception()
+            finally:
+                for task in pending:
+                    task.cancel()
+            if error is not None:
+                raise error
+
+        with self._lock:
+            self.latencies.append(time.perf_counter() - t0)
+        return result
+
+    async def call_async(
+        self,
+        fn: Callable,
+        permanent: Tuple[Type[BaseException], ...] = (),
+        deadline: Optional[speech_deadline.Deadline] = None,
+        retryable: Tuple[Type[BaseException], ...] = (),
+    ):
+        """
+        call() for coroutines: `fn` is a zero-argument coroutine function doing
+        one backend request. Backoff sleeps yield to the event loop.
+        """
+        import asyncio
+
+        deadline = deadline if deadline is not None else speech_deadline.current()
+        permanent = tuple(permanent) + (speech_deadline.DeadlineExceeded,)
+        retryable = tuple(retryable) + TRANSIENT_ERRORS
+        metrics = speech_metrics.current()
+        self._count("calls")
+
+        for attempt in range(1, self.attempts + 1):
+            if not self.breaker.allow():
+                self._count("rejected")
+                raise CircuitOpenError(
+                    f"{self.name} backend unavailable (circuit open, retry in {self.breaker.retry_in():.0f}s)."
+                )
+
+            self._count("attempts")
+            try:
+                result = await self._attempt_async(fn)
+            except (speech_deadline.DeadlineExceeded, asyncio.CancelledError):
+                self.breaker.abandon()
+                raise
+            except permanent:
+                self.breaker.success()
+                raise
+            except retryable as e:
+                self.breaker.failure()
+                self._count("failures")
+                if attempt == self.attempts:
+                    raise
+
+                backoff = random.uniform(0, min(BACKOFF_MAX_S, BACKOFF_BASE_S * 2 ** (attempt - 1)))
+                if deadline is not None and deadline.remaining() < backoff + speech_deadline.MIN_CALL_TIMEOUT_S:
+                    raise
+                print(f"{self.name} attempt {attempt} failed ({e}); retrying in {backoff:.2f}s.", file=sys.stderr)
+                self._count("retries")
+                if metrics is not None:
+                    metrics.record(f"{self.name}_retry", backoff * 1000.0)
+                await asyncio.sleep(backoff)
+                continue
+            except Exception:
+                self.breaker.abandon()
+                raise
+
+            self.breaker.success()
+            return result
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self.counters, "breaker": self.breaker.state}
+
+
+_backends: Dict[str, Backend] = {}
+_backends_lock = threading.Lock()
+
+
+def backend(name: str) -> Backend:
+    """Process-wide Backend for `name`, created on first use."""
+    with _backends_lock:
+        if name not in _backends:
+            _backends[name] = Backend(name)
+        return _backends[name]
+
+
+def call(
+    name: str,
+    fn: Callable,
+    permanent: Tuple[Type[BaseException], ...] = (),
+    deadline=None,
+    retryable: Tuple[Type[BaseException], ...] = (),
+):
+    """Shortcut for backend(name).call(...)."""
+    return backend(name).call(fn, permanent=permanent, deadline=deadline, retryable=retryable)
+
+
+async def call_async(
+    name: str,
+    fn: Callable,
+    permanent: Tuple[Type[BaseException], ...] = (),
+    deadline=None,
+    retryable: Tuple[Type[BaseException], ...] = (),
+):
+    """Shortcut for backend(name).call_async(...)."""
+    return await backend(name).call_async(fn, permanent=permanent, deadline=deadline, retryable=retryable)
+
+
+def stats() -> Dict[str, dict]:
+    with _backends_lock:
+        return {name: b.stats() for name, b in _backends.items()}
+
+
+def reset():
+    """Forget all backend state (used between benchmark runs)."""
+    with _backends_lock:
+        _backends.clear()
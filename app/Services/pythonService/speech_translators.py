@@ -0,0 +1,166 @@
+"""
+Translator registry shared by speech.py and translator.py.
+
+- Language validation runs against a bundled snapshot of Google Translate's
+  language table, so it never builds a throwaway GoogleTranslator.
+- GoogleTranslator instances are reused per (source, target) pair. They are
+  kept per thread because translate() mutates the instance's request params.
+- All instances share one keep-alive requests.Session with a connection pool
+  instead of opening a fresh connection for every call.
+"""
+
+import sys
+import threading
+from typing import Dict
+
+import speech_deadline
+
+
+# Snapshot of deep_translator.constants.GOOGLE_LANGUAGES_TO_CODES.
+# refresh_languages() merges in whatever the installed library knows on top.
+GOOGLE_LANGUAGES: Dict[str, str] = {
+    "afrikaans": "af", "albanian": "sq", "amharic": "am", "arabic": "ar",
+    "armenian": "hy", "assamese": "as", "aymara": "ay", "azerbaijani": "az",
+    "bambara": "bm", "basque": "eu", "belarusian": "be", "bengali": "bn",
+    "bhojpuri": "bho", "bosnian": "bs", "bulgarian": "bg", "catalan": "ca",
+    "cebuano": "ceb", "chichewa": "ny", "chinese (simplified)": "zh-CN",
+    "chinese (traditional)": "zh-TW", "corsican": "co", "croatian": "hr",
+    "czech": "cs", "danish": "da", "dhivehi": "dv", "dogri": "doi",
+    "dutch": "nl", "english": "en", "esperanto": "eo", "estonian": "et",
+    "ewe": "ee", "filipino": "tl", "finnish": "fi", "french": "fr",
+    "frisian": "fy", "galician": "gl", "georgian": "ka", "german": "de",
+    "greek": "el", "guarani": "gn", "gujarati": "gu", "haitian creole": "ht",
+    "hausa": "ha", "hawaiian": "haw", "hebrew": "iw", "hindi": "hi",
+    "hmong": "hmn", "hungarian": "hu", "icelandic": "is", "igbo": "ig",
+    "ilocano": "ilo", "indonesian": "id", "irish": "ga", "italian": "it",
+    "japanese": "ja", "javanese": "jw", "kannada": "kn", "kazakh": "kk",
+    "khmer": "km", "kinyarwanda": "rw", "konkani": "gom", "korean": "ko",
+    "krio": "kri", "kurdish (kurmanji)": "ku", "kurdish (sorani)": "ckb",
+    "kyrgyz": "ky", "lao": "lo", "latin": "la", "latvian": "lv",
+    "lingala": "ln", "lithuanian": "lt", "luganda": "lg",
+    "luxembourgish": "lb", "macedonian": "mk", "maithili": "mai",
+    "malagasy": "mg", "malay": "ms", "malayalam": "ml", "maltese": "mt",
+    "maori": "mi", "marathi": "mr", "meiteilon (manipuri)": "mni-Mtei",
+    "mizo": "lus", "mongolian": "mn", "myanmar": "my", "nepali": "ne",
+    "norwegian": "no", "odia (oriya)": "or", "oromo": "om", "pashto": "ps",
+    "persian": "fa", "polish": "pl", "portuguese": "pt", "punjabi": "pa",
+    "quechua": "qu", "romanian": "ro", "russian": "ru", "samoan": "sm",
+    "sanskrit": "sa", "scots gaelic": "gd", "sepedi": "nso", "serbian": "sr",
+    "sesotho": "st", "shona": "sn", "sindhi": "sd", "sinhala": "si",
+    "slovak": "sk", "slovenian": "sl", "somali": "so", "spanish": "es",
+    "sundanese": "su", "swahili": "sw", "swedish": "sv", "tajik": "tg",
+    "tamil": "ta", "tatar": "tt", "telugu": "te", "thai": "th",
+    "tigrinya": "ti", "tsonga": "ts", "turkish": "tr", "turkmen": "tk",
+    "twi": "ak", "ukrainian": "uk", "urdu": "ur", "uyghur": "ug",
+    "uzbek": "uz", "vietnamese": "vi", "welsh": "cy", "xhosa": "xh",
+    "yiddish": "yi", "yoruba": "yo", "zulu": "zu",
+}
+
+_languages = dict(GOOGLE_LANGUAGES)
+_codes = set(_languages.values())
+_refreshed = False
+_lock = threading.Lock()
+_local = threading.local()
+_session = None
+
+
+def refresh_languages() -> Dict[str, str]:
+    """Merge the installed deep_translator's language table into the snapshot (no network)."""
+    global _refreshed, _codes
+    with _lock:
+        try:
+            from deep_translator.constants import GOOGLE_LANGUAGES_TO_CODES
+        except ImportError:
+            pass
+        else:
+            _languages.update(GOOGLE_LANGUAGES_TO_CODES)
+            _codes = set(_languages.values())
+        _refreshed = True
+        return dict(_languages)
+
+
+def supported_languages() -> Dict[str, str]:
+    """Language name → code table (same shape as get_supported_languages(as_dict=True))."""
+    return dict(_languages)
+
+
+def is_supported(lang: str) -> bool:
+    """True if `lang` is a known language name or code (or 'auto')."""
+    lang = lang.lower().strip()
+    if lang == "auto" or lang in _languages or lang in _codes:
+        return True
+    # zh-CN / mni-Mtei keep their case in the table
+    if any(code.lower() == lang for code in _codes):
+        return True
+    if not _refreshed:
+        refresh_languages()
+        return is_supported(lang)
+    return False
+
+
+class _SessionRequests:
+    """
+    Stand-in for the `requests` module that routes get/post through one Session.
+
+    deep_translator never passes a timeout; under a --deadline-ms request we
+    add one from the remaining budget.
+    """
+
+    def __init__(self, session, requests_module):
+        self._session = session
+        self._requests = requests_module
+
+    def get(self, url, **kwargs):
+        kwargs.setdefault("timeout", speech_deadline.timeout())
+        return self._session.get(url, **kwargs)
+
+    def post(self, url, **kwargs):
+        kwargs.setdefault("timeout", speech_deadline.timeout())
+        return self._session.post(url, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._requests, name)
+
+
+def http_session():
+    """Process-wide keep-alive requests.Session with a pooled adapter."""
+    global _session
+    with _lock:
+        if _session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=8, pool_maxsize=32)
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+
+            # deep_translator calls the module-level requests.get() per request;
+            # point its module at our session so connections are reused.
+            try:
+                import deep_translator.google as google_module
+
+                google_module.requests = _SessionRequests(_session, requests)
+            except (ImportError, AttributeError) as e:
+                print(f"Translator session pooling unavailable: {e}", file=sys.stderr)
+        return _session
+
+
+def get_translator(source: str, target: str):
+    """
+    Reusable GoogleTranslator for (source, target), private to the calling thread.
+
+    Accepts language names or codes, like GoogleTranslator itself.
+    """
+    from deep_translator import GoogleTranslator
+
+    key = (source.lower().strip(), target.lower().strip())
+    translators = getattr(_local, "translators", None)
+    if translators is None:
+        translators = _local.translators = {}
+
+    translator = translators.get(key)
+    if translator is None:
+        http_session()
+        translator = translators[key] = GoogleTranslator(source=key[0], target=key[1])
+    return translator
@@ -0,0 +1,98 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from speech_cache import ConversionStore
+
+
+def _writer(data: bytes, delay: float = 0.0, calls=None):
+    def write(path):
+        if calls is not None:
+            calls.append(path)
+        time.sleep(delay)
+        with open(path, "wb") as fh:
+            fh.write(data)
+        return True
+    return write
+
+
+class ConversionStoreTest(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.store = ConversionStore(self._dir.name)
+
+    def tearDown(self):
+        self._dir.cleanup()
+
+    def _in_thread(self, fn, timeout=5.0):
+        result = {}
+        thread = threading.Thread(target=lambda: result.update(value=fn()), daemon=True)
+        thread.start()
+        thread.join(timeout)
+        self.assertFalse(thread.is_alive(), "deadlocked")
+        return result.get("value")
+
+    def test_concurrent_acquires_convert_once_and_share(self):
+        calls, paths = [], []
+        key = ConversionStore.make_key("fp", "wav")
+        threads = [
+            threading.Thread(target=lambda: paths.append(self.store.acquire(key, "wav", _writer(b"x", 0.05, calls))))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(set(paths)), 1)
+        for path in paths:
+            self.assertTrue(os.path.exists(path))
+            self.store.release(path)
+        self.assertEqual(os.listdir(self._dir.name), [])
+        self.assertEqual(self.store._locks, {})
+
+    def test_keys_that_shared_a_lock_stripe_do_not_deadlock(self):
+        # Both start 0x00000000 mod 64 — one of the old 64 lock stripes
+        outer, inner = "00000000" + "a" * 56, "00000040" + "b" * 56
+
+        def nested(path):
+            inner_path = self.store.acquire(inner, "mka", _writer(b"track"))
+            self.store.release(inner_path)
+            return _writer(b"wav")(path)
+
+        path = self._in_thread(lambda: self.store.acquire(outer, "wav", nested))
+        self.assertIsNotNone(path)
+
+    def test_different_keys_convert_in_parallel(self):
+        keys = [ConversionStore.make_key(f"fp{i}", "wav") for i in range(4)]
+        started = time.monotonic()
+        threads = [threading.Thread(target=self.store.acquire, args=(k, "wav", _writer(b"x", 0.2))) for k in keys]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertLess(time.monotonic() - started, 0.6)
+
+    def test_without_a_writer_only_an_existing_entry_is_shared(self):
+        key = ConversionStore.make_key("fp", "wav")
+        self.assertIsNone(self.store.acquire(key, "wav", None))
+        self.assertEqual(os.listdir(self._dir.name), [])
+
+        path = self.store.acquire(key, "wav", _writer(b"x"))
+        self.assertEqual(self.store.acquire(key, "wav", None), path)
+        self.store.release(path)
+        self.assertTrue(os.path.exists(path))   # still referenced once
+        self.store.release(path)
+        self.assertFalse(os.path.exists(path))
+
+    def test_failed_writer_leaves_nothing_behind(self):
+        key = ConversionStore.make_key("fp", "wav")
+        self.assertIsNone(self.store.acquire(key, "wav", lambda path: False))
+        self.assertEqual(os.listdir(self._dir.name), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import contextlib
+import tempfile
+import unittest
+from unittest import mock
+
+import speech_recognition as sr
+
+import speech
+import speech_deadline
+
+
+SPANS = [(0.0, 30.0), (30.0, 58.5), (58.5, 80.0)]
+
+
+class StitchSegmentsTest(unittest.TestCase):
+    def test_joins_recognised_segments_in_order(self):
+        self.assertEqual(speech._stitch_segments(["one ", "", " three"], SPANS), "one three")
+        self.assertIsNone(speech._stitch_segments(["", "", ""], SPANS))
+
+    def test_a_failed_segment_fails_the_recording(self):
+        with self.assertRaises(sr.RequestError):
+            speech._stitch_segments(["one", ConnectionError("reset"), "three"], SPANS)
+
+    def test_under_a_deadline_the_gapped_transcript_is_partial(self):
+        with speech_deadline.within(60_000) as deadline:
+            text = speech._stitch_segments(["one", ConnectionError("reset"), "three"], SPANS)
+            self.assertTrue(speech.transcript_is_partial())
+
+        self.assertEqual(text, "one three")
+        self.assertEqual(deadline.skipped, {speech.STT_SEGMENTS_STAGE: "error"})
+        self.assertEqual(deadline.details["stt_gaps"], [[30.0, 58.5]])
+
+    def test_nothing_recognised_fails_even_under_a_deadline(self):
+        with speech_deadline.within(60_000):
+            with self.assertRaises(sr.RequestError):
+                speech._stitch_segments([TimeoutError("timed out"), ""], SPANS[:2])
+
+    def test_complete_transcripts_are_not_partial(self):
+        self.assertFalse(speech.transcript_is_partial())
+        with speech_deadline.within(60_000):
+            speech._stitch_segments(["one", "two", "three"], SPANS)
+            self.assertFalse(speech.transcript_is_partial())
+
+
+class FlacDecodeTest(unittest.TestCase):
+    def _transcribe(self, source_s):
+        pcm = b"\x00\x00" * 16000 * 60   # what the recording really holds: a minute
+        with tempfile.NamedTemporaryFile(suffix=".webm") as upload, \
+                mock.patch.object(speech, "audio_source", side_effect=contextlib.nullcontext), \
+                mock.patch.object(speech, "_flac_upload_available", return_value=True), \
+                mock.patch.object(speech, "encode_flac", return_value=(b"fLaC capped", source_s)), \
+                mock.patch.object(speech, "decode_pcm", return_value=pcm), \
+                mock.patch.object(speech, "_recognize_flac", return_value="the FLAC upload") as flac, \
+                mock.patch.object(speech, "recognize_long_audio", return_value="the whole minute") as chunked:
+            text = speech.speech_to_text(source="file", audio_file=upload.name, decode="flac", vad=False)
+        return text, flac, chunked
+
+    def test_unknown_duration_takes_the_chunked_path(self):
+        # Browser MediaRecorder webm: ffmpeg reports "Duration: N/A"
+        text, flac, chunked = self._transcribe(source_s=None)
+        self.assertEqual(text, "the whole minute")
+        flac.assert_not_called()
+        chunked.assert_called_once()
+
+    def test_short_audio_uploads_the_flac(self):
+        text, flac, chunked = self._transcribe(source_s=12.0)
+        self.assertEqual(text, "the FLAC upload")
+        chunked.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import asyncio
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+import speech_async
+import speech_fakes
+
+
+class _Redirector:
+    """Answers every GET with `status` and a Location on `target` (same path)."""
+
+    def __init__(self, target: str, status: int = 302):
+        class _Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                self.send_response(status)
+                self.send_header("Location", target + self.path)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        host, port = self._server.server_address[:2]
+        self.url = f"http://{host}:{port}"
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def _run(coroutine_fn):
+    async def _main():
+        try:
+            return await coroutine_fn()
+        finally:
+            await speech_async.client().aclose()
+
+    return asyncio.run(_main())
+
+
+@mock.patch("speech_cache.get_translation_cache", return_value=None)
+class SpeechAsyncTest(unittest.TestCase):
+    def test_translate_against_the_fake(self, _cache):
+        with speech_fakes.FakeTranslate() as translate, speech_fakes.route_to_fakes(translate=translate):
+            output = _run(lambda: speech_async.translate_async("english", "hausa", "Good morning"))
+
+        self.assertEqual(output, "[hausa] Good morning")
+
+    def test_connections_are_reused(self, _cache):
+        async def _sequential():
+            for word in ("one", "two", "three"):
+                await speech_async.translate_async("english", "hausa", word)
+            return speech_async.client().stats()
+
+        with speech_fakes.FakeTranslate() as translate, speech_fakes.route_to_fakes(translate=translate):
+            stats = _run(_sequential)
+            served = translate.stats()
+
+        self.assertEqual(stats, {"opened": 1, "reused": 2})
+        self.assertEqual(served["requests"], 3)
+
+    def test_synthesize_against_the_fake(self, _cache):
+        with speech_fakes.FakeTTS() as tts, speech_fakes.route_to_fakes(tts=tts):
+            audio = _run(lambda: speech_async.synthesize_async("hello"))
+
+        self.assertTrue(audio.startswith(speech_fakes.SILENT_MP3_FRAME))
+
+    def test_redirects_are_followed(self, _cache):
+        with speech_fakes.FakeTranslate() as translate:
+            redirector = _Redirector(translate.url)
+            try:
+                with speech_fakes.route_to_fakes(translate=redirector):
+                    output = _run(lambda: speech_async.translate_async("english", "hausa", "Good morning"))
+            finally:
+                redirector.stop()
+
+        self.assertEqual(output, "[hausa] Good morning")
+        self.assertEqual(translate.stats()["requests"], 1)
+
+    def test_redirect_to_a_real_backend_is_refused(self, _cache):
+        redirector = _Redirector("https://translate.google.com")
+        try:
+            with speech_fakes.route_to_fakes(translate=redirector):
+                with self.assertRaises(RuntimeError):
+                    _run(lambda: speech_async.client().request("GET", redirector.url + "/m?q=x"))
+        finally:
+            redirector.stop()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from speech_cache import AudioStore
+
+
+def _writer(size):
+    def write(path):
+        with open(path, "wb") as fh:
+            fh.write(b"x" * size)
+    return write
+
+
+class AudioStoreEvictionTest(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.store = AudioStore(self._dir.name, max_bytes=1000, rescan_writes=50)
+
+    def tearDown(self):
+        self._dir.cleanup()
+
+    def _files(self):
+        return [name for _, _, names in os.walk(self._dir.name) for name in names]
+
+    def test_walks_only_when_the_estimate_crosses_the_limit(self):
+        with mock.patch.object(AudioStore, "evict", wraps=self.store.evict) as evict:
+            for i in range(5):
+                self.store.write(f"{i:02d}" * 32, "mp3", _writer(100))
+        self.assertEqual(evict.call_count, 1)   # the first write, to learn the store's size
+
+        with mock.patch.object(AudioStore, "evict", wraps=self.store.evict) as evict:
+            for i in range(5, 11):
+                self.store.write(f"{i:02d}" * 32, "mp3", _writer(100))
+        self.assertEqual(evict.call_count, 1)   # the write that took it to 1100 bytes
+        self.assertEqual(len(self._files()), 10)
+
+    def test_rescans_every_n_writes(self):
+        self.store.rescan_writes = 3
+        with mock.patch.object(AudioStore, "evict", wraps=self.store.evict) as evict:
+            for i in range(7):
+                self.store.write(f"{i:02d}" * 32, "mp3", _writer(10))
+        self.assertEqual(evict.call_count, 3)   # writes 1, 4 and 7
+
+    def test_rewriting_an_entry_does_not_grow_the_estimate(self):
+        for _ in range(20):
+            self.store.write("ab" * 32, "mp3", _writer(100))
+        self.assertEqual(self.store._size, 100)
+
+    def test_evicts_least_recently_used_first(self):
+        paths = [self.store.write(f"{i:02d}" * 32, "mp3", _writer(300)) for i in range(3)]
+        os.utime(paths[0], (1, 1))
+        os.utime(paths[1], (2, 2))
+        self.store.lookup("02" * 32, "mp3")
+        self.store.write("03" * 32, "mp3", _writer(300))
+
+        self.assertFalse(os.path.exists(paths[0]))
+        self.assertTrue(os.path.exists(paths[1]))
+        self.assertTrue(os.path.exists(paths[2]))
+        self.assertEqual(self.store._size, 900)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import io
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from unittest import mock
+
+import speech_client
+
+
+class FakeWorker:
+    """A Unix socket that reads one request per connection and answers with `respond(request)`."""
+
+    def __init__(self, path: str, respond):
+        self.requests = []
+        self._server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._server.bind(path)
+        self._server.listen(4)
+        self._respond = respond
+        threading.Thread(target=self._serve, daemon=True).start()
+
+    def _serve(self):
+        while True:
+            try:
+                conn, _ = self._server.accept()
+            except OSError:
+                return
+            with conn, conn.makefile("rb") as reader:
+                request = json.loads(reader.readline())
+                self.requests.append(request)
+                reply = self._respond(request)
+                if reply is not None:
+                    conn.sendall((json.dumps(reply) + "\n").encode("utf-8"))
+
+    def close(self):
+        self._server.close()
+
+
+class SpeechClientTest(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._dir.cleanup)
+        self.path = os.path.join(self._dir.name, "speech.sock")
+        patches = [
+            mock.patch.object(speech_client, "DEFAULT_SOCKET", self.path),
+            mock.patch.object(speech_client, "RESPONSE_GRACE_S", 0.1),
+            mock.patch.object(speech_client, "_run_locally", return_value=0),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def _worker(self, respond) -> FakeWorker:
+        worker = FakeWorker(self.path, respond)
+        self.addCleanup(worker.close)
+        return worker
+
+    def _main(self, argv):
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with redirect_stdout(stdout), redirect_stderr(stderr):
+            code = speech_client.main(argv)
+        return code, stdout.getvalue(), stderr.getvalue()
+
+    def test_without_a_worker_it_runs_locally(self):
+        code, _, _ = self._main(["--text", "hi"])
+        self.assertEqual(code, 0)
+        speech_client._run_locally.assert_called_once_with(["--text", "hi"])
+
+    def test_answers_come_from_the_worker(self):
+        worker = self._worker(lambda request: {"ok": True, "output": "sannu"})
+        code, stdout, _ = self._main(["--text", "hi"])
+        self.assertEqual((code, stdout), (0, "sannu\n"))
+        self.assertEqual(worker.requests, [{"argv": ["--text", "hi"]}])
+        speech_client._run_locally.assert_not_called()
+
+    def test_a_worker_that_drops_the_request_is_not_run_again(self):
+        self._worker(lambda request: None)
+        code, _, stderr = self._main(["--text", "hi"])
+        self.assertEqual(code, 2)
+        self.assertIn("without a response", stderr)
+        speech_client._run_locally.assert_not_called()
+
+    def test_a_hung_worker_times_out_after_the_deadline(self):
+        self._worker(lambda request: time.sleep(5))
+        started = time.monotonic()
+        code, _, stderr = self._main(["--text", "hi", "--deadline-ms", "200"])
+        self.assertEqual(code, 2)
+        self.assertLess(time.monotonic() - started, 2)
+        self.assertIn("did not answer in time", stderr)
+        speech_client._run_locally.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
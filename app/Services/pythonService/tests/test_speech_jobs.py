@@ -0,0 +1,177 @@
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+import speech_jobs
+import speech_lanes
+
+
+def _dead_pid() -> int:
+    child = subprocess.Popen([sys.executable, "-c", "pass"])
+    child.wait()
+    return child.pid
+
+
+class JobStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = speech_jobs.JobStore(os.path.join(self.tmp.name, "jobs.sqlite3"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _age(self, job_id: str, seconds: float):
+        """Pretend the job's last heartbeat was `seconds` ago."""
+        self.store._connect().execute(
+            "UPDATE jobs SET heartbeat_at = ? WHERE id = ?", (time.time() - seconds, job_id)
+        )
+
+    def test_claim_takes_the_oldest_job_once(self):
+        first = self.store.submit({"n": 1})
+        second = self.store.submit({"n": 2})
+
+        self.assertEqual(self.store.claim(100), (first, {"n": 1}))
+        self.assertEqual(self.store.claim(101), (second, {"n": 2}))
+        self.assertIsNone(self.store.claim(102))
+
+        job = self.store.get(first)
+        self.assertEqual(job["status"], "running")
+        self.assertIsNotNone(job["started_at"])
+
+    def test_recover_requeues_a_dead_workers_job_then_fails_it(self):
+        job_id = self.store.submit({})
+        self.store.claim(_dead_pid())
+        self.assertEqual(self.store.recover(), 1)
+        self.assertEqual(self.store.get(job_id)["status"], "queued")
+
+        self.store.claim(_dead_pid())
+        self.assertEqual(self.store.recover(), 1)
+        job = self.store.get(job_id)
+        self.assertEqual(job["status"], "failed")
+        self.assertIn("Worker died", job["error"])
+
+    def test_recover_requeues_a_live_pid_without_heartbeats(self):
+        # The PID is alive (it may have been reused), but nothing beats for the job
+        job_id = self.store.submit({})
+        self.store.claim(os.getpid())
+        self.assertEqual(self.store.recover(stale_after=60), 0)
+
+        self._age(job_id, 120)
+        self.assertEqual(self.store.recover(stale_after=60), 1)
+        self.assertEqual(self.store.get(job_id)["status"], "queued")
+
+    def test_heartbeat_keeps_a_job(self):
+        job_id = self.store.submit({})
+        self.store.claim(os.getpid())
+        self._age(job_id, 120)
+
+        self.assertTrue(self.store.heartbeat(job_id, os.getpid()))
+        self.assertEqual(self.store.recover(stale_after=60), 0)
+        self.assertEqual(self.store.get(job_id)["status"], "running")
+
+    def test_a_recovered_workers_results_are_dropped(self):
+        job_id = self.store.submit({})
+        self.store.claim(os.getpid())
+        self._age(job_id, 120)
+        self.store.recover(stale_after=60)
+        self.store.claim(_dead_pid())   # the job's second attempt, elsewhere
+
+        self.assertFalse(self.store.heartbeat(job_id, os.getpid()))
+        self.store.progress(job_id, os.getpid(), "recognized", {"transcript": "stale"})
+        self.store.finish(job_id, os.getpid(), "stale", None, None)
+
+        job = self.store.get(job_id, with_result=True)
+        self.assertEqual(job["status"], "running")
+        self.assertIsNone(job["progress"])
+
+    def _run(self, job_id: str, request: dict, pipeline):
+        import speech
+
+        with mock.patch.object(speech, "speech_to_speech", side_effect=pipeline), \
+                mock.patch.object(speech, "_report_cache_stats"):
+            speech_jobs.run_job(self.store, job_id, request)
+
+    def _upload(self) -> str:
+        path = os.path.join(self.tmp.name, "upload.mp3")
+        with open(path, "wb") as fh:
+            fh.write(b"audio")
+        return path
+
+    def test_a_finished_job_deletes_its_input(self):
+        request = {"source": "english", "target": "hausa", "file": self._upload(), "delete_input": True}
+        job_id = self.store.submit(request)
+        self.store.claim(os.getpid())
+
+        self._run(job_id, request, lambda **kwargs: "translated")
+
+        self.assertEqual(self.store.get(job_id)["status"], "done")
+        self.assertFalse(os.path.exists(request["file"]))
+
+    def test_a_recovered_job_keeps_its_input_for_the_next_attempt(self):
+        request = {"source": "english", "target": "hausa", "file": self._upload(), "delete_input": True}
+        job_id = self.store.submit(request)
+        self.store.claim(os.getpid())
+
+        def stalled(**kwargs):
+            # The pool gave up on this worker while it ran
+            self._age(job_id, 120)
+            self.store.recover(stale_after=60)
+            return "translated late"
+
+        self._run(job_id, request, stalled)
+
+        self.assertEqual(self.store.get(job_id)["status"], "queued")
+        self.assertTrue(os.path.exists(request["file"]))
+
+
+class WorkTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = os.path.join(self.tmp.name, "jobs.sqlite3")
+        patches = [
+            mock.patch.object(speech_lanes, "LANES_DIR", os.path.join(self.tmp.name, "lanes")),
+            mock.patch.object(speech_jobs, "POLL_S", 0.01),
+            mock.patch.object(speech_jobs.signal, "signal"),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.lanes = speech_lanes.configure(8)   # bulk: 2 run slots
+        self.addCleanup(speech_lanes.configure)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_jobs_wait_for_a_bulk_slot(self):
+        store = speech_jobs.JobStore(self.db)
+        job_id = store.submit({})
+        bulk = self.lanes["bulk"]
+        held = [bulk.acquire() for _ in range(bulk.concurrency)]
+        ran = []
+
+        def run_job(store, job_id, request):
+            ran.append((job_id, bulk.try_acquire()))   # None: the job holds the freed slot
+
+        with mock.patch.object(speech_jobs, "run_job", side_effect=run_job):
+            worker = threading.Thread(target=speech_jobs.work, args=(self.db, 0.05))
+            worker.start()
+            time.sleep(0.2)   # a full lane with a queued job isn't idle — the worker keeps waiting
+            self.assertTrue(worker.is_alive())
+            self.assertEqual(store.get(job_id)["status"], "queued")
+
+            held.pop().release()
+            worker.join(timeout=5)
+        for slot in held:
+            slot.release()
+
+        self.assertFalse(worker.is_alive())
+        self.assertEqual(ran, [(job_id, None)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import argparse
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+import speech
+import speech_lanes
+
+
+class LaneTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        patch = mock.patch.object(speech_lanes, "LANES_DIR", self.tmp.name)
+        patch.start()
+        self.addCleanup(patch.stop)
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_threads_of_one_process_never_share_a_slot(self):
+        lane = speech_lanes.Lane("test", concurrency=2, depth=0, max_wait_s=0, retry_after_s=1)
+        slots = []
+
+        def _take():
+            slots.append(lane.try_acquire())
+
+        threads = [threading.Thread(target=_take) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sum(slot is not None for slot in slots), 2)
+        with self.assertRaises(speech_lanes.LaneBusy):
+            lane.acquire()
+
+        next(slot for slot in slots if slot is not None).release()
+        self.assertIsNotNone(lane.try_acquire())
+
+    def test_slot_files_stay_open_between_polls(self):
+        lane = speech_lanes.Lane("test", concurrency=1, depth=1, max_wait_s=0.2, retry_after_s=1)
+        held = lane.acquire()
+
+        real_open = open
+        with mock.patch("builtins.open", side_effect=real_open) as opened:
+            with self.assertRaises(speech_lanes.LaneBusy):
+                lane.acquire()
+
+        self.assertEqual(opened.call_count, 1)   # the waiting slot's file; the run slot's was already open
+        held.release()
+        lane.acquire().release()
+
+    def test_other_lane_objects_see_held_slots(self):
+        held = speech_lanes.Lane("test", 1, 0, 0, 1).acquire()
+        with self.assertRaises(speech_lanes.LaneBusy):
+            speech_lanes.Lane("test", 1, 0, 0, 1).acquire()
+        held.release()
+        speech_lanes.Lane("test", 1, 0, 0, 1).acquire().release()
+
+
+class RequestLaneTest(unittest.TestCase):
+    def test_probing_for_a_lane_is_bounded(self):
+        with tempfile.NamedTemporaryFile(suffix=".mp3") as audio, \
+                mock.patch.object(speech, "probe_media", return_value=None) as probe:
+            args = argparse.Namespace(batch_file=None, audio_file=audio.name, long_audio=None)
+            self.assertEqual(speech.request_lane(args), "short_audio")
+
+        probe.assert_called_once_with(audio.name, timeout=speech.LANE_PROBE_TIMEOUT_S)
+        self.assertLess(speech.LANE_PROBE_TIMEOUT_S, speech.PROBE_TIMEOUT_S)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,223 @@
+import threading
+import time
+import unittest
+from unittest import mock
+
+import speech_fakes
+import speech_resilience
+from speech_resilience import Backend, CircuitBreaker, CircuitOpenError
+
+
+class Flaky:
+    """fn() for Backend.call: raises the queued errors in turn, then returns "ok"."""
+
+    def __init__(self, *errors, delay: float = 0.0):
+        self.errors = list(errors)
+        self.delay = delay
+        self.calls = 0
+        self.threads = []
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            self.calls += 1
+            self.threads.append(threading.current_thread().name)
+            error = self.errors.pop(0) if self.errors else None
+        time.sleep(self.delay)
+        if error is not None:
+            raise error
+        return "ok"
+
+
+def trained(backend: Backend, latency: float) -> Backend:
+    backend.latencies.extend([latency] * speech_resilience.HEDGE_MIN_SAMPLES)
+    return backend
+
+
+class CircuitBreakerTest(unittest.TestCase):
+    def test_opens_after_consecutive_failures(self):
+        breaker = CircuitBreaker(failure_threshold=3, cooldown_s=60)
+        for _ in range(2):
+            breaker.failure()
+        self.assertEqual(breaker.state, "closed")
+        breaker.success()
+        for _ in range(3):
+            self.assertTrue(breaker.allow())
+            breaker.failure()
+        self.assertEqual(breaker.state, "open")
+        self.assertFalse(breaker.allow())
+
+    def test_half_open_lets_one_trial_through(self):
+        breaker = CircuitBreaker(failure_threshold=1, cooldown_s=0.05)
+        breaker.failure()
+        self.assertFalse(breaker.allow())
+        time.sleep(0.06)
+
+        self.assertTrue(breaker.allow())
+        self.assertEqual(breaker.state, "half_open")
+        self.assertFalse(breaker.allow())   # the trial is still running
+
+        breaker.failure()                   # trial failed: open again, cool-down restarts
+        self.assertEqual(breaker.state, "open")
+        self.assertFalse(breaker.allow())
+
+        time.sleep(0.06)
+        self.assertTrue(breaker.allow())
+        breaker.success()
+        self.assertEqual(breaker.state, "closed")
+        self.assertTrue(breaker.allow())
+
+    def test_abandoned_trial_frees_the_slot(self):
+        breaker = CircuitBreaker(failure_threshold=1, cooldown_s=0.0)
+        breaker.failure()
+        self.assertTrue(breaker.allow())
+        breaker.abandon()
+        self.assertTrue(breaker.allow())
+
+
+@mock.patch.object(speech_resilience, "BACKOFF_BASE_S", 0.001)
+class BackendCallTest(unittest.TestCase):
+    def test_retries_transient_errors(self):
+        backend = Backend("t", attempts=3, hedge=False)
+        fn = Flaky(ConnectionResetError("reset"), TimeoutError("timed out"))
+        self.assertEqual(backend.call(fn), "ok")
+        self.assertEqual(fn.calls, 3)
+        self.assertEqual(backend.stats()["retries"], 2)
+
+    def test_retries_the_backends_own_errors_when_listed(self):
+        class BackendDown(Exception):
+            pass
+
+        backend = Backend("t", attempts=2, hedge=False)
+        self.assertEqual(backend.call(Flaky(BackendDown()), retryable=(BackendDown,)), "ok")
+
+    def test_other_errors_are_raised_at_once(self):
+        backend = Backend("t", attempts=3, hedge=False)
+        fn = Flaky(KeyError("bad answer"))
+        with self.assertRaises(KeyError):
+            backend.call(fn)
+        self.assertEqual(fn.calls, 1)
+        self.assertEqual(backend.breaker.failures, 0)
+
+    def test_permanent_errors_are_answers(self):
+        class NoSpeech(Exception):
+            pass
+
+        backend = Backend("t", attempts=3, hedge=False)
+        backend.breaker.failures = 2
+        with self.assertRaises(NoSpeech):
+            backend.call(Flaky(NoSpeech()), permanent=(NoSpeech,))
+        self.assertEqual(backend.breaker.failures, 0)
+
+    def test_gives_up_after_the_last_attempt_and_opens_the_breaker(self):
+        backend = Backend("t", attempts=2, hedge=False, breaker=CircuitBreaker(failure_threshold=2, cooldown_s=60))
+        fn = Flaky(OSError("down"), OSError("still down"))
+        with self.assertRaisesRegex(OSError, "still down"):
+            backend.call(fn)
+        with self.assertRaises(CircuitOpenError):
+            backend.call(fn)
+        self.assertEqual(fn.calls, 2)
+        self.assertEqual(backend.stats()["rejected"], 1)
+
+
+class HedgeTest(unittest.TestCase):
+    def test_untrained_backend_runs_on_the_callers_thread(self):
+        fn = Flaky()
+        Backend("t").call(fn)
+        self.assertEqual(fn.threads, [threading.current_thread().name])
+
+    def test_a_slow_attempt_is_answered_by_a_faster_hedge(self):
+        backend = trained(Backend("t"), 0.02)
+        calls = []
+
+        def fn():
+            calls.append(threading.current_thread().name)
+            if len(calls) == 1:
+                time.sleep(1.0)
+                return "slow"
+            return "hedged"
+
+        started = time.perf_counter()
+        self.assertEqual(backend.call(fn), "hedged")
+        self.assertLess(time.perf_counter() - started, 0.5)
+        self.assertEqual(backend.stats()["hedges"], 1)
+        self.assertTrue(all(name.startswith("speech-attempt") for name in calls))
+
+    def test_a_failed_attempt_is_answered_by_its_hedge(self):
+        backend = trained(Backend("t", attempts=1), 0.01)
+        fn = Flaky(ConnectionResetError("reset"), delay=0.1)
+        self.assertEqual(backend.call(fn), "ok")
+        self.assertEqual(fn.calls, 2)
+        self.assertEqual(backend.stats()["failures"], 0)
+
+    def test_attempts_run_inline_when_the_pool_is_full(self):
+        backend = trained(Backend("t"), 0.01)
+        fn = Flaky(delay=0.05)
+        with mock.patch.object(speech_resilience, "_attempt_slots", threading.BoundedSemaphore(1)) as slots:
+            slots.acquire()
+            self.assertEqual(backend.call(fn), "ok")
+            slots.release()
+        self.assertEqual(fn.threads, [threading.current_thread().name])
+        self.assertEqual(backend.stats()["hedges"], 0)
+
+    def test_fast_attempts_are_not_hedged(self):
+        backend = trained(Backend("t"), 0.05)
+        fn = Flaky()
+        for _ in range(5):
+            backend.call(fn)
+        time.sleep(0.1)   # a late hedge would have started by now
+        self.assertEqual(fn.calls, 5)
+        self.assertEqual(backend.stats()["hedges"], 0)
+
+    def test_outstanding_hedges_are_bounded(self):
+        slots = threading.BoundedSemaphore(1)
+        backend = trained(Backend("t"), 0.01)
+        fn = Flaky(delay=0.15)
+        with mock.patch.object(speech_resilience, "_hedge_slots", slots):
+            threads = [threading.Thread(target=backend.call, args=(fn,)) for _ in range(3)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            time.sleep(0.2)   # let the one hedge finish and free its slot
+            self.assertTrue(slots.acquire(blocking=False))
+
+        stats = backend.stats()
+        self.assertEqual(stats["hedges"], 1)
+        self.assertEqual(stats["hedges_skipped"], 2)
+
+
+@mock.patch.object(speech_resilience, "BACKOFF_BASE_S", 0.001)
+class TranslateBackendTest(unittest.TestCase):
+    """_translate_codes against speech_fakes' stand-in for Google Translate."""
+
+    def setUp(self):
+        speech_resilience.reset()
+        self.addCleanup(speech_resilience.reset)
+
+    def test_http_errors_are_retried(self):
+        import speech
+
+        with speech_fakes.FakeTranslate(error_rate=0.5, seed=3) as fake, \
+                speech_fakes.route_to_fakes(translate=fake):
+            for _ in range(10):
+                self.assertEqual(speech._translate_codes("en", "ha", "hello"), fake.translate("hello", "ha"))
+
+        stats = speech_resilience.stats()["translate"]
+        self.assertGreater(stats["retries"], 0)
+        self.assertEqual(stats["retries"], fake.errors)
+
+    def test_an_outage_opens_the_breaker(self):
+        import speech
+
+        speech_resilience.backend("translate").breaker = CircuitBreaker(failure_threshold=3, cooldown_s=60)
+        with speech_fakes.FakeTranslate(error_rate=1.0) as fake, speech_fakes.route_to_fakes(translate=fake):
+            with self.assertRaises(Exception):
+                speech._translate_codes("en", "ha", "hello")
+            with self.assertRaises(CircuitOpenError):
+                speech._translate_codes("en", "ha", "hello")
+        self.assertEqual(fake.requests, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
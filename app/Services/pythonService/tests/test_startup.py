@@ -0,0 +1,40 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import speech_bench
+from speech_cache import TranslationCache
+
+
+class StartupImportsTest(unittest.TestCase):
+    """The cheap CLI paths must not import a backend library (speech_bench.py --startup times them)."""
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp(prefix="speech-test-startup-")
+        seeded = TranslationCache(db_path=os.path.join(self.cache_dir, "translations.sqlite3"))
+        seeded.put("english", "hausa", speech_bench.SHORT_TEXT, f"[hausa] {speech_bench.SHORT_TEXT}")
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def test_cheap_paths_import_no_backends(self):
+        env = dict(os.environ, SPEECH_CACHE_DIR=self.cache_dir, SPEECH_LANES_DIR=self.cache_dir)
+        env.pop("SPEECH_CACHE_DISABLED", None)
+        script = os.path.join(speech_bench.HERE, "speech.py")
+
+        for name, argv in speech_bench.STARTUP_CASES.items():
+            with self.subTest(name):
+                proc = subprocess.run(
+                    [sys.executable, "-X", "importtime", script] + argv,
+                    capture_output=True, text=True, env=env, timeout=30,
+                )
+                self.assertEqual(proc.returncode, 0, proc.stderr[-2000:])
+                imported = speech_bench.parse_importtime(proc.stderr)
+                self.assertEqual(sorted(m for m in speech_bench.HEAVY_MODULES if m in imported), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import os
+import sys
+import tempfile
+import types
+import unittest
+from unittest import mock
+
+import speech
+from speech_cache import AudioStore
+
+
+class FakeGTTS:
+    """gTTS stand-in that records its syntheses and writes `audio` to the target."""
+
+    audio = b""
+    saved = []
+
+    def __init__(self, text, lang, slow=False, timeout=None):
+        self.text = text
+
+    def save(self, path):
+        FakeGTTS.saved.append(path)
+        with open(path, "wb") as fh:
+            fh.write(FakeGTTS.audio)
+
+
+class TextToSpeechTest(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._dir.cleanup)
+        FakeGTTS.saved = []
+        patches = [
+            mock.patch.dict(sys.modules, {"gtts": types.SimpleNamespace(gTTS=FakeGTTS)}),
+            mock.patch("speech_cache.get_audio_store", return_value=AudioStore(self._dir.name, max_bytes=10**6)),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def _speak(self):
+        return speech.text_to_speech_advanced(
+            "hello", save_path=os.path.join(self._dir.name, "out.mp3"), play=False, tts_concurrency=1,
+        )
+
+    def test_synthesizes_once_into_the_store(self):
+        FakeGTTS.audio = b"ID3 audio"
+        path = self._speak()
+        with open(path, "rb") as fh:
+            self.assertEqual(fh.read(), b"ID3 audio")
+        self.assertEqual(len(FakeGTTS.saved), 1)
+
+    def test_empty_synthesis_fails_without_a_second_request(self):
+        FakeGTTS.audio = b""
+        self.assertIsNone(self._speak())
+        self.assertEqual(len(FakeGTTS.saved), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
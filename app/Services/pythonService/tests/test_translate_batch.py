@@ -0,0 +1,27 @@
+import unittest
+from unittest import mock
+
+import speech
+import speech_deadline
+
+
+class TranslateBatchTest(unittest.TestCase):
+    def test_backend_calls_run_under_the_request_deadline(self):
+        seen = []
+
+        def translate(source, target, text):
+            seen.append(speech_deadline.current())
+            return text.upper()
+
+        with mock.patch.object(speech, "_translate_codes", side_effect=translate), \
+                mock.patch("speech_cache.get_translation_cache", return_value=None), \
+                speech_deadline.within(30_000) as deadline:
+            results = speech.translate_batch("english", "hausa", ["one", "two", "one"], concurrency=2)
+
+        self.assertEqual([r["output"] for r in results], ["ONE", "TWO", "ONE"])
+        self.assertTrue(seen)
+        self.assertTrue(all(d is deadline for d in seen))
+
+
+if __name__ == "__main__":
+    unittest.main()
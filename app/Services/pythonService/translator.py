@@ -1,7 +1,7 @@
 import os
 import tempfile
 from typing import Optional
-from deep_translator import GoogleTranslator
+from speech_translators import get_translator, is_supported
 
 
 #  This function translates text between languages using Google Translator
@@ -17,10 +17,6 @@ def translate_text(source_lang=None, target_lang=None, text_to_translate=None,sp
     Returns:
         str: Translated text or error message
     """
-    # Create an instance to get supported languages
-    translator = GoogleTranslator(source='en', target='es')
-    list_of_sources = translator.get_supported_languages(as_dict=True)
-
     # Get input if not provided
     if source_lang is None:
         source_lang = input("Enter the source language: ")
@@ -30,13 +26,9 @@ def translate_text(source_lang=None, target_lang=None, text_to_translate=None,sp
         text_to_translate = input("Enter the text to be translated: ")
 
     # Check if both languages are supported
-    if (source_lang in list_of_sources or source_lang in list_of_sources.values()) and \
-       (target_lang in list_of_sources or target_lang in list_of_sources.values()):
+    if is_supported(source_lang) and is_supported(target_lang):
 
-        translated = GoogleTranslator(
-            source=source_lang,
-            target=target_lang
-        ).translate(text_to_translate)
+        translated = get_translator(source_lang, target_lang).translate(text_to_translate)
 
         result = f"Translated text: {translated}"
         print(result)
@@ -17,7 +17,14 @@
 Route::prefix('client')->group(function () {
     Route::post('/translate-text', [PythonController::class, 'translateText']);
     Route::post('/translate-audio', [PythonController::class, 'translateAudio']);
+    Route::post('/translate-audio/targets', [PythonController::class, 'translateAudioTargets']);
+    Route::post('/translate-audio/jobs', [PythonController::class, 'translateAudioJob']);
+    Route::get('/translate-audio/jobs/{job}', [PythonController::class, 'translateAudioJobStatus'])
+        ->where('job', '[0-9a-f]{32}');
+    Route::get('/translate-audio/jobs/{job}/result', [PythonController::class, 'translateAudioJobResult'])
+        ->where('job', '[0-9a-f]{32}');
     Route::post('/text-translate-audio', [PythonController::class, 'textTranslateAudio']);
+    Route::post('/text-translate-audio/stream', [PythonController::class, 'textTranslateAudioStream']);
 });
 Route::prefix('client')->group(function () {
     Route::get('/vault', [VaultApiController::class, 'index']);